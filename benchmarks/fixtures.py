@@ -0,0 +1,260 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/fixtures.py
+
+This script defines the synthetic resources and operations used by the benchmarks.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import (
+    AZURE_LOCATION_ABBREVIATIONS,
+    RegistryStackOperationFactory,
+    Resource,
+    StackOperation,
+    StackOperationFactory,
+)
+from pythoneda.shared.iac.events import (
+    DockerResourcesRemovalRequested,
+    DockerResourcesUpdateRequested,
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+from typing import Any
+
+
+class ProviderObject:
+    """
+    Stand-in for a provider resource.
+    """
+
+    def __init__(self, name: str):
+        self.id = f"/resources/{name}"
+        self.name = name
+
+    def get_name(self) -> str:
+        return self.name
+
+
+class SyntheticResource(Resource):
+    """
+    Resource whose creation does not call any provider.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    @property
+    def max_length(cls) -> int:
+        return 24
+
+    @classmethod
+    def _resource_name(cls, stackName: str, projectName: str, location: str) -> str:
+        return "synthetic"
+
+    def _create(self, name: str) -> Any:
+        return ProviderObject(name)
+
+    def _post_create(self, resource: Any):
+        pass
+
+    @classmethod
+    def from_id(cls, id: str, name: str = None) -> Any:
+        return ProviderObject(name or id)
+
+
+class MappedSyntheticResource(SyntheticResource):
+    """
+    SyntheticResource abbreviating locations through the shared Azure index.
+    """
+
+    __slots__ = ()
+
+    location_abbreviations = AZURE_LOCATION_ABBREVIATIONS
+
+
+_AZURE_TABLE = dict(AZURE_LOCATION_ABBREVIATIONS)
+
+
+class HookSyntheticResource(SyntheticResource):
+    """
+    SyntheticResource abbreviating locations in its _location_abbrev hook, building
+    its table on every call like the dict literal of a per-class hook, as a
+    reference for the cost of the location_abbreviations index.
+    """
+
+    __slots__ = ()
+
+    @classmethod
+    def _location_abbrev(cls, location: str) -> str:
+        return dict(_AZURE_TABLE).get(location, location)
+
+
+class NaiveSyntheticResource(SyntheticResource):
+    """
+    SyntheticResource delegating every lookup straight to the actual resource,
+    as a reference for the cost of the optimized delegation.
+    """
+
+    def __getattr__(self, attr):
+        if attr in Resource.__slots__:
+            raise AttributeError(attr)
+        return getattr(self.actual_resource, attr)
+
+
+class SyntheticOperation(StackOperation):
+    """
+    Operation that yields to the event loop once.
+    """
+
+    async def perform(self):
+        await asyncio.sleep(0)
+        return [self.event]
+
+
+class SleepingOperation(SyntheticOperation):
+    """
+    Operation waiting a millisecond on its provider.
+    """
+
+    async def perform(self):
+        await asyncio.sleep(0.001)
+        return [self.event]
+
+
+class SyntheticUpdateInfrastructure(SyntheticOperation):
+    pass
+
+
+class SyntheticRemoveInfrastructure(SyntheticOperation):
+    pass
+
+
+class SyntheticUpdateDockerResources(SyntheticOperation):
+    pass
+
+
+class SyntheticRemoveDockerResources(SyntheticOperation):
+    pass
+
+
+class SyntheticStackOperationFactory(StackOperationFactory):
+    """
+    Factory dispatching events with an isinstance chain.
+    """
+
+    def new(self, event) -> StackOperation:
+        if isinstance(event, InfrastructureUpdateRequested):
+            return SyntheticUpdateInfrastructure(event)
+        if isinstance(event, InfrastructureRemovalRequested):
+            return SyntheticRemoveInfrastructure(event)
+        if isinstance(event, DockerResourcesUpdateRequested):
+            return SyntheticUpdateDockerResources(event)
+        if isinstance(event, DockerResourcesRemovalRequested):
+            return SyntheticRemoveDockerResources(event)
+        raise ValueError(f"Unsupported event: {event}")
+
+
+class SyntheticRegistryStackOperationFactory(RegistryStackOperationFactory):
+    """
+    Factory dispatching events through its registry.
+    """
+
+    pass
+
+
+SyntheticRegistryStackOperationFactory.register(
+    InfrastructureUpdateRequested, SyntheticUpdateInfrastructure
+)
+SyntheticRegistryStackOperationFactory.register(
+    InfrastructureRemovalRequested, SyntheticRemoveInfrastructure
+)
+SyntheticRegistryStackOperationFactory.register(
+    DockerResourcesUpdateRequested, SyntheticUpdateDockerResources
+)
+SyntheticRegistryStackOperationFactory.register(
+    DockerResourcesRemovalRequested, SyntheticRemoveDockerResources
+)
+
+
+class StackEvent:
+    """
+    Gives events a stack, without running the constructor of the event class.
+    """
+
+    def __init__(self, stackName: str):
+        self._bench_stack_name = stackName
+
+    @property
+    def stack_name(self) -> str:
+        return self._bench_stack_name
+
+    @property
+    def project_name(self) -> str:
+        return "bench"
+
+    @property
+    def location(self) -> str:
+        return "westeurope"
+
+
+_stack_event_classes = {}
+
+
+def stack_event(eventClass: type, stackName: str):
+    """
+    Builds an event of given class, for given stack.
+    :param eventClass: The event class.
+    :type eventClass: type
+    :param stackName: The name of the stack.
+    :type stackName: str
+    :return: The event.
+    :rtype: pythoneda.shared.Event
+    """
+    result = _stack_event_classes.get(eventClass, None)
+    if result is None:
+        result = type(f"Stack{eventClass.__name__}", (StackEvent, eventClass), {})
+        _stack_event_classes[eventClass] = result
+    return result(stackName)
+
+
+def resource_graph(size: int, lazy: bool = True) -> list:
+    """
+    Builds a tree of resources, each one depending on its parent.
+    :param size: The number of resources.
+    :type size: int
+    :param lazy: Whether to defer creating the actual resources.
+    :type lazy: bool
+    :return: The resources.
+    :rtype: List[SyntheticResource]
+    """
+    result = []
+    for index in range(size):
+        dependencies = {} if index == 0 else {"parent": result[(index - 1) // 2]}
+        result.append(
+            SyntheticResource("dev", "bench", f"loc{index}", dependencies, lazy=lazy)
+        )
+    return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
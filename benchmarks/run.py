@@ -0,0 +1,397 @@
+# vim: set fileencoding=utf-8
+"""
+benchmarks/run.py
+
+This script runs the benchmarks of the IaC core abstractions, and compares
+them against a stored baseline.
+
+Usage:
+    python benchmarks/run.py [--save] [--baseline FILE] [--tolerance RATIO] [--filter TEXT]
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+from typing import Callable, Dict
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fixtures import (
+    HookSyntheticResource,
+    MappedSyntheticResource,
+    NaiveSyntheticResource,
+    ProviderObject,
+    SleepingOperation,
+    SyntheticOperation,
+    SyntheticRegistryStackOperationFactory,
+    SyntheticResource,
+    SyntheticStackOperationFactory,
+    resource_graph,
+    stack_event,
+)
+from pythoneda.shared.iac import Resource, ResourceScheduler, StackOperationRunner
+from pythoneda.shared.iac.events import (
+    DockerResourcesRemovalRequested,
+    DockerResourcesUpdateRequested,
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+BENCHMARKS = {}
+
+
+def benchmark(name: str):
+    """
+    Registers a benchmark. The decorated function builds its fixtures and
+    returns the callable to time.
+    :param name: The benchmark name.
+    :type name: str
+    :return: The decorator.
+    :rtype: Callable
+    """
+
+    def decorator(setup: Callable[[], Callable[[], None]]):
+        BENCHMARKS[name] = setup
+        return setup
+
+    return decorator
+
+
+def event(eventClass: type):
+    """
+    Builds an event without running its constructor: dispatch only depends on its type.
+    :param eventClass: The event class.
+    :type eventClass: type
+    :return: The event.
+    :rtype: pythoneda.shared.Event
+    """
+    return eventClass.__new__(eventClass)
+
+
+@benchmark("naming.name_for.cached")
+def naming_cached():
+    SyntheticResource.name_for("dev", "bench", "westeurope")
+    return lambda: SyntheticResource.name_for("dev", "bench", "westeurope")
+
+
+@benchmark("naming.name_for.uncached")
+def naming_uncached():
+    return lambda: SyntheticResource._compute_name("dev", "bench", "westeurope")
+
+
+@benchmark("naming.names_for_many.1000")
+def naming_many():
+    coordinates = [("dev", "bench", f"loc{index}") for index in range(1000)]
+    return lambda: SyntheticResource.names_for_many(coordinates)
+
+
+@benchmark("naming.truncate_name")
+def naming_truncate():
+    return lambda: SyntheticResource._truncate_name(
+        "dev", "bench", "westeurope", "synthetic", 24
+    )
+
+
+@benchmark("naming.location_abbrev.mapping")
+def naming_location_mapping():
+    return lambda: MappedSyntheticResource._truncate_name(
+        "dev", "bench", "westeurope", "synthetic", 24
+    )
+
+
+@benchmark("naming.location_abbrev.hook")
+def naming_location_hook():
+    return lambda: HookSyntheticResource._truncate_name(
+        "dev", "bench", "westeurope", "synthetic", 24
+    )
+
+
+for size in (10, 100, 10000):
+
+    @benchmark(f"graph.construct.{size}")
+    def graph_construct(size=size):
+        return lambda: resource_graph(size)
+
+    @benchmark(f"graph.dependency_order.{size}")
+    def graph_order(size=size):
+        resources = resource_graph(size)
+        return lambda: Resource.dependency_order(resources)
+
+
+for size in (10, 100):
+
+    @benchmark(f"graph.schedule.{size}")
+    def graph_schedule(size=size):
+        def run():
+            scheduler = ResourceScheduler("dev", "bench", "westeurope")
+            previous = []
+            for index in range(size):
+                dependencies = (
+                    {} if index == 0 else {"parent": previous[(index - 1) // 2]}
+                )
+                previous.append(
+                    scheduler.add(f"r{index}", SyntheticResource, dependencies)
+                )
+            asyncio.run(scheduler.run())
+
+        return run
+
+
+@benchmark("delegation.plain_attribute")
+def delegation_plain():
+    target = ProviderObject("plain")
+    return lambda: target.id
+
+
+@benchmark("delegation.plain_method")
+def delegation_plain_method():
+    target = ProviderObject("plain")
+    return lambda: target.get_name
+
+
+@benchmark("delegation.getattr.data")
+def delegation_data():
+    resource = SyntheticResource("dev", "bench", "westeurope", {})
+    return lambda: resource.id
+
+
+@benchmark("delegation.getattr.method")
+def delegation_method():
+    resource = SyntheticResource("dev", "bench", "westeurope", {})
+    return lambda: resource.get_name
+
+
+@benchmark("delegation.naive.data")
+def delegation_naive_data():
+    resource = NaiveSyntheticResource("dev", "bench", "westeurope", {})
+    return lambda: resource.id
+
+
+@benchmark("delegation.naive.method")
+def delegation_naive_method():
+    resource = NaiveSyntheticResource("dev", "bench", "westeurope", {})
+    return lambda: resource.get_name
+
+
+def factory_events() -> list:
+    """
+    Builds one event of each kind handled by the synthetic factories.
+    :return: The events.
+    :rtype: List[pythoneda.shared.Event]
+    """
+    return [
+        event(InfrastructureUpdateRequested),
+        event(InfrastructureRemovalRequested),
+        event(DockerResourcesUpdateRequested),
+        event(DockerResourcesRemovalRequested),
+    ]
+
+
+@benchmark("factory.new.isinstance")
+def factory_new():
+    factory = SyntheticStackOperationFactory()
+    events = factory_events()
+
+    def run():
+        for item in events:
+            factory.new(item)
+
+    return run
+
+
+@benchmark("factory.new.registry")
+def factory_new_registry():
+    factory = SyntheticRegistryStackOperationFactory()
+    events = factory_events()
+
+    def run():
+        for item in events:
+            factory.new(item)
+
+    return run
+
+
+for concurrency in (1, 8, 64):
+
+    @benchmark(f"runner.perform.200.concurrency_{concurrency}")
+    def runner_perform(concurrency=concurrency):
+        events = [
+            stack_event(InfrastructureUpdateRequested, f"stack{index}")
+            for index in range(200)
+        ]
+
+        async def run_all():
+            runner = StackOperationRunner(maxConcurrency=concurrency)
+            await asyncio.gather(*[runner.run(SyntheticOperation(e)) for e in events])
+            await runner.stop()
+
+        return lambda: asyncio.run(run_all())
+
+
+def runner_throughput(events: list, concurrency: int) -> Callable[[], None]:
+    """
+    Builds a benchmark performing a SleepingOperation per event on a runner.
+    :param events: The events.
+    :type events: List[pythoneda.shared.Event]
+    :param concurrency: The number of workers.
+    :type concurrency: int
+    :return: The benchmark.
+    :rtype: Callable[[], None]
+    """
+
+    async def run_all():
+        runner = StackOperationRunner(maxConcurrency=concurrency)
+        await asyncio.gather(*[runner.run(SleepingOperation(e)) for e in events])
+        await runner.stop()
+
+    return lambda: asyncio.run(run_all())
+
+
+for concurrency in (1, 8, 64):
+
+    @benchmark(f"runner.throughput.200.stacks_50.concurrency_{concurrency}")
+    def runner_throughput_stacks(concurrency=concurrency):
+        events = [
+            stack_event(InfrastructureUpdateRequested, f"stack{index % 50}")
+            for index in range(200)
+        ]
+        return runner_throughput(events, concurrency)
+
+
+@benchmark("runner.latency.hot_stack.concurrency_8")
+def runner_latency_hot_stack():
+    hot = [stack_event(InfrastructureUpdateRequested, "hot") for _ in range(20)]
+    others = [
+        stack_event(InfrastructureUpdateRequested, f"stack{index}")
+        for index in range(180)
+    ]
+
+    async def run_others():
+        # times 180 stacks queued behind 20 operations on a single stack;
+        # asyncio.run() cancels whatever is left of the latter
+        runner = StackOperationRunner(maxConcurrency=8)
+        for item in hot:
+            await runner.submit(SleepingOperation(item))
+        await asyncio.gather(*[runner.run(SleepingOperation(e)) for e in others])
+
+    return lambda: asyncio.run(run_others())
+
+
+COLD_IMPORTS = {
+    "package": "import pythoneda.shared.iac",
+    "resource": "from pythoneda.shared.iac import Resource",
+}
+
+for name, statement in COLD_IMPORTS.items():
+
+    @benchmark(f"import.cold.{name}")
+    def import_cold(statement=statement):
+        environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+        command = [sys.executable, "-c", statement]
+        return lambda: subprocess.run(command, env=environment, check=True)
+
+
+def measure(setup: Callable[[], Callable[[], None]], repeat: int) -> float:
+    """
+    Times a benchmark.
+    :param setup: The benchmark setup.
+    :type setup: Callable
+    :param repeat: How many rounds to run.
+    :type repeat: int
+    :return: The best time per call, in seconds.
+    :rtype: float
+    """
+    timer = timeit.Timer(setup())
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main() -> int:
+    """
+    Runs the benchmarks.
+    :return: The exit code: 1 if any benchmark regressed beyond the tolerance.
+    :rtype: int
+    """
+    parser = argparse.ArgumentParser(description="IaC core benchmarks")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="store the results as baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", default="")
+    args = parser.parse_args()
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file).get("results", {})
+
+    results = {}
+    regressions = []
+    for name, setup in BENCHMARKS.items():
+        if args.filter not in name:
+            continue
+        seconds = measure(setup, args.repeat)
+        results[name] = seconds
+        line = f"{name:<45} {seconds * 1e6:>14.3f} us"
+        reference = baseline.get(name, None)
+        if reference:
+            ratio = seconds / reference
+            line += f"  {ratio:>6.2f}x baseline"
+            if ratio > 1 + args.tolerance:
+                regressions.append(name)
+                line += "  REGRESSION"
+        print(line)
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+                sort_keys=True,
+            )
+            file.write("\n")
+
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
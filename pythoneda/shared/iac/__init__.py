@@ -21,14 +21,75 @@ along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 __path__ = __import__("pkgutil").extend_path(__path__, __name__)
 
-from .resource import Resource
-from .stack_operation import StackOperation
-from .remove_docker_resources import RemoveDockerResources
-from .remove_infrastructure import RemoveInfrastructure
-from .request_docker_image_details import RequestDockerImageDetails
-from .update_docker_resources import UpdateDockerResources
-from .update_infrastructure import UpdateInfrastructure
-from .stack_operation_factory import StackOperationFactory
+import importlib
+
+_EXPORTS = {
+    "MetricsSink": "metrics_sink",
+    "MemoryMetricsSink": "memory_metrics_sink",
+    "LoggingMetricsSink": "logging_metrics_sink",
+    "PrometheusTextFileMetricsSink": "prometheus_text_file_metrics_sink",
+    "Instrumentation": "instrumentation",
+    "DeadlineExceeded": "deadline_exceeded",
+    "AZURE_LOCATION_ABBREVIATIONS": "location_abbreviations",
+    "LocationAbbreviations": "location_abbreviations",
+    "ResourceLookupCache": "resource_lookup_cache",
+    "MemoryResourceLookupCache": "memory_resource_lookup_cache",
+    "SqliteResourceLookupCache": "sqlite_resource_lookup_cache",
+    "Resource": "resource",
+    "ResourceHashIndex": "resource_hash_index",
+    "ResourceGraph": "resource_graph",
+    "SharedResourceRegistry": "shared_resource_registry",
+    "ScheduledResource": "scheduled_resource",
+    "ResourceScheduler": "resource_scheduler",
+    "TeardownResult": "teardown_result",
+    "ResourceTeardown": "resource_teardown",
+    "ResourceProgress": "resource_progress",
+    "ProviderClientPool": "provider_client_pool",
+    "StackPlan": "stack_plan",
+    "StackOperation": "stack_operation",
+    "StackSnapshot": "stack_snapshot",
+    "DockerDigestIndex": "docker_digest_index",
+    "DockerImageDetailsCache": "docker_image_details_cache",
+    "RemoveDockerResources": "remove_docker_resources",
+    "RemoveInfrastructure": "remove_infrastructure",
+    "RequestDockerImageDetails": "request_docker_image_details",
+    "UpdateDockerResources": "update_docker_resources",
+    "UpdateInfrastructure": "update_infrastructure",
+    "StackOperationFactory": "stack_operation_factory",
+    "RegistryStackOperationFactory": "registry_stack_operation_factory",
+    "StackOperationBatcher": "stack_operation_batcher",
+    "RateLimiter": "rate_limiter",
+    "StackOperationRunner": "stack_operation_runner",
+    "ShardedStackOperationExecutor": "sharded_stack_operation_executor",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name: str):
+    """
+    Imports the module defining a public name the first time it's accessed.
+    :param name: The name.
+    :type name: str
+    :return: The value.
+    :rtype: Any
+    """
+    module = _EXPORTS.get(name, None)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    result = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = result
+    return result
+
+
+def __dir__():
+    """
+    Lists the module attributes, including the public names not imported yet.
+    :return: Such names.
+    :rtype: List[str]
+    """
+    return sorted(set(globals()) | set(_EXPORTS))
+
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
 # Local Variables:
@@ -0,0 +1,124 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/deadline_exceeded.py
+
+This script defines the DeadlineExceeded class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from typing import Dict, List, Union
+
+
+class DeadlineExceeded(asyncio.TimeoutError):
+    """
+    Raised when a stack operation, or the creation of a resource, takes too long.
+
+    Class name: DeadlineExceeded
+
+    Responsibilities:
+        - Tell which resources were completed, which were still in flight, and
+          which were never started when the deadline passed.
+
+    Collaborators:
+        - pythoneda.shared.iac.ResourceScheduler
+        - pythoneda.shared.iac.StackOperationRunner
+    """
+
+    def __init__(
+        self,
+        message: str,
+        completed: List[str],
+        inFlight: List[str],
+        pending: List[str],
+    ):
+        """
+        Creates a new DeadlineExceeded instance.
+        :param message: The error message.
+        :type message: str
+        :param completed: The resources completed before the deadline.
+        :type completed: List[str]
+        :param inFlight: The resources whose creation was under way. Provider calls
+        running in worker threads can't be interrupted, so they may still complete.
+        :type inFlight: List[str]
+        :param pending: The resources never started.
+        :type pending: List[str]
+        """
+        super().__init__(message)
+        self._completed = completed
+        self._in_flight = inFlight
+        self._pending = pending
+
+    @property
+    def completed(self) -> List[str]:
+        """
+        Retrieves the resources completed before the deadline.
+        :return: Their names.
+        :rtype: List[str]
+        """
+        return self._completed
+
+    @property
+    def in_flight(self) -> List[str]:
+        """
+        Retrieves the resources whose creation was under way.
+        :return: Their names.
+        :rtype: List[str]
+        """
+        return self._in_flight
+
+    @property
+    def pending(self) -> List[str]:
+        """
+        Retrieves the resources never started.
+        :return: Their names.
+        :rtype: List[str]
+        """
+        return self._pending
+
+    def __reduce__(self):
+        """
+        Supports pickling, so the error can cross process boundaries.
+        :return: The class and the constructor arguments.
+        :rtype: tuple
+        """
+        return (
+            self.__class__,
+            (str(self), self._completed, self._in_flight, self._pending),
+        )
+
+    def to_dict(self) -> Dict[str, Union[str, List[str]]]:
+        """
+        Summarizes the partial outcome, to be included in failure events.
+        :return: The error, and the completed, in-flight and pending resources.
+        :rtype: Dict[str, Union[str, List[str]]]
+        """
+        return {
+            "error": str(self),
+            "completed": list(self._completed),
+            "in_flight": list(self._in_flight),
+            "pending": list(self._pending),
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,170 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/docker_digest_index.py
+
+This script defines the DockerDigestIndex class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import Counter, OrderedDict
+from pythoneda.shared import BaseObject
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class DockerDigestIndex(BaseObject):
+    """
+    Keeps track of the image digest each Docker-dependent resource runs.
+
+    Class name: DockerDigestIndex
+
+    Responsibilities:
+        - Remember the deployed image digest of each resource.
+        - Tell whether given resources already run a given digest.
+        - Keep one index per stack, until the stack's resources are removed or
+          it's the least recently used of more than max_stacks stacks.
+
+    Collaborators:
+        - pythoneda.shared.iac.UpdateDockerResources
+    """
+
+    max_stacks = 1024
+
+    _stacks = OrderedDict()
+
+    def __init__(self):
+        """
+        Creates a new DockerDigestIndex instance.
+        """
+        super().__init__()
+        self._digests = {}
+        self._counts = Counter()
+
+    @classmethod
+    def for_stack(cls, stackKey: Tuple[str, str, str]) -> "DockerDigestIndex":
+        """
+        Retrieves the index of a stack, creating it the first time.
+        Only the max_stacks most recently used indexes are kept: an evicted stack
+        just gets its resources redeployed on its next update.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :return: The index.
+        :rtype: pythoneda.shared.iac.DockerDigestIndex
+        """
+        stacks = DockerDigestIndex._stacks
+        result = stacks.get(stackKey, None)
+        if result is None:
+            result = cls()
+            stacks[stackKey] = result
+            while len(stacks) > DockerDigestIndex.max_stacks:
+                stacks.popitem(last=False)
+        else:
+            stacks.move_to_end(stackKey)
+        return result
+
+    @classmethod
+    def discard(cls, stackKey: Tuple[str, str, str]):
+        """
+        Drops the index of a stack, for instance when its resources get removed.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        """
+        DockerDigestIndex._stacks.pop(stackKey, None)
+
+    @property
+    def digests(self) -> Dict[str, str]:
+        """
+        Retrieves the deployed digest of each resource.
+        :return: Such digests, by resource name.
+        :rtype: Dict[str, str]
+        """
+        return dict(self._digests)
+
+    def digest_of(self, resourceName: str) -> Optional[str]:
+        """
+        Retrieves the deployed digest of a resource.
+        :param resourceName: The name of the resource.
+        :type resourceName: str
+        :return: The digest, or None if unknown.
+        :rtype: Optional[str]
+        """
+        return self._digests.get(resourceName, None)
+
+    def is_current(self, digest: str, resourceNames: Iterable[str]) -> bool:
+        """
+        Checks whether given resources already run given digest.
+        Resources the index doesn't know about are never current.
+        Rejecting a digest fewer resources run is O(1). When the whole stack runs
+        that digest, each name is only looked up, not compared: reading the names
+        given is the only linear cost left.
+        :param digest: The image digest.
+        :type digest: str
+        :param resourceNames: The names of the resources.
+        :type resourceNames: Iterable[str]
+        :return: True in such case.
+        :rtype: bool
+        """
+        names = list(resourceNames)
+        if not names or self._counts[digest] < len(names):
+            return False
+        if self.runs_only(digest):
+            digests = self._digests
+            return all(name in digests for name in names)
+        return all(self._digests.get(name, None) == digest for name in names)
+
+    def runs_only(self, digest: str) -> bool:
+        """
+        Checks whether every resource recorded for the stack runs given digest.
+        It's kept up to date by record() and forget(), so it takes constant time.
+        :param digest: The image digest.
+        :type digest: str
+        :return: True in such case.
+        :rtype: bool
+        """
+        return len(self._counts) == 1 and digest in self._counts
+
+    def record(self, resourceName: str, digest: str):
+        """
+        Records the digest a resource has been deployed with.
+        :param resourceName: The name of the resource.
+        :type resourceName: str
+        :param digest: The image digest.
+        :type digest: str
+        """
+        self.forget(resourceName)
+        self._digests[resourceName] = digest
+        self._counts[digest] += 1
+
+    def forget(self, resourceName: str):
+        """
+        Forgets a resource, for instance after removing it.
+        :param resourceName: The name of the resource.
+        :type resourceName: str
+        """
+        previous = self._digests.pop(resourceName, None)
+        if previous is not None:
+            self._counts[previous] -= 1
+            if self._counts[previous] == 0:
+                del self._counts[previous]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,221 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/docker_image_details_cache.py
+
+This script defines the DockerImageDetailsCache class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import OrderedDict
+from pythoneda.shared import BaseObject
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+
+class DockerImageDetailsCache(BaseObject):
+    """
+    Caches the details of Docker images.
+
+    Class name: DockerImageDetailsCache
+
+    Responsibilities:
+        - Keep the most recently used image details, until they expire.
+        - Share a single lookup among concurrent requests for the same image.
+        - Count hits, misses and coalesced requests.
+
+    Collaborators:
+        - pythoneda.shared.iac.RequestDockerImageDetails
+    """
+
+    def __init__(self, ttl: float = 60.0, maxSize: int = 256):
+        """
+        Creates a new DockerImageDetailsCache instance.
+        :param ttl: How long details are valid, in seconds.
+        :type ttl: float
+        :param maxSize: The maximum number of images.
+        :type maxSize: int
+        """
+        super().__init__()
+        self._ttl = ttl
+        self._max_size = maxSize
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    @property
+    def ttl(self) -> float:
+        """
+        Retrieves how long details are valid.
+        :return: Such time, in seconds.
+        :rtype: float
+        """
+        return self._ttl
+
+    @property
+    def max_size(self) -> int:
+        """
+        Retrieves the maximum number of images.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_size
+
+    @property
+    def hits(self) -> int:
+        """
+        Retrieves the number of requests served from the cache.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._hits
+
+    @property
+    def misses(self) -> int:
+        """
+        Retrieves the number of requests that triggered a lookup.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._misses
+
+    @property
+    def coalesced(self) -> int:
+        """
+        Retrieves the number of requests that waited for a lookup already in progress.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._coalesced
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Retrieves the cache metrics.
+        :return: The hits, misses, coalesced requests and current size.
+        :rtype: Dict[str, int]
+        """
+        return {
+            "hits": self._hits,
+            "misses": self._misses,
+            "coalesced": self._coalesced,
+            "size": len(self._entries),
+        }
+
+    async def get(
+        self,
+        reference: str,
+        digest: Optional[str],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Retrieves the details of an image, looking them up only if necessary.
+        Concurrent requests for the same image share a single lookup, which keeps
+        running, and gets cached, even if the request that started it is cancelled.
+        :param reference: The image reference.
+        :type reference: str
+        :param digest: The image digest, if known.
+        :type digest: Optional[str]
+        :param fetch: The coroutine function that looks the details up.
+        :type fetch: Callable[[], Awaitable[Any]]
+        :return: The image details.
+        :rtype: Any
+        """
+        key = (reference, digest)
+        entry = self._entries.get(key, None)
+        if entry is not None:
+            expires_at, details = entry
+            if expires_at >= time.monotonic():
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return details
+            del self._entries[key]
+
+        in_flight = self._in_flight.get(key, None)
+        if in_flight is None:
+            self._misses += 1
+            in_flight = asyncio.ensure_future(self._fetch(key, fetch))
+            in_flight.add_done_callback(self.__class__._retrieve_outcome)
+            self._in_flight[key] = in_flight
+        else:
+            self._coalesced += 1
+        return await asyncio.shield(in_flight)
+
+    async def _fetch(
+        self, key: Tuple[str, Optional[str]], fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """
+        Looks the details of an image up, and caches them.
+        It runs as a task of its own, shared by all requests for the image, so
+        cancelling any of them, even the first one, doesn't affect the others.
+        :param key: The image reference and digest.
+        :type key: Tuple[str, Optional[str]]
+        :param fetch: The coroutine function that looks the details up.
+        :type fetch: Callable[[], Awaitable[Any]]
+        :return: The image details.
+        :rtype: Any
+        """
+        try:
+            details = await fetch()
+        finally:
+            del self._in_flight[key]
+        self._entries[key] = (time.monotonic() + self._ttl, details)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
+        return details
+
+    @classmethod
+    def _retrieve_outcome(cls, task: asyncio.Task):
+        """
+        Marks the error of a lookup as retrieved, in case all its requests were cancelled.
+        :param task: The lookup task.
+        :type task: asyncio.Task
+        """
+        if not task.cancelled():
+            task.exception()
+
+    def invalidate(self, reference: str, digest: Optional[str] = None):
+        """
+        Forgets the details of an image.
+        :param reference: The image reference.
+        :type reference: str
+        :param digest: The image digest. If None, all digests of the reference are forgotten.
+        :type digest: Optional[str]
+        """
+        for key in list(self._entries):
+            if key[0] == reference and (digest is None or key[1] == digest):
+                del self._entries[key]
+
+    def clear(self):
+        """
+        Forgets all image details, and resets the metrics.
+        """
+        self._entries.clear()
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,142 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/instrumentation.py
+
+This script defines the Instrumentation class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from contextlib import nullcontext
+from .metrics_sink import MetricsSink
+from pythoneda.shared import BaseObject
+import time
+from typing import ContextManager, Dict, Optional
+
+_DISABLED = nullcontext()
+
+
+class _Timer:
+    """
+    Measures the time spent within a with block, and reports it to a sink.
+    """
+
+    __slots__ = ("_sink", "_name", "_labels", "_started_at")
+
+    def __init__(self, sink: MetricsSink, name: str, labels: Dict[str, str]):
+        self._sink = sink
+        self._name = name
+        self._labels = labels
+        self._started_at = 0.0
+
+    def __enter__(self):
+        self._started_at = time.perf_counter()
+        return self
+
+    def __exit__(self, excType, excValue, traceback):
+        self._sink.observe(
+            self._name, time.perf_counter() - self._started_at, self._labels
+        )
+        if excType is not None:
+            self._sink.increment(f"{self._name}_errors", 1, self._labels)
+        return False
+
+
+class Instrumentation(BaseObject):
+    """
+    Opt-in instrumentation of the hot paths of stack runs.
+
+    Class name: Instrumentation
+
+    Responsibilities:
+        - Provide timers and counters reporting to the configured sink.
+        - Cost next to nothing while disabled.
+
+    Collaborators:
+        - pythoneda.shared.iac.MetricsSink
+    """
+
+    active = False
+
+    _sink = None
+
+    @classmethod
+    def enable(cls, sink: MetricsSink):
+        """
+        Enables instrumentation.
+        :param sink: The sink receiving the measurements.
+        :type sink: pythoneda.shared.iac.MetricsSink
+        """
+        Instrumentation._sink = sink
+        Instrumentation.active = True
+
+    @classmethod
+    def disable(cls):
+        """
+        Disables instrumentation.
+        """
+        Instrumentation.active = False
+        Instrumentation._sink = None
+
+    @classmethod
+    def sink(cls) -> Optional[MetricsSink]:
+        """
+        Retrieves the sink receiving the measurements.
+        :return: Such sink, or None if instrumentation is disabled.
+        :rtype: Optional[pythoneda.shared.iac.MetricsSink]
+        """
+        return Instrumentation._sink
+
+    @classmethod
+    def timer(cls, name: str, **labels) -> ContextManager:
+        """
+        Builds a context manager measuring the time spent within it.
+        Errors raised within it are counted as "<name>_errors".
+        :param name: The metric name.
+        :type name: str
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        :return: The timer, or a no-op context manager if instrumentation is disabled.
+        :rtype: ContextManager
+        """
+        sink = Instrumentation._sink
+        if sink is None:
+            return _DISABLED
+        return _Timer(sink, name, labels)
+
+    @classmethod
+    def increment(cls, name: str, value: float = 1, **labels):
+        """
+        Increments a counter, if instrumentation is enabled.
+        :param name: The metric name.
+        :type name: str
+        :param value: The increment.
+        :type value: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        sink = Instrumentation._sink
+        if sink is not None:
+            sink.increment(name, value, labels)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
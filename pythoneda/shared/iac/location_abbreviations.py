@@ -0,0 +1,172 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/location_abbreviations.py
+
+This script defines the LocationAbbreviations class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections.abc import Mapping
+from pythoneda.shared import BaseObject
+from types import MappingProxyType
+from typing import Dict, Iterator, Optional
+
+
+class LocationAbbreviations(BaseObject, Mapping):
+    """
+    Immutable index of location abbreviations.
+
+    Class name: LocationAbbreviations
+
+    Responsibilities:
+        - Map locations to their abbreviations in constant time.
+        - Ensure no two locations share the same abbreviation.
+        - Build extended indexes for specific providers.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+    """
+
+    def __init__(self, abbreviations: Dict[str, str]):
+        """
+        Creates a new LocationAbbreviations instance.
+        :param abbreviations: The abbreviation of each location.
+        :type abbreviations: Dict[str, str]
+        """
+        super().__init__()
+        self.__class__._check_collisions(abbreviations)
+        self._abbreviations = MappingProxyType(dict(abbreviations))
+
+    @classmethod
+    def _check_collisions(cls, abbreviations: Dict[str, str]):
+        """
+        Checks no abbreviation is used by more than one location.
+        :param abbreviations: The abbreviation of each location.
+        :type abbreviations: Dict[str, str]
+        """
+        locations_by_abbrev = {}
+        for location, abbrev in abbreviations.items():
+            previous = locations_by_abbrev.setdefault(abbrev, location)
+            if previous != location:
+                raise ValueError(
+                    f"Locations {previous} and {location} share the abbreviation {abbrev}"
+                )
+
+    def extend(self, abbreviations: Dict[str, str]) -> "LocationAbbreviations":
+        """
+        Builds a new index with additional locations, typically for a given provider.
+        :param abbreviations: The abbreviation of each new location.
+        :type abbreviations: Dict[str, str]
+        :return: The extended index.
+        :rtype: pythoneda.shared.iac.LocationAbbreviations
+        """
+        for location, abbrev in abbreviations.items():
+            current = self._abbreviations.get(location, None)
+            if current is not None and current != abbrev:
+                raise ValueError(
+                    f"Location {location} is already abbreviated as {current}"
+                )
+        merged = dict(self._abbreviations)
+        merged.update(abbreviations)
+        return self.__class__(merged)
+
+    def get(self, location: str, default: Optional[str] = None) -> Optional[str]:
+        """
+        Retrieves the abbreviation of given location.
+        :param location: The location.
+        :type location: str
+        :param default: The value to return if the location is unknown.
+        :type default: str
+        :return: The abbreviation, or the default value.
+        :rtype: str
+        """
+        return self._abbreviations.get(location, default)
+
+    def __getitem__(self, location: str) -> str:
+        """
+        Retrieves the abbreviation of given location.
+        :param location: The location.
+        :type location: str
+        :return: The abbreviation.
+        :rtype: str
+        """
+        return self._abbreviations[location]
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Iterates over the known locations.
+        :return: An iterator.
+        :rtype: Iterator[str]
+        """
+        return iter(self._abbreviations)
+
+    def __len__(self) -> int:
+        """
+        Retrieves the number of known locations.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._abbreviations)
+
+
+AZURE_LOCATION_ABBREVIATIONS = LocationAbbreviations(
+    {
+        "australiaeast": "aue",
+        "australiasoutheast": "ause",
+        "brazilsouth": "brs",
+        "canadacentral": "cac",
+        "canadaeast": "cae",
+        "centralindia": "inc",
+        "centralus": "cus",
+        "eastasia": "ea",
+        "eastus": "eus",
+        "eastus2": "eus2",
+        "francecentral": "frc",
+        "germanywestcentral": "gwc",
+        "italynorth": "itn",
+        "japaneast": "jpe",
+        "japanwest": "jpw",
+        "koreacentral": "krc",
+        "northcentralus": "ncus",
+        "northeurope": "neu",
+        "norwayeast": "nwe",
+        "polandcentral": "plc",
+        "southafricanorth": "san",
+        "southcentralus": "scus",
+        "southeastasia": "sea",
+        "southindia": "ins",
+        "spaincentral": "spc",
+        "swedencentral": "sdc",
+        "switzerlandnorth": "szn",
+        "uaenorth": "uan",
+        "uksouth": "uks",
+        "ukwest": "ukw",
+        "westcentralus": "wcus",
+        "westeurope": "weu",
+        "westus": "wus",
+        "westus2": "wus2",
+        "westus3": "wus3",
+    }
+)
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,106 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/logging_metrics_sink.py
+
+This script defines the LoggingMetricsSink class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import logging
+from .metrics_sink import MetricsSink
+from typing import Dict
+
+
+class LoggingMetricsSink(MetricsSink):
+    """
+    Logs measurements.
+
+    Class name: LoggingMetricsSink
+
+    Responsibilities:
+        - Log each timing and counter increment.
+
+    Collaborators:
+        - pythoneda.shared.iac.MetricsSink
+    """
+
+    def __init__(self, level: int = logging.DEBUG):
+        """
+        Creates a new LoggingMetricsSink instance.
+        :param level: The logging level.
+        :type level: int
+        """
+        super().__init__()
+        self._level = level
+
+    @property
+    def level(self) -> int:
+        """
+        Retrieves the logging level.
+        :return: Such level.
+        :rtype: int
+        """
+        return self._level
+
+    def observe(self, name: str, seconds: float, labels: Dict[str, str]):
+        """
+        Logs a timing.
+        :param name: The metric name.
+        :type name: str
+        :param seconds: The elapsed time, in seconds.
+        :type seconds: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        self.__class__.logger().log(
+            self._level, f"{name}{self._format(labels)} took {seconds:.6f}s"
+        )
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Logs a counter increment.
+        :param name: The metric name.
+        :type name: str
+        :param value: The increment.
+        :type value: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        self.__class__.logger().log(
+            self._level, f"{name}{self._format(labels)} += {value}"
+        )
+
+    def _format(self, labels: Dict[str, str]) -> str:
+        """
+        Formats the labels.
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        :return: The formatted labels.
+        :rtype: str
+        """
+        if not labels:
+            return ""
+        return "{" + ", ".join(f"{k}={v}" for k, v in sorted(labels.items())) + "}"
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
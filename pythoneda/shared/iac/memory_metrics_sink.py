@@ -0,0 +1,134 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/memory_metrics_sink.py
+
+This script defines the MemoryMetricsSink class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .metrics_sink import MetricsSink
+import threading
+from typing import Dict, FrozenSet, List, Tuple
+
+
+class MemoryMetricsSink(MetricsSink):
+    """
+    Keeps measurements in memory.
+
+    Class name: MemoryMetricsSink
+
+    Responsibilities:
+        - Keep all timings and counter values, to be inspected afterwards.
+
+    Collaborators:
+        - pythoneda.shared.iac.MetricsSink
+    """
+
+    def __init__(self):
+        """
+        Creates a new MemoryMetricsSink instance.
+        """
+        super().__init__()
+        self._timings = {}
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def key_for(
+        cls, name: str, labels: Dict[str, str]
+    ) -> Tuple[str, FrozenSet[Tuple[str, str]]]:
+        """
+        Builds the key of a metric.
+        :param name: The metric name.
+        :type name: str
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        :return: The key.
+        :rtype: Tuple[str, FrozenSet[Tuple[str, str]]]
+        """
+        return (name, frozenset(labels.items()))
+
+    def observe(self, name: str, seconds: float, labels: Dict[str, str]):
+        """
+        Records a timing.
+        :param name: The metric name.
+        :type name: str
+        :param seconds: The elapsed time, in seconds.
+        :type seconds: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        key = self.__class__.key_for(name, labels)
+        with self._lock:
+            self._timings.setdefault(key, []).append(seconds)
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Increments a counter.
+        :param name: The metric name.
+        :type name: str
+        :param value: The increment.
+        :type value: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        key = self.__class__.key_for(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def timings(self, name: str, **labels) -> List[float]:
+        """
+        Retrieves the timings of a metric.
+        :param name: The metric name.
+        :type name: str
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        :return: The timings, in seconds.
+        :rtype: List[float]
+        """
+        with self._lock:
+            return list(self._timings.get(self.__class__.key_for(name, labels), []))
+
+    def counter(self, name: str, **labels) -> float:
+        """
+        Retrieves the value of a counter.
+        :param name: The metric name.
+        :type name: str
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        :return: The value.
+        :rtype: float
+        """
+        with self._lock:
+            return self._counters.get(self.__class__.key_for(name, labels), 0)
+
+    def clear(self):
+        """
+        Discards all measurements.
+        """
+        with self._lock:
+            self._timings.clear()
+            self._counters.clear()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,111 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/memory_resource_lookup_cache.py
+
+This script defines the MemoryResourceLookupCache class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import OrderedDict
+from .resource_lookup_cache import ResourceLookupCache
+import threading
+import time
+from typing import Any, Tuple
+
+
+class MemoryResourceLookupCache(ResourceLookupCache):
+    """
+    In-process cache of Resource.from_id lookups.
+
+    Class name: MemoryResourceLookupCache
+
+    Responsibilities:
+        - Keep the most recently used resources in memory, until they expire.
+
+    Collaborators:
+        - pythoneda.shared.iac.ResourceLookupCache
+    """
+
+    def __init__(self, ttl: float = 300.0, maxSize: int = 1024):
+        """
+        Creates a new MemoryResourceLookupCache instance.
+        :param ttl: How long entries are valid, in seconds.
+        :type ttl: float
+        :param maxSize: The maximum number of entries.
+        :type maxSize: int
+        """
+        super().__init__(ttl, maxSize)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        """
+        Retrieves a cached resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :return: The resource, or ResourceLookupCache.MISSING.
+        :rtype: Any
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return self.MISSING
+            expires_at, resource = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return self.MISSING
+            self._entries.move_to_end(key)
+            return resource
+
+    def put(self, key: Tuple[str, str], resource: Any):
+        """
+        Caches a resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :param resource: The resource.
+        :type resource: Any
+        """
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, resource)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key: Tuple[str, str]):
+        """
+        Forgets a cached resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        """
+        Forgets all cached resources.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,80 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/metrics_sink.py
+
+This script defines the MetricsSink class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+from pythoneda.shared import BaseObject
+from typing import Dict
+
+
+class MetricsSink(BaseObject, abc.ABC):
+    """
+    Receives the measurements of the instrumented code.
+
+    Class name: MetricsSink
+
+    Responsibilities:
+        - Record timings and counters.
+
+    Collaborators:
+        - pythoneda.shared.iac.Instrumentation
+    """
+
+    def __init__(self):
+        """
+        Creates a new MetricsSink instance.
+        """
+        super().__init__()
+
+    @abc.abstractmethod
+    def observe(self, name: str, seconds: float, labels: Dict[str, str]):
+        """
+        Records a timing.
+        :param name: The metric name.
+        :type name: str
+        :param seconds: The elapsed time, in seconds.
+        :type seconds: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        pass
+
+    @abc.abstractmethod
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Increments a counter.
+        :param name: The metric name.
+        :type name: str
+        :param value: The increment.
+        :type value: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        pass
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,160 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/prometheus_text_file_metrics_sink.py
+
+This script defines the PrometheusTextFileMetricsSink class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .metrics_sink import MetricsSink
+import os
+import threading
+import time
+from typing import Dict
+
+
+class PrometheusTextFileMetricsSink(MetricsSink):
+    """
+    Writes measurements to a file in the Prometheus text exposition format.
+
+    Class name: PrometheusTextFileMetricsSink
+
+    Responsibilities:
+        - Aggregate timings as summaries (count and sum) and counters as totals.
+        - Write them periodically to a file, e.g. for node_exporter's textfile collector.
+
+    Collaborators:
+        - pythoneda.shared.iac.MetricsSink
+    """
+
+    def __init__(self, path: str, flushInterval: float = 10.0):
+        """
+        Creates a new PrometheusTextFileMetricsSink instance.
+        :param path: The path of the file.
+        :type path: str
+        :param flushInterval: The minimum time between writes, in seconds.
+        :type flushInterval: float
+        """
+        super().__init__()
+        self._path = path
+        self._flush_interval = flushInterval
+        self._summaries = {}
+        self._counters = {}
+        self._flushed_at = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the path of the file.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    def observe(self, name: str, seconds: float, labels: Dict[str, str]):
+        """
+        Records a timing.
+        :param name: The metric name.
+        :type name: str
+        :param seconds: The elapsed time, in seconds.
+        :type seconds: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            count, total = self._summaries.get(key, (0, 0.0))
+            self._summaries[key] = (count + 1, total + seconds)
+        self._flush_if_due()
+
+    def increment(self, name: str, value: float, labels: Dict[str, str]):
+        """
+        Increments a counter.
+        :param name: The metric name.
+        :type name: str
+        :param value: The increment.
+        :type value: float
+        :param labels: The labels.
+        :type labels: Dict[str, str]
+        """
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+        self._flush_if_due()
+
+    def _flush_if_due(self):
+        """
+        Writes the file if the flush interval has elapsed.
+        """
+        if time.monotonic() - self._flushed_at >= self._flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes the file, atomically.
+        """
+        with self._lock:
+            self._flushed_at = time.monotonic()
+            lines = []
+            for (name, labels), (count, total) in sorted(self._summaries.items()):
+                metric = f"{name}_seconds"
+                lines.append(f"{metric}_count{self._format(labels)} {count}")
+                lines.append(f"{metric}_sum{self._format(labels)} {total}")
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}_total{self._format(labels)} {value}")
+        temporary = f"{self._path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write("\n".join(lines) + "\n")
+        os.replace(temporary, self._path)
+
+    def _format(self, labels: tuple) -> str:
+        """
+        Formats the labels.
+        :param labels: The sorted label items.
+        :type labels: tuple
+        :return: The formatted labels.
+        :rtype: str
+        """
+        if not labels:
+            return ""
+        return (
+            "{"
+            + ",".join(f'{key}="{self._escape(value)}"' for key, value in labels)
+            + "}"
+        )
+
+    def _escape(self, value: str) -> str:
+        """
+        Escapes a label value.
+        :param value: The value.
+        :type value: str
+        :return: The escaped value.
+        :rtype: str
+        """
+        return (
+            str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
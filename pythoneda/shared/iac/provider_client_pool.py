@@ -0,0 +1,262 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/provider_client_pool.py
+
+This script defines the ProviderClientPool class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from contextlib import asynccontextmanager
+from pythoneda.shared import BaseObject
+import time
+from typing import Any, AsyncIterator, Callable, Tuple, Type
+
+
+class ProviderClientPool(BaseObject):
+    """
+    Pool of provider clients shared across stack operations.
+
+    Class name: ProviderClientPool
+
+    Responsibilities:
+        - Lend warm clients, creating new ones only when none is idle.
+        - Limit the number of clients.
+        - Discard clients that fail their health check, or stay idle for too long.
+        - Discard clients that raise connection or transport errors.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperation
+        - pythoneda.shared.iac.RegistryStackOperationFactory
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], Any],
+        maxSize: int = 8,
+        healthCheck: Callable[[Any], bool] = None,
+        idleTimeout: float = 300.0,
+        close: Callable[[Any], None] = None,
+        discardOn: Tuple[Type[BaseException], ...] = (OSError, asyncio.TimeoutError),
+    ):
+        """
+        Creates a new ProviderClientPool instance.
+        :param factory: The function creating new clients (sessions, credentials...).
+        :type factory: Callable[[], Any]
+        :param maxSize: The maximum number of clients, lent or idle.
+        :type maxSize: int
+        :param healthCheck: The function telling whether an idle client can be reused.
+        :type healthCheck: Callable[[Any], bool]
+        :param idleTimeout: How long a client can stay idle before it's discarded, in seconds.
+        :type idleTimeout: float
+        :param close: The function releasing the resources of a discarded client.
+        :type close: Callable[[Any], None]
+        :param discardOn: The errors that leave a client unusable, e.g. connection or
+        transport errors. Clients raising anything else are returned to the pool.
+        :type discardOn: Tuple[Type[BaseException], ...]
+        """
+        super().__init__()
+        if maxSize < 1:
+            raise ValueError("maxSize must be at least 1")
+        self._factory = factory
+        self._max_size = maxSize
+        self._health_check = healthCheck
+        self._idle_timeout = idleTimeout
+        self._close = close
+        self._discard_on = tuple(discardOn)
+        self._idle = deque()
+        self._size = 0
+        self._created = 0
+        self._available = None
+        self._loop = None
+
+    @property
+    def max_size(self) -> int:
+        """
+        Retrieves the maximum number of clients.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_size
+
+    @property
+    def discard_on(self) -> Tuple[Type[BaseException], ...]:
+        """
+        Retrieves the errors that make the pool discard a client.
+        :return: Such errors.
+        :rtype: Tuple[Type[BaseException], ...]
+        """
+        return self._discard_on
+
+    @property
+    def size(self) -> int:
+        """
+        Retrieves the number of clients, lent or idle.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._size
+
+    @property
+    def idle(self) -> int:
+        """
+        Retrieves the number of idle clients.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._idle)
+
+    @property
+    def created(self) -> int:
+        """
+        Retrieves how many clients have been created so far.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._created
+
+    def _condition(self) -> asyncio.Condition:
+        """
+        Retrieves the condition notified when a client becomes available.
+        asyncio primitives belong to the loop they're first used in, so a new one is
+        created when the pool is used from another loop, e.g. by another
+        asyncio.run(). The pool is meant to be used from one loop at a time, and
+        idle clients bound to a closed loop should fail the health check.
+        :return: Such condition.
+        :rtype: asyncio.Condition
+        """
+        loop = asyncio.get_running_loop()
+        if self._available is None or self._loop is not loop:
+            self._available = asyncio.Condition()
+            self._loop = loop
+        return self._available
+
+    async def acquire(self) -> Any:
+        """
+        Borrows a client, waiting while all of them are lent.
+        :return: The client.
+        :rtype: Any
+        """
+        available = self._condition()
+        async with available:
+            while True:
+                self.evict_idle()
+                while self._idle:
+                    client, _ = self._idle.pop()
+                    if self._health_check is None or self._health_check(client):
+                        return client
+                    self._discard(client)
+                if self._size < self._max_size:
+                    self._size += 1
+                    break
+                await available.wait()
+        try:
+            client = self._factory()
+        except BaseException:
+            async with available:
+                self._size -= 1
+                available.notify()
+            raise
+        self._created += 1
+        return client
+
+    async def release(self, client: Any):
+        """
+        Returns a borrowed client to the pool, discarding the ones idle for too long
+        in passing.
+        :param client: The client.
+        :type client: Any
+        """
+        available = self._condition()
+        async with available:
+            self.evict_idle()
+            self._idle.append((client, time.monotonic()))
+            available.notify()
+
+    async def discard(self, client: Any):
+        """
+        Returns a borrowed client that must not be reused, e.g. after a connection error.
+        :param client: The client.
+        :type client: Any
+        """
+        available = self._condition()
+        async with available:
+            self._discard(client)
+            available.notify()
+
+    @asynccontextmanager
+    async def client(self) -> AsyncIterator[Any]:
+        """
+        Borrows a client for the duration of a with block.
+        It's discarded if the block raises one of the discard_on errors, and returned
+        to the pool otherwise, cancellations and application errors included.
+        :return: The client.
+        :rtype: Any
+        """
+        client = await self.acquire()
+        try:
+            yield client
+        except self._discard_on:
+            await self.discard(client)
+            raise
+        except BaseException:
+            await self.release(client)
+            raise
+        await self.release(client)
+
+    def evict_idle(self):
+        """
+        Discards the clients idle for longer than the idle timeout.
+        The pool does it whenever a client is acquired or released; there's no
+        background task, so a pool nobody uses keeps its idle clients until this
+        or close() is called.
+        """
+        deadline = time.monotonic() - self._idle_timeout
+        while self._idle and self._idle[0][1] < deadline:
+            client, _ = self._idle.popleft()
+            self._discard(client)
+
+    def close(self):
+        """
+        Discards all idle clients.
+        """
+        while self._idle:
+            client, _ = self._idle.popleft()
+            self._discard(client)
+
+    def _discard(self, client: Any):
+        """
+        Forgets a client, releasing its resources.
+        :param client: The client.
+        :type client: Any
+        """
+        self._size -= 1
+        if self._close is not None:
+            try:
+                self._close(client)
+            except Exception as error:
+                self.__class__.logger().warning(f"Closing client failed: {error}")
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
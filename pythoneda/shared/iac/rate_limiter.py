@@ -0,0 +1,101 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/rate_limiter.py
+
+This script defines the RateLimiter class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared import BaseObject
+import time
+
+
+class RateLimiter(BaseObject):
+    """
+    Token-bucket rate limiter for coroutines.
+
+    Class name: RateLimiter
+
+    Responsibilities:
+        - Let callers through at a sustained rate, allowing short bursts.
+
+    Collaborators:
+        - None
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Creates a new RateLimiter instance.
+        :param rate: The sustained number of calls per second.
+        :type rate: float
+        :param burst: The maximum number of calls allowed at once.
+        :type burst: int
+        """
+        super().__init__()
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        if burst < 1:
+            raise ValueError("burst must be at least 1")
+        self._rate = rate
+        self._burst = burst
+        self._tokens = float(burst)
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    @property
+    def rate(self) -> float:
+        """
+        Retrieves the sustained number of calls per second.
+        :return: Such rate.
+        :rtype: float
+        """
+        return self._rate
+
+    @property
+    def burst(self) -> int:
+        """
+        Retrieves the maximum number of calls allowed at once.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._burst
+
+    async def acquire(self):
+        """
+        Waits until a call is allowed. Waiting callers are let through in order.
+        """
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._burst, self._tokens + (now - self._updated_at) * self._rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self._rate)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,209 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/registry_stack_operation_factory.py
+
+This script defines the RegistryStackOperationFactory class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import Event
+from .provider_client_pool import ProviderClientPool
+from .stack_operation import StackOperation
+from .stack_operation_factory import StackOperationFactory
+from typing import Any, Callable, Dict, Tuple, Type
+
+
+class RegistryStackOperationFactory(StackOperationFactory):
+    """
+    Creates stack operations from the operation classes registered per event type.
+
+    Class name: RegistryStackOperationFactory
+
+    Responsibilities:
+        - Keep the operation class registered for each event type.
+        - Resolve the operation class of an event through its type's MRO, once per type.
+        - Create and reuse the collaborators injected into the operations.
+        - Own the pool of provider clients shared by the operations.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperation
+        - pythoneda.shared.iac.ProviderClientPool
+    """
+
+    _operations = {}
+
+    _dispatch = {}
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Gives each subclass its own registrations and dispatch table.
+        :param kwargs: The class keyword arguments.
+        :type kwargs: Dict
+        """
+        super().__init_subclass__(**kwargs)
+        cls._operations = {}
+        cls._dispatch = {}
+
+    def __init__(
+        self,
+        collaborators: Dict[str, Callable[[], Any]] = None,
+        clientPool: ProviderClientPool = None,
+    ):
+        """
+        Creates a new RegistryStackOperationFactory instance.
+        :param collaborators: The builders of the collaborators operations can ask for, by name.
+        :type collaborators: Dict[str, Callable[[], Any]]
+        :param clientPool: The pool of provider clients, available as the "clientPool" collaborator.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
+        """
+        super().__init__()
+        self._collaborator_builders = dict(collaborators or {})
+        self._collaborators = {}
+        self._client_pool = clientPool
+        if clientPool is not None:
+            self._collaborators["clientPool"] = clientPool
+
+    @property
+    def client_pool(self) -> ProviderClientPool:
+        """
+        Retrieves the pool of provider clients owned by this factory.
+        :return: Such pool, or None.
+        :rtype: pythoneda.shared.iac.ProviderClientPool
+        """
+        return self._client_pool
+
+    @classmethod
+    def register(
+        cls,
+        eventType: Type[Event],
+        operationClass: Type[StackOperation],
+        *collaborators: str,
+    ):
+        """
+        Registers the operation class handling an event type, in this factory class.
+        Subclasses see it too, unless they register their own operation for the type.
+        Registrations are expected to happen before events are dispatched.
+        :param eventType: The event type.
+        :type eventType: Type[pythoneda.shared.Event]
+        :param operationClass: The operation class. Its constructor receives the event, and the collaborators as keyword arguments.
+        :type operationClass: Type[pythoneda.shared.iac.StackOperation]
+        :param collaborators: The names of the collaborators to inject.
+        :type collaborators: str
+        """
+        cls._operations[eventType] = (operationClass, collaborators)
+        cls._invalidate()
+
+    @classmethod
+    def _invalidate(cls):
+        """
+        Discards the resolved dispatch of this class and all its subclasses.
+        """
+        pending = [cls]
+        while pending:
+            factory_class = pending.pop()
+            factory_class._dispatch = {}
+            pending.extend(factory_class.__subclasses__())
+
+    @classmethod
+    def operation_for(
+        cls, eventType: Type[Event]
+    ) -> Tuple[Type[StackOperation], Tuple[str, ...]]:
+        """
+        Retrieves the operation class registered for an event type, or any of its bases.
+        For each of them, the registration of the closest factory class wins.
+        :param eventType: The event type.
+        :type eventType: Type[pythoneda.shared.Event]
+        :return: The operation class, and the names of its collaborators.
+        :rtype: Tuple[Type[pythoneda.shared.iac.StackOperation], Tuple[str, ...]]
+        """
+        result = cls._dispatch.get(eventType, None)
+        if result is None:
+            result = cls._resolve(eventType)
+            cls._dispatch[eventType] = result
+        return result
+
+    @classmethod
+    def _resolve(
+        cls, eventType: Type[Event]
+    ) -> Tuple[Type[StackOperation], Tuple[str, ...]]:
+        """
+        Looks the operation class of an event type up in the registrations of this
+        factory class and its bases.
+        :param eventType: The event type.
+        :type eventType: Type[pythoneda.shared.Event]
+        :return: The operation class, and the names of its collaborators.
+        :rtype: Tuple[Type[pythoneda.shared.iac.StackOperation], Tuple[str, ...]]
+        """
+        for base in eventType.__mro__:
+            for factory_class in cls.__mro__:
+                result = factory_class.__dict__.get("_operations", {}).get(base, None)
+                if result is not None:
+                    return result
+        raise ValueError(f"No operation registered for {eventType.__name__}")
+
+    def collaborator(self, name: str) -> Any:
+        """
+        Retrieves a collaborator, building it the first time.
+        :param name: The name of the collaborator.
+        :type name: str
+        :return: The collaborator.
+        :rtype: Any
+        """
+        result = self._collaborators.get(name, None)
+        if result is None:
+            builder = self._collaborator_builders.get(name, None)
+            if builder is None:
+                raise ValueError(f"Unknown collaborator: {name}")
+            result = builder()
+            self._collaborators[name] = result
+        return result
+
+    def prewarm(self):
+        """
+        Builds all collaborators in advance, so the first operations don't pay for it.
+        """
+        for name in self._collaborator_builders:
+            self.collaborator(name)
+
+    def new(self, event: Event) -> StackOperation:
+        """
+        Creates a new stack operation.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: A stack operation.
+        :rtype: pythoneda.shared.iac.StackOperation
+        """
+        cls = self.__class__
+        event_type = type(event)
+        entry = cls._dispatch.get(event_type, None)
+        if entry is None:
+            entry = cls.operation_for(event_type)
+        operation_class, collaborators = entry
+        if not collaborators:
+            return operation_class(event)
+        return operation_class(
+            event, **{name: self.collaborator(name) for name in collaborators}
+        )
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
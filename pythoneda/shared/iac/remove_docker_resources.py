@@ -25,6 +25,8 @@ from pythoneda.shared.iac.events import (
     DockerResourcesRemovalRequested,
     DockerResourcesRemoved,
 )
+from .docker_digest_index import DockerDigestIndex
+from .provider_client_pool import ProviderClientPool
 from .stack_operation import StackOperation
 from typing import Union
 
@@ -39,16 +41,27 @@ class RemoveDockerResources(StackOperation, abc.ABC):
         - Represent the action of removing Docker resources in a IaC stack.
 
     Collaborators:
-        - None
+        - pythoneda.shared.iac.DockerDigestIndex
     """
 
-    def __init__(self, event: DockerResourcesRemovalRequested):
+    def __init__(
+        self, event: DockerResourcesRemovalRequested, clientPool: ProviderClientPool = None
+    ):
         """
         Creates a new RemoveDockerResources instance.
         :param event: The event.
         :type event: pythoneda.shared.iac.events.DockerResourcesRemovalRequested]
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
         """
-        super().__init__(event)
+        super().__init__(event, clientPool)
+
+    def _before_perform(self):
+        """
+        Drops the index of deployed image digests of the stack, since its
+        resources won't be running them anymore.
+        """
+        DockerDigestIndex.discard(self.stack_key)
 
     @abc.abstractmethod
     async def perform(
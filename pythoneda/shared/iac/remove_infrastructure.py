@@ -24,8 +24,15 @@ from pythoneda.shared import Event
 from pythoneda.shared.iac.events import (
     InfrastructureRemovalRequested,
 )
+from .resource import Resource
+from .resource_progress import ResourceProgress
+from .resource_teardown import ResourceTeardown
+from .docker_digest_index import DockerDigestIndex
+from .provider_client_pool import ProviderClientPool
 from .stack_operation import StackOperation
-from typing import List
+from .stack_plan import StackPlan
+from .teardown_result import TeardownResult
+from typing import Any, AsyncIterator, Dict, List, Type
 
 
 class RemoveInfrastructure(StackOperation, abc.ABC):
@@ -36,27 +43,117 @@ class RemoveInfrastructure(StackOperation, abc.ABC):
 
     Responsibilities:
         - Represent the action of removing the infrastructure of a IaC stack.
+        - Delete the declared resources, reporting the progress of each one.
 
     Collaborators:
-        - None
+        - pythoneda.shared.iac.DockerDigestIndex
+        - pythoneda.shared.iac.ResourceTeardown
     """
 
-    def __init__(self, event: InfrastructureRemovalRequested):
+    def __init__(
+        self, event: InfrastructureRemovalRequested, clientPool: ProviderClientPool = None
+    ):
         """
         Creates a new RemoveInfrastructure instance.
         :param event: The event.
         :type event: pythoneda.shared.iac.events.InfrastructureRemovalRequested
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
         """
-        super().__init__(event)
+        super().__init__(event, clientPool)
 
-    @abc.abstractmethod
-    async def perform(self) -> List[Event]:
+    def _before_perform(self):
         """
-        Removes the stack.
-        :return: The list of events representing the outcome of the operation: InfrastructureRemoved/InfrastructureRemovalFailed.
+        Drops the index of deployed image digests of the stack, since its
+        resources won't be running them anymore.
+        """
+        DockerDigestIndex.discard(self.stack_key)
+
+    def _resource_removed(self, resourceClass: Type[Resource], id: str):
+        """
+        Notifies a resource has been deleted, so it's no longer served from the lookup cache.
+        :param resourceClass: The Resource subclass.
+        :type resourceClass: Type[pythoneda.shared.iac.Resource]
+        :param id: The id of the deleted resource.
+        :type id: str
+        """
+        resourceClass.forget_id(id)
+
+    def plan(self, previous: Dict[str, Dict[str, Any]] = None) -> StackPlan:
+        """
+        Computes the deletions perform() would apply, without calling any provider.
+        The resources are the ones _declare_resources() declares, lazily, so they
+        aren't created.
+        :param previous: The snapshot of the last known state, if any.
+        :type previous: Dict[str, Dict[str, Any]]
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        return StackPlan.for_removal(
+            self.stack_key, self._declare_resources(), previous
+        )
+
+    async def _remove_resources(
+        self, teardown: ResourceTeardown = None
+    ) -> AsyncIterator[ResourceProgress]:
+        """
+        Deletes the resources _declare_resources() declares, in reverse dependency
+        order, yielding the progress of each one as soon as it's done.
+        Afterwards, the TeardownResult is available as outcome, to be included in the
+        removal events.
+        :param teardown: The teardown engine to use, if not the default one.
+        :type teardown: pythoneda.shared.iac.ResourceTeardown
+        :return: An async iterator of the progress of each resource.
+        :rtype: AsyncIterator[pythoneda.shared.iac.ResourceProgress]
+        """
+        if teardown is None:
+            teardown = ResourceTeardown()
+        resources = self._declare_resources()
+        for resource in resources:
+            if resource not in self._resources:
+                self._resources.append(resource)
+        outcomes = []
+        async for resource, deleted, error in teardown._stream(resources):
+            outcomes.append((resource, deleted, error))
+            if error is not None:
+                action = ResourceProgress.FAILED
+            elif deleted:
+                action = ResourceProgress.REMOVED
+                if resource.resource_id is not None:
+                    self._resource_removed(resource.__class__, resource.resource_id)
+            else:
+                action = ResourceProgress.RETAINED
+            yield self._progress(resource, action, error)
+        self._outcome = teardown.__class__._result(resources, outcomes)
+
+    async def perform_stream(self) -> AsyncIterator[Event]:
+        """
+        Removes the stack, yielding the progress of each resource as soon as it's
+        deleted, and then the events of _removed_events().
+        Subclasses implementing perform() instead get its events.
+        :return: An async iterator of the events representing the progress and outcome.
+        :rtype: AsyncIterator[pythoneda.shared.Event]
+        """
+        if self.__class__._implements_perform():
+            async for event in super().perform_stream():
+                yield event
+            return
+        async for event in self._remove_resources():
+            yield event
+        for event in self._removed_events(self._outcome):
+            yield event
+
+    def _removed_events(self, result: TeardownResult) -> List[Event]:
+        """
+        Builds the events closing perform_stream() once the resources are deleted,
+        e.g. InfrastructureRemoved or InfrastructureRemovalFailed out of
+        result.to_dict(). None by default.
+        :param result: The outcome of the deletions.
+        :type result: pythoneda.shared.iac.TeardownResult
+        :return: The events.
         :rtype: List[pythoneda.shared.Event]
         """
-        pass
+        return []
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
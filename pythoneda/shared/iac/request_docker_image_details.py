@@ -20,12 +20,14 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
+from .docker_image_details_cache import DockerImageDetailsCache
+from .provider_client_pool import ProviderClientPool
 from .stack_operation import StackOperation
 from pythoneda.shared import Event
 from pythoneda.shared.iac.events import (
     DockerImageDetailsRequested,
 )
-from typing import Dict, List
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 
 
 class RequestDockerImageDetails(StackOperation, abc.ABC):
@@ -38,16 +40,42 @@ class RequestDockerImageDetails(StackOperation, abc.ABC):
         - Represent the action of asking for details of a Docker image.
 
     Collaborators:
-        - None
+        - pythoneda.shared.iac.DockerImageDetailsCache
     """
 
-    def __init__(self, event: DockerImageDetailsRequested):
+    image_details_cache = DockerImageDetailsCache()
+
+    def __init__(
+        self, event: DockerImageDetailsRequested, clientPool: ProviderClientPool = None
+    ):
         """
         Creates a new RequestDockerImageDetails instance.
         :param event: The event.
         :type event: pythoneda.shared.iac.events.DockerImageDetailsRequested
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
+        """
+        super().__init__(event, clientPool)
+
+    async def _image_details(
+        self,
+        reference: str,
+        digest: Optional[str],
+        fetch: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Retrieves the details of an image through the shared cache.
+        Concurrent requests for the same image share a single lookup.
+        :param reference: The image reference.
+        :type reference: str
+        :param digest: The image digest, if known.
+        :type digest: Optional[str]
+        :param fetch: The coroutine function that looks the details up.
+        :type fetch: Callable[[], Awaitable[Any]]
+        :return: The image details.
+        :rtype: Any
         """
-        super().__init__(event)
+        return await self.__class__.image_details_cache.get(reference, digest, fetch)
 
     @abc.abstractmethod
     async def perform(self) -> List[Event]:
@@ -20,14 +20,44 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 from pythoneda.shared import BaseObject
+from .instrumentation import Instrumentation
+from .location_abbreviations import LocationAbbreviations
 import abc
-from typing import Any, Dict
+from collections import deque
+import functools
+import hashlib
+import inspect
+import json
+import types
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import uuid
+
+_MISSING = object()
+
+_DATA_ATTRIBUTE = object()
+
+_NOTHING_DELEGATED = types.MappingProxyType({})
+
+_STABLE_ATTRIBUTE_TYPES = (
+    types.FunctionType,
+    types.BuiltinFunctionType,
+    types.MethodDescriptorType,
+    staticmethod,
+    classmethod,
+)
 
 
 class Resource(BaseObject, abc.ABC):
     """
     Infrastructure resource.
 
+    Its state lives in __slots__, and dependencies are resolved from the
+    dependencies mapping instead of being copied onto the instance.
+    BaseObject declares no slots, so instances still get a __dict__, but CPython
+    only allocates it once an attribute is stored in it. Subclasses keep it that
+    way by declaring __slots__ too, empty when they have no state of their own.
+    The cache of delegated lookups is only allocated on the first delegation.
+
     Class name: Resource
 
     Responsibilities:
@@ -38,12 +68,35 @@ class Resource(BaseObject, abc.ABC):
         - None
     """
 
+    __slots__ = (
+        "_stack_name",
+        "_project_name",
+        "_location",
+        "_dependencies",
+        "_actual_resource",
+        "_materialized",
+        "_delegated",
+    )
+
+    name_cache_size = 4096
+
+    location_abbreviations = LocationAbbreviations({})
+
+    _stable_attributes = {}
+
+    _name_caches = {}
+
+    lookup_cache = None
+
+    shared_registry = None
+
     def __init__(
         self,
         stackName: str,
         projectName: str,
         location: str,
         dependencies: Dict[str, Any],
+        lazy: bool = False,
     ):
         """
         Creates a new Resource instance.
@@ -55,6 +108,8 @@ class Resource(BaseObject, abc.ABC):
         :type location: str
         :param dependencies: The dependencies.
         :type dependencies: Dict[str, Any]
+        :param lazy: Whether to defer creating the actual resource until it's needed.
+        :type lazy: bool
         """
         super().__init__()
         self._stack_name = stackName
@@ -62,10 +117,10 @@ class Resource(BaseObject, abc.ABC):
         self._location = location
         self._dependencies = dependencies
         self._actual_resource = None
-        for name, value in dependencies.items():
-            setattr(self, name, value)
-        self._actual_resource = self.create()
-        self._post_create(self._actual_resource)
+        self._materialized = False
+        self._delegated = _NOTHING_DELEGATED
+        if not lazy:
+            self.materialize()
 
     @property
     def stack_name(self) -> str:
@@ -106,16 +161,204 @@ class Resource(BaseObject, abc.ABC):
     @property
     def actual_resource(self) -> Any:
         """
-        Retrieves the actual resource.
+        Retrieves the actual resource, creating it if it's not available yet.
+        :return: The actual resource.
+        :rtype: Any
+        """
+        if not self._materialized:
+            self.materialize()
+        return self._actual_resource
+
+    @property
+    def resource_id(self) -> Optional[str]:
+        """
+        Retrieves the provider id of the actual resource, through _resource_id().
+        Without an id, StackSnapshot records none for the resource, so it has to be
+        looked up again with from_id(), and RemoveInfrastructure can't drop it from
+        the lookup_cache, where it stays until it expires.
+        :return: The id, or None if the resource hasn't been created or has no known id.
+        :rtype: Optional[str]
+        """
+        if not self._materialized:
+            return None
+        result = self._resource_id(self._actual_resource)
+        return result if isinstance(result, str) else None
+
+    def _resource_id(self, resource: Any) -> Optional[str]:
+        """
+        Retrieves the provider id of the actual resource.
+        By default, it's its "id" attribute, if it's a plain string. Subclasses whose
+        ids are provider outputs, e.g. Pulumi's Output[str], override it to return
+        the resolved value, for instance one captured in _post_create().
+        :param resource: The actual resource.
+        :type resource: Any
+        :return: The id, or None if it's not known.
+        :rtype: Optional[str]
+        """
+        result = getattr(resource, "id", None)
+        return result if isinstance(result, str) else None
+
+    @property
+    def upstream(self) -> List["Resource"]:
+        """
+        Retrieves the dependencies that are resources themselves.
+        :return: Such resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return [
+            value for value in self._dependencies.values() if isinstance(value, Resource)
+        ]
+
+    @classmethod
+    def dependency_order(cls, resources: Iterable["Resource"]) -> List["Resource"]:
+        """
+        Sorts given resources so that dependencies come before the resources depending on them.
+        Dependencies not included in the given resources are ignored.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: The sorted resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        resources = list(resources)
+        included = {id(resource) for resource in resources}
+        pending = {}
+        downstream = {id(resource): [] for resource in resources}
+        for resource in resources:
+            upstream = [dep for dep in resource.upstream if id(dep) in included]
+            pending[id(resource)] = len(upstream)
+            for dep in upstream:
+                downstream[id(dep)].append(resource)
+
+        ready = deque(resource for resource in resources if pending[id(resource)] == 0)
+        result = []
+        while ready:
+            resource = ready.popleft()
+            result.append(resource)
+            for dependent in downstream[id(resource)]:
+                pending[id(dependent)] -= 1
+                if pending[id(dependent)] == 0:
+                    ready.append(dependent)
+
+        if len(result) != len(resources):
+            raise ValueError("Dependency cycle among resources")
+        return result
+
+    @property
+    def is_materialized(self) -> bool:
+        """
+        Checks whether the actual resource has been created already.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self._materialized
+
+    def materialize(self) -> Any:
+        """
+        Creates the actual resource, unless it's been created already.
+        Classes with a shared_registry reuse the actual resource another instance
+        with the same name created before.
+        It's not meant to be called concurrently on the same instance.
         :return: The actual resource.
         :rtype: Any
         """
+        if not self._materialized:
+            registry = self.__class__.shared_registry
+            if registry is None:
+                self._create_actual_resource()
+            else:
+                registry.acquire(self)
         return self._actual_resource
 
+    def _create_actual_resource(self) -> Any:
+        """
+        Creates the actual resource, and runs the post-create hook.
+        :return: The actual resource.
+        :rtype: Any
+        """
+        resource_class = self.__class__.__name__
+        with Instrumentation.timer("iac_resource_create", resource=resource_class):
+            actual_resource = self.create()
+        self._replace_actual_resource(actual_resource)
+        with Instrumentation.timer("iac_resource_post_create", resource=resource_class):
+            self._post_create(self._actual_resource)
+        return self._actual_resource
+
+    def _replace_actual_resource(self, resource: Any):
+        """
+        Sets the actual resource, discarding the attributes delegated to the previous one.
+        :param resource: The actual resource.
+        :type resource: Any
+        """
+        self._actual_resource = resource
+        self._materialized = True
+        self._delegated = _NOTHING_DELEGATED
+
     @classmethod
     def name_for(cls, stackName: str, projectName: str, location: str) -> str:
         """
         Builds the resource name.
+        Names are cached per class, since they only depend on the parameters.
+        :param stackName: The name of the stack.
+        :type stackName: str
+        :param projectName: The name of the project.
+        :type projectName: str
+        :param location: The Azure location.
+        :type location: str
+        :return: The resource name.
+        :rtype: str
+        """
+        cache = Resource._name_caches.get(cls, None)
+        if cache is None:
+            cache = cls._name_cache()
+        if Instrumentation.active:
+            with Instrumentation.timer("iac_resource_name_for", resource=cls.__name__):
+                return cache(stackName, projectName, location)
+        return cache(stackName, projectName, location)
+
+    @classmethod
+    def names_for_many(cls, coordinates: Iterable[Tuple[str, str, str]]) -> List[str]:
+        """
+        Builds the resource names for a batch of stacks.
+        :param coordinates: The (stack name, project name, location) tuples.
+        :type coordinates: Iterable[Tuple[str, str, str]]
+        :return: The resource names, in the same order.
+        :rtype: List[str]
+        """
+        cached = cls._name_cache()
+        return [
+            cached(stackName, projectName, location)
+            for stackName, projectName, location in coordinates
+        ]
+
+    @classmethod
+    def clear_name_cache(cls):
+        """
+        Discards the cached names of this class.
+        """
+        cache = Resource._name_caches.get(cls, None)
+        if cache is not None:
+            cache.cache_clear()
+
+    @classmethod
+    def _name_cache(cls) -> Callable[[str, str, str], str]:
+        """
+        Retrieves the bounded cache of names of this class, creating it if necessary.
+        Each subclass gets its own cache.
+        :return: The cached name builder.
+        :rtype: Callable[[str, str, str], str]
+        """
+        result = Resource._name_caches.get(cls, None)
+        if result is None:
+            result = functools.lru_cache(maxsize=cls.name_cache_size)(
+                cls._compute_name
+            )
+            Resource._name_caches[cls] = result
+        return result
+
+    @classmethod
+    def _compute_name(cls, stackName: str, projectName: str, location: str) -> str:
+        """
+        Builds the resource name, bypassing the cache.
         :param stackName: The name of the stack.
         :type stackName: str
         :param projectName: The name of the project.
@@ -133,6 +376,114 @@ class Resource(BaseObject, abc.ABC):
             cls.max_length,
         )
 
+    @property
+    def resource_name(self) -> str:
+        """
+        Retrieves the resource name, without creating the actual resource.
+        :return: The resource name.
+        :rtype: str
+        """
+        return self._build_name(self.stack_name, self.project_name, self.location)
+
+    @property
+    def content_hash(self) -> str:
+        """
+        Retrieves a stable hash of everything that shapes this resource: its class,
+        name inputs, configuration, and dependencies (recursively).
+        Opaque values in the configuration or the dependencies, e.g. provider objects,
+        are hashed by their provider id (see _describe_opaque()). The ones that can't be
+        described make the hash different every time, so the resource always counts as
+        changed. Subclasses can describe such values with plain data in
+        _configuration(), or override _describe_opaque().
+        :return: The hex digest.
+        :rtype: str
+        """
+        return self._content_hash({})
+
+    def _content_hash(self, memo: Dict[int, str]) -> str:
+        """
+        Computes the content hash, reusing the hashes of the dependencies already computed.
+        :param memo: The hashes already computed, by resource id().
+        :type memo: Dict[int, str]
+        :return: The hex digest.
+        :rtype: str
+        """
+        result = memo.get(id(self), None)
+        if result is None:
+            content = {
+                "class": f"{self.__class__.__module__}.{self.__class__.__qualname__}",
+                "stack_name": self.stack_name,
+                "project_name": self.project_name,
+                "location": self.location,
+                "configuration": self.__class__._hashable(self._configuration(), memo),
+                "dependencies": self.__class__._hashable(self.dependencies, memo),
+            }
+            result = hashlib.sha256(
+                json.dumps(content, sort_keys=True, separators=(",", ":")).encode(
+                    "utf-8"
+                )
+            ).hexdigest()
+            memo[id(self)] = result
+        return result
+
+    @classmethod
+    def _hashable(cls, value: Any, memo: Dict[int, str]) -> Any:
+        """
+        Converts a value to a JSON-serializable form suitable for content hashing.
+        Resources are replaced with their content hash, and opaque objects with their
+        type and _describe_opaque(). Opaque objects it can't describe get a random
+        nonce instead: neither their type nor their repr tells whether they changed,
+        so they must never match a recorded hash.
+        :param value: The value.
+        :type value: Any
+        :param memo: The hashes already computed, by resource id().
+        :type memo: Dict[int, str]
+        :return: The serializable form.
+        :rtype: Any
+        """
+        if isinstance(value, Resource):
+            return value._content_hash(memo)
+        if value is None or isinstance(value, (str, int, float, bool)):
+            return value
+        if isinstance(value, (list, tuple)):
+            return [cls._hashable(item, memo) for item in value]
+        if isinstance(value, dict):
+            return {str(key): cls._hashable(item, memo) for key, item in value.items()}
+        if isinstance(value, (set, frozenset)):
+            return sorted(
+                (cls._hashable(item, memo) for item in value),
+                key=lambda item: json.dumps(item, sort_keys=True),
+            )
+        if isinstance(value, bytes):
+            return value.hex()
+        description = cls._describe_opaque(value)
+        if description is None:
+            description = uuid.uuid4().hex
+        return [f"{type(value).__module__}.{type(value).__qualname__}", description]
+
+    @classmethod
+    def _describe_opaque(cls, value: Any) -> Any:
+        """
+        Describes an opaque value, e.g. a provider object, with plain data that only
+        changes when the value does. By default, provider objects are described by
+        their "id" attribute, if it's a plain string.
+        :param value: The value.
+        :type value: Any
+        :return: The description, or None if the value can't be described.
+        :rtype: Any
+        """
+        result = getattr(value, "id", None)
+        return result if isinstance(result, str) else None
+
+    def _configuration(self) -> Dict[str, Any]:
+        """
+        Retrieves the settings that shape the resource, besides its name and dependencies.
+        Subclasses override it so that configuration changes alter the content hash.
+        :return: The settings.
+        :rtype: Dict[str, Any]
+        """
+        return {}
+
     def create(self) -> Any:
         """
         Creates the resource.
@@ -160,6 +511,10 @@ class Resource(BaseObject, abc.ABC):
     def _location_abbrev(cls, location: str) -> str:
         """
         Abbreaviates the location.
+        Only used for locations not found in the location_abbreviations index.
+        Resource.location_abbreviations is empty, so unless a subclass overrides
+        it, e.g. with AZURE_LOCATION_ABBREVIATIONS, every location gets here and,
+        by default, is not abbreviated at all.
         :param location: The location.
         :type location: str
         :return: The abbreviated location.
@@ -183,6 +538,9 @@ class Resource(BaseObject, abc.ABC):
     ) -> str:
         """
         Builds the resource name prefix.
+        The location is abbreviated through the class' location_abbreviations,
+        which is empty in Resource: names only get shorter locations in subclasses
+        overriding it, or _location_abbrev().
         :param stackName: The name of the stack.
         :type stackName: str
         :param projectName: The name of the project.
@@ -196,7 +554,9 @@ class Resource(BaseObject, abc.ABC):
         :return: The resource name prefix.
         :rtype: str
         """
-        location_abbrev = cls._location_abbrev(location)
+        location_abbrev = cls.location_abbreviations.get(location)
+        if location_abbrev is None:
+            location_abbrev = cls._location_abbrev(location)
 
         # Calculate fixed lengths: stack initial, dots, and location abbreviation
         fixed_length = len(projectName) + len(location_abbrev) + 1  # stack name initial
@@ -244,6 +604,29 @@ class Resource(BaseObject, abc.ABC):
         """
         pass
 
+    def delete(self) -> bool:
+        """
+        Deletes the resource from the provider.
+        Classes with a shared_registry only delete it once no other stack uses it.
+        :return: False if it was kept for other stacks, True otherwise.
+        :rtype: bool
+        """
+        registry = self.__class__.shared_registry
+        if registry is not None and not registry.release(self):
+            return False
+        self._delete(self._actual_resource)
+        return True
+
+    def _delete(self, resource: Any):
+        """
+        Deletes the resource from the provider.
+        :param resource: The actual resource, or None if it's not been materialized.
+        :type resource: Any
+        """
+        raise NotImplementedError(
+            f"{self.__class__.__name__} does not support deletion"
+        )
+
     @classmethod
     @abc.abstractmethod
     def from_id(cls, id: str, name: str = None) -> Any:
@@ -258,15 +641,110 @@ class Resource(BaseObject, abc.ABC):
         """
         pass
 
+    @classmethod
+    def cached_from_id(cls, id: str, name: str = None) -> Any:
+        """
+        Retrieves an existing resource from its id, through the lookup_cache, if any.
+        :param id: The id.
+        :type id: str
+        :param name: The name.
+        :type name: str
+        :return resource: The resource.
+        :rtype resource: Any
+        """
+        cache = cls.lookup_cache
+        if cache is None:
+            return cls.from_id(id, name)
+        key = cache.key_for(cls, id)
+        result = cache.get(key)
+        if result is cache.MISSING:
+            result = cls.from_id(id, name)
+            if result is not None:
+                cache.put(key, result)
+        return result
+
+    @classmethod
+    def forget_id(cls, id: str):
+        """
+        Removes a resource from the lookup_cache, if any.
+        :param id: The id.
+        :type id: str
+        """
+        cache = cls.lookup_cache
+        if cache is not None:
+            cache.invalidate(cache.key_for(cls, id))
+
     def __getattr__(self, attr):
         """
-        Delegates attribute/method lookup to the wrapped instance.
+        Resolves dependencies by name, and delegates any other attribute/method
+        lookup to the wrapped instance.
+        How each attribute resolves is recorded per instance the first time, so later
+        lookups take a single dict access: methods are cached as bound objects, and
+        data attributes are read from the wrapped instance every time, since they can change.
+        :param attr: The attribute.
+        :type attr: str
+        :return: The attribute value.
+        :rtype: Any
+        """
+        if attr in _SLOT_NAMES:
+            # not initialized yet
+            raise AttributeError(attr)
+        dependencies = self._dependencies
+        if attr in dependencies:
+            return dependencies[attr]
+        result = self._delegated.get(attr, _MISSING)
+        if result is _DATA_ATTRIBUTE:
+            return getattr(self._actual_resource, attr)
+        if result is not _MISSING:
+            return result
+        return self._delegate(attr)
+
+    def _delegate(self, attr: str) -> Any:
+        """
+        Looks up an attribute in the wrapped instance, materializing it if needed,
+        and records how it resolves.
         :param attr: The attribute.
         :type attr: str
         :return: The attribute value.
         :rtype: Any
         """
-        return getattr(self._actual_resource, attr)
+        actual = self.materialize()
+        result = getattr(actual, attr)
+        delegated = self._delegated
+        if delegated is _NOTHING_DELEGATED:
+            delegated = {}
+            self._delegated = delegated
+        if Resource._is_stable_attribute(type(actual), attr) and attr not in getattr(
+            actual, "__dict__", ()
+        ):
+            delegated[attr] = result
+        else:
+            delegated[attr] = _DATA_ATTRIBUTE
+        return result
+
+    @classmethod
+    def _is_stable_attribute(cls, wrappedType: type, attr: str) -> bool:
+        """
+        Checks whether given attribute of the wrapped type resolves to the same
+        object every time, i.e. it's a method, so it can be cached per instance.
+        The outcome is cached per wrapped type.
+        :param wrappedType: The type of the actual resource.
+        :type wrappedType: type
+        :param attr: The attribute.
+        :type attr: str
+        :return: True in such case.
+        :rtype: bool
+        """
+        key = (wrappedType, attr)
+        result = cls._stable_attributes.get(key, None)
+        if result is None:
+            result = isinstance(
+                inspect.getattr_static(wrappedType, attr, None), _STABLE_ATTRIBUTE_TYPES
+            )
+            cls._stable_attributes[key] = result
+        return result
+
 
+_SLOT_NAMES = frozenset(Resource.__slots__)
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
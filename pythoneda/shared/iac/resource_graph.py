@@ -0,0 +1,322 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_graph.py
+
+This script defines the ResourceGraph class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections.abc import MutableSequence
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Type, Union
+
+
+class ResourceGraph(BaseObject, MutableSequence):
+    """
+    The resources of a stack, indexed by name, type and reverse dependency.
+
+    It's a MutableSequence, not a list: it supports indexing, slicing, append,
+    extend, insert, remove, pop and in-place +=, but neither `graph + list` nor
+    copy(); use list(graph) for those.
+
+    Class name: ResourceGraph
+
+    Responsibilities:
+        - Behave like the list of resources it replaces.
+        - Find resources by name, by class, and the ones depending on a resource, in constant time.
+        - Keep its indexes up to date as resources are added and removed.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+        - pythoneda.shared.iac.StackOperation
+    """
+
+    def __init__(self, resources: Iterable[Resource] = None):
+        """
+        Creates a new ResourceGraph instance.
+        :param resources: The initial resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        """
+        super().__init__()
+        self._resources = []
+        self._by_name = {}
+        self._by_type = {}
+        self._dependents = {}
+        self._members = {}
+        if resources is not None:
+            self.extend(resources)
+
+    def by_name(self, name: str) -> Optional[Resource]:
+        """
+        Retrieves the resource with given name.
+        :param name: The resource name, as built by Resource.name_for.
+        :type name: str
+        :return: The first resource added with such name, or None.
+        :rtype: Optional[pythoneda.shared.iac.Resource]
+        """
+        matches = self._by_name.get(name, None)
+        return matches[0] if matches else None
+
+    def of_type(
+        self, resourceClass: Type[Resource], exact: bool = False
+    ) -> List[Resource]:
+        """
+        Retrieves the resources of given class.
+        :param resourceClass: The class.
+        :type resourceClass: Type[pythoneda.shared.iac.Resource]
+        :param exact: Whether to leave out the instances of its subclasses.
+        :type exact: bool
+        :return: The resources, in the order they were added.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        if exact:
+            return list(self._by_type.get(resourceClass, ()))
+        result = []
+        for indexed_class, resources in self._by_type.items():
+            if issubclass(indexed_class, resourceClass):
+                result.extend(resources)
+        return result
+
+    def dependents_of(self, resource: Resource) -> List[Resource]:
+        """
+        Retrieves the resources depending directly on given one.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: The dependent resources, in the order they were added.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return list(self._dependents.get(id(resource), ()))
+
+    @classmethod
+    def _keys(cls, resource: Resource) -> Tuple[str, Type[Resource], List[Resource]]:
+        """
+        Reads the keys a resource is indexed by, so that nothing is modified when
+        that fails.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: Its name, class and upstream dependencies.
+        :rtype: Tuple[str, Type[pythoneda.shared.iac.Resource], List[pythoneda.shared.iac.Resource]]
+        """
+        return (resource.resource_name, resource.__class__, list(resource.upstream))
+
+    def _index(
+        self,
+        resource: Resource,
+        keys: Tuple[str, Type[Resource], List[Resource]],
+    ):
+        """
+        Adds a resource to the indexes.
+        Dependencies are read when the resource is added, and the same keys are used
+        to remove it.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :param keys: Its keys, as read by _keys().
+        :type keys: Tuple[str, Type[pythoneda.shared.iac.Resource], List[pythoneda.shared.iac.Resource]]
+        """
+        member = self._members.get(id(resource), None)
+        if member is None:
+            self._members[id(resource)] = [1, keys]
+        else:
+            member[0] += 1
+        name, resourceClass, upstream = keys
+        self._by_name.setdefault(name, []).append(resource)
+        self._by_type.setdefault(resourceClass, []).append(resource)
+        for dependency in upstream:
+            self._dependents.setdefault(id(dependency), []).append(resource)
+
+    def _unindex(self, resource: Resource):
+        """
+        Removes a resource from the indexes.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        """
+        member = self._members[id(resource)]
+        member[0] -= 1
+        if member[0] == 0:
+            del self._members[id(resource)]
+        name, resourceClass, upstream = member[1]
+        self.__class__._discard(self._by_name, name, resource)
+        self.__class__._discard(self._by_type, resourceClass, resource)
+        for dependency in upstream:
+            self.__class__._discard(self._dependents, id(dependency), resource)
+
+    @classmethod
+    def _discard(cls, index: Dict[Any, List[Resource]], key: Any, resource: Resource):
+        """
+        Removes a resource from an index entry, dropping the entry once empty.
+        :param index: The index.
+        :type index: Dict[Any, List[pythoneda.shared.iac.Resource]]
+        :param key: The key of the entry.
+        :type key: Any
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        """
+        entries = index.get(key, None)
+        if entries is None:
+            return
+        for position, entry in enumerate(entries):
+            if entry is resource:
+                del entries[position]
+                break
+        if not entries:
+            del index[key]
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Resource, List[Resource]]:
+        """
+        Retrieves the resource at given position.
+        :param index: The position, or a slice.
+        :type index: Union[int, slice]
+        :return: The resource, or a list of resources for slices.
+        :rtype: Union[pythoneda.shared.iac.Resource, List[pythoneda.shared.iac.Resource]]
+        """
+        return self._resources[index]
+
+    def __setitem__(
+        self, index: Union[int, slice], value: Union[Resource, Iterable[Resource]]
+    ):
+        """
+        Replaces the resource at given position.
+        :param index: The position, or a slice.
+        :type index: Union[int, slice]
+        :param value: The resource, or the resources for slices.
+        :type value: Union[pythoneda.shared.iac.Resource, Iterable[pythoneda.shared.iac.Resource]]
+        """
+        if isinstance(index, slice):
+            value = list(value)
+            keys = [self.__class__._keys(resource) for resource in value]
+            replaced = self._resources[index]
+            self._resources[index] = value
+        else:
+            keys = [self.__class__._keys(value)]
+            replaced = [self._resources[index]]
+            self._resources[index] = value
+            value = [value]
+        for resource in replaced:
+            self._unindex(resource)
+        for resource, resource_keys in zip(value, keys):
+            self._index(resource, resource_keys)
+
+    def __delitem__(self, index: Union[int, slice]):
+        """
+        Removes the resource at given position.
+        :param index: The position, or a slice.
+        :type index: Union[int, slice]
+        """
+        removed = self._resources[index]
+        del self._resources[index]
+        for resource in removed if isinstance(index, slice) else (removed,):
+            self._unindex(resource)
+
+    def __len__(self) -> int:
+        """
+        Retrieves the number of resources.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._resources)
+
+    def __iter__(self):
+        """
+        Iterates over the resources.
+        :return: An iterator.
+        :rtype: Iterator[pythoneda.shared.iac.Resource]
+        """
+        return iter(self._resources)
+
+    def __contains__(self, resource: Any) -> bool:
+        """
+        Checks whether given resource belongs to the graph.
+        :param resource: The resource.
+        :type resource: Any
+        :return: True in such case.
+        :rtype: bool
+        """
+        return id(resource) in self._members
+
+    def __eq__(self, other: Any) -> bool:
+        """
+        Compares the resources with those of another graph or list.
+        :param other: The other graph or list.
+        :type other: Any
+        :return: True if both contain the same resources, in the same order.
+        :rtype: bool
+        """
+        if isinstance(other, (ResourceGraph, list)):
+            return self._resources == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def insert(self, index: int, resource: Resource):
+        """
+        Inserts a resource at given position.
+        :param index: The position.
+        :type index: int
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        """
+        keys = self.__class__._keys(resource)
+        self._resources.insert(index, resource)
+        self._index(resource, keys)
+
+    def append(self, resource: Resource):
+        """
+        Adds a resource at the end.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        """
+        keys = self.__class__._keys(resource)
+        self._resources.append(resource)
+        self._index(resource, keys)
+
+    def clear(self):
+        """
+        Removes all resources.
+        """
+        self._resources.clear()
+        self._by_name.clear()
+        self._by_type.clear()
+        self._dependents.clear()
+        self._members.clear()
+
+    def sort(self, key: Callable[[Resource], Any] = None, reverse: bool = False):
+        """
+        Sorts the resources in place. Indexes are not affected.
+        :param key: The function extracting the comparison key.
+        :type key: Callable[[pythoneda.shared.iac.Resource], Any]
+        :param reverse: Whether to sort in descending order.
+        :type reverse: bool
+        """
+        self._resources.sort(key=key, reverse=reverse)
+
+    def __repr__(self) -> str:
+        """
+        Represents the graph as the list of its resources.
+        :return: The representation.
+        :rtype: str
+        """
+        return f"{self.__class__.__name__}({self._resources!r})"
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
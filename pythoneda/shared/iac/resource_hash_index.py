@@ -0,0 +1,146 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_hash_index.py
+
+This script defines the ResourceHashIndex class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import json
+import os
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from typing import Dict, Iterable, List
+
+
+class ResourceHashIndex(BaseObject):
+    """
+    Persisted content hashes of the resources applied successfully.
+
+    Class name: ResourceHashIndex
+
+    Responsibilities:
+        - Remember the content hash of each resource, by name.
+        - Tell which resources changed since they were last recorded.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+    """
+
+    def __init__(self, path: str = None, hashes: Dict[str, str] = None):
+        """
+        Creates a new ResourceHashIndex instance.
+        :param path: The JSON file the index is saved to, if any.
+        :type path: str
+        :param hashes: The content hash of each resource, by name.
+        :type hashes: Dict[str, str]
+        """
+        super().__init__()
+        self._path = path
+        self._hashes = dict(hashes or {})
+
+    @classmethod
+    def load(cls, path: str) -> "ResourceHashIndex":
+        """
+        Loads an index from a JSON file. A missing file means an empty index.
+        :param path: The path of the file.
+        :type path: str
+        :return: The index.
+        :rtype: pythoneda.shared.iac.ResourceHashIndex
+        """
+        hashes = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as file:
+                hashes = json.load(file)
+        return cls(path, hashes)
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the path of the JSON file.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    @property
+    def hashes(self) -> Dict[str, str]:
+        """
+        Retrieves the content hash of each resource, by name.
+        :return: Such hashes.
+        :rtype: Dict[str, str]
+        """
+        return self._hashes
+
+    def save(self):
+        """
+        Saves the index to its JSON file, atomically.
+        """
+        if self._path is None:
+            return
+        temporary = f"{self._path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self._hashes, file, sort_keys=True)
+        os.replace(temporary, self._path)
+
+    def changed(self, resources: Iterable[Resource]) -> List[Resource]:
+        """
+        Retrieves the resources whose content hash differs from the recorded one.
+        Since content hashes include the dependencies', a change upstream marks
+        all dependent resources as changed too. So do opaque values in the
+        configuration or dependencies that can't be described, e.g. provider objects
+        without a plain string id (see Resource.content_hash).
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: The changed resources, in the same order.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        memo = {}
+        return [
+            resource
+            for resource in resources
+            if self._hashes.get(resource.resource_name, None)
+            != resource._content_hash(memo)
+        ]
+
+    def record(self, resources: Iterable[Resource]):
+        """
+        Records the current content hash of given resources.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        """
+        memo = {}
+        for resource in resources:
+            self._hashes[resource.resource_name] = resource._content_hash(memo)
+
+    def forget(self, names: Iterable[str]):
+        """
+        Forgets the hashes of given resources.
+        :param names: The names of the resources.
+        :type names: Iterable[str]
+        """
+        for name in names:
+            self._hashes.pop(name, None)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,132 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_lookup_cache.py
+
+This script defines the ResourceLookupCache class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import abc
+from pythoneda.shared import BaseObject
+from typing import Any, Tuple
+
+
+class ResourceLookupCache(BaseObject, abc.ABC):
+    """
+    Caches the outcome of Resource.from_id lookups.
+
+    Class name: ResourceLookupCache
+
+    Responsibilities:
+        - Store existing resources retrieved from the provider, by id.
+        - Forget resources when they expire, or when they get removed.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+    """
+
+    MISSING = object()
+
+    def __init__(self, ttl: float = 300.0, maxSize: int = 1024):
+        """
+        Creates a new ResourceLookupCache instance.
+        :param ttl: How long entries are valid, in seconds.
+        :type ttl: float
+        :param maxSize: The maximum number of entries.
+        :type maxSize: int
+        """
+        super().__init__()
+        self._ttl = ttl
+        self._max_size = maxSize
+
+    @property
+    def ttl(self) -> float:
+        """
+        Retrieves how long entries are valid.
+        :return: Such time, in seconds.
+        :rtype: float
+        """
+        return self._ttl
+
+    @property
+    def max_size(self) -> int:
+        """
+        Retrieves the maximum number of entries.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_size
+
+    @classmethod
+    def key_for(cls, resourceClass: type, id: str) -> Tuple[str, str]:
+        """
+        Builds the key of a resource.
+        :param resourceClass: The Resource subclass.
+        :type resourceClass: type
+        :param id: The id of the resource.
+        :type id: str
+        :return: The key.
+        :rtype: Tuple[str, str]
+        """
+        return (f"{resourceClass.__module__}.{resourceClass.__qualname__}", id)
+
+    @abc.abstractmethod
+    def get(self, key: Tuple[str, str]) -> Any:
+        """
+        Retrieves a cached resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :return: The resource, or ResourceLookupCache.MISSING.
+        :rtype: Any
+        """
+        pass
+
+    @abc.abstractmethod
+    def put(self, key: Tuple[str, str], resource: Any):
+        """
+        Caches a resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :param resource: The resource.
+        :type resource: Any
+        """
+        pass
+
+    @abc.abstractmethod
+    def invalidate(self, key: Tuple[str, str]):
+        """
+        Forgets a cached resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        """
+        pass
+
+    @abc.abstractmethod
+    def clear(self):
+        """
+        Forgets all cached resources.
+        """
+        pass
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
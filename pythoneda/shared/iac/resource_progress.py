@@ -0,0 +1,151 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_progress.py
+
+This script defines the ResourceProgress class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import Event, primary_key_attribute
+from typing import Dict, List, Optional, Tuple
+
+
+class ResourceProgress(Event):
+    """
+    Represents the progress of a stack operation on one of its resources.
+
+    Class name: ResourceProgress
+
+    Responsibilities:
+        - Tell which resource of which stack was created, left unchanged, removed,
+          retained or failed.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperation
+    """
+
+    CREATED = "created"
+
+    REMOVED = "removed"
+
+    RETAINED = "retained"
+
+    UNCHANGED = "unchanged"
+
+    FAILED = "failed"
+
+    def __init__(
+        self,
+        stackKey: Tuple[str, str, str],
+        resourceName: str,
+        action: str,
+        resourceId: Optional[str] = None,
+        error: Optional[str] = None,
+        previousEventIds: List[str] = None,
+    ):
+        """
+        Creates a new ResourceProgress instance.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :param resourceName: The name of the resource.
+        :type resourceName: str
+        :param action: What happened (CREATED, UNCHANGED, REMOVED, RETAINED or FAILED).
+        :type action: str
+        :param resourceId: The provider id of the resource, if known.
+        :type resourceId: Optional[str]
+        :param error: The error, for failures.
+        :type error: Optional[str]
+        :param previousEventIds: The ids of the events this one follows, if any.
+        :type previousEventIds: List[str]
+        """
+        super().__init__(previousEventIds)
+        self._stack_key = tuple(stackKey)
+        self._resource_name = resourceName
+        self._action = action
+        self._resource_id = resourceId
+        self._error = error
+
+    @property
+    @primary_key_attribute
+    def stack_key(self) -> Tuple[str, str, str]:
+        """
+        Retrieves the key identifying the stack.
+        :return: The stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return self._stack_key
+
+    @property
+    @primary_key_attribute
+    def resource_name(self) -> str:
+        """
+        Retrieves the name of the resource.
+        :return: Such name.
+        :rtype: str
+        """
+        return self._resource_name
+
+    @property
+    @primary_key_attribute
+    def action(self) -> str:
+        """
+        Retrieves what happened to the resource.
+        :return: ResourceProgress.CREATED, UNCHANGED, REMOVED, RETAINED or FAILED.
+        :rtype: str
+        """
+        return self._action
+
+    @property
+    def resource_id(self) -> Optional[str]:
+        """
+        Retrieves the provider id of the resource.
+        :return: Such id, or None if it's not known.
+        :rtype: Optional[str]
+        """
+        return self._resource_id
+
+    @property
+    def error(self) -> Optional[str]:
+        """
+        Retrieves the error, for failures.
+        :return: Such error, or None.
+        :rtype: Optional[str]
+        """
+        return self._error
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        """
+        Summarizes the progress.
+        :return: The stack, resource, action, id and error.
+        :rtype: Dict[str, Optional[str]]
+        """
+        return {
+            "stack_key": list(self._stack_key),
+            "resource_name": self._resource_name,
+            "action": self._action,
+            "resource_id": self._resource_id,
+            "error": self._error,
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
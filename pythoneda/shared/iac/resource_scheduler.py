@@ -0,0 +1,431 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_scheduler.py
+
+This script defines the ResourceScheduler class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from .deadline_exceeded import DeadlineExceeded
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from .scheduled_resource import ScheduledResource
+import time
+from typing import Any, AsyncIterator, Dict, Iterable, List, Tuple, Type
+
+
+class ResourceScheduler(BaseObject):
+    """
+    Creates the resources of a stack following their dependency graph.
+
+    Class name: ResourceScheduler
+
+    Responsibilities:
+        - Build the dependency graph of the resources of a stack.
+        - Create independent resources concurrently, up to a given limit.
+        - Report the critical path of the last run.
+        - Enforce per-resource and per-run deadlines, reporting the partial progress.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+        - pythoneda.shared.iac.ScheduledResource
+    """
+
+    def __init__(
+        self,
+        stackName: str,
+        projectName: str,
+        location: str,
+        maxConcurrency: int = 8,
+        resourceTimeout: float = None,
+    ):
+        """
+        Creates a new ResourceScheduler instance.
+        :param stackName: The name of the stack.
+        :type stackName: str
+        :param projectName: The name of the project.
+        :type projectName: str
+        :param location: The Azure location.
+        :type location: str
+        :param maxConcurrency: The maximum number of resources created at the same time.
+        :type maxConcurrency: int
+        :param resourceTimeout: The maximum time to create each resource, in seconds.
+        :type resourceTimeout: float
+        """
+        super().__init__()
+        if maxConcurrency < 1:
+            raise ValueError("maxConcurrency must be at least 1")
+        self._stack_name = stackName
+        self._project_name = projectName
+        self._location = location
+        self._max_concurrency = maxConcurrency
+        self._resource_timeout = resourceTimeout
+        self._scheduled = {}
+        self._in_flight = set()
+        self._declared = {}
+
+    @property
+    def stack_name(self) -> str:
+        """
+        Retrieves the stack name.
+        :return: The name of the stack.
+        :rtype: str
+        """
+        return self._stack_name
+
+    @property
+    def project_name(self) -> str:
+        """
+        Retrieves the project name.
+        :return: The name of the project.
+        :rtype: str
+        """
+        return self._project_name
+
+    @property
+    def location(self) -> str:
+        """
+        Retrieves the Azure location.
+        :return: The Azure location.
+        :rtype: str
+        """
+        return self._location
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        Retrieves the maximum number of resources created at the same time.
+        :return: Such limit.
+        :rtype: int
+        """
+        return self._max_concurrency
+
+    @property
+    def resource_timeout(self) -> float:
+        """
+        Retrieves the maximum time to create each resource.
+        :return: Such time, in seconds, or None.
+        :rtype: float
+        """
+        return self._resource_timeout
+
+    @property
+    def scheduled(self) -> Dict[str, ScheduledResource]:
+        """
+        Retrieves the scheduled resources, by key.
+        :return: Such resources.
+        :rtype: Dict[str, pythoneda.shared.iac.ScheduledResource]
+        """
+        return self._scheduled
+
+    def add(
+        self,
+        key: str,
+        resourceClass: Type[Resource],
+        dependencies: Dict[str, Any] = None,
+    ) -> ScheduledResource:
+        """
+        Schedules the creation of a resource.
+        :param key: The key identifying the resource within this scheduler.
+        :type key: str
+        :param resourceClass: The Resource subclass to instantiate.
+        :type resourceClass: Type[pythoneda.shared.iac.Resource]
+        :param dependencies: The dependencies. Values that are ScheduledResource instances get replaced with the created resources.
+        :type dependencies: Dict[str, Any]
+        :return: The scheduled resource, to be used as dependency of others.
+        :rtype: pythoneda.shared.iac.ScheduledResource
+        """
+        return self._add(key, resourceClass, dependencies)
+
+    def _add(
+        self,
+        key: str,
+        resourceClass: Type[Resource],
+        dependencies: Dict[str, Any] = None,
+        declared: Resource = None,
+    ) -> ScheduledResource:
+        """
+        Schedules the creation of a resource, or the materialization of a declared one.
+        :param key: The key identifying the resource within this scheduler.
+        :type key: str
+        :param resourceClass: The Resource subclass.
+        :type resourceClass: Type[pythoneda.shared.iac.Resource]
+        :param dependencies: The dependencies.
+        :type dependencies: Dict[str, Any]
+        :param declared: The lazy resource to materialize, if any.
+        :type declared: pythoneda.shared.iac.Resource
+        :return: The scheduled resource.
+        :rtype: pythoneda.shared.iac.ScheduledResource
+        """
+        if key in self._scheduled:
+            raise ValueError(f"Resource {key} is already scheduled")
+        result = ScheduledResource(
+            key, resourceClass, dict(dependencies or {}), declared
+        )
+        for upstream in result.upstream:
+            if self._scheduled.get(upstream.key) is not upstream:
+                raise ValueError(
+                    f"Resource {key} depends on {upstream.key}, which is not scheduled here"
+                )
+        self._scheduled[key] = result
+        return result
+
+    def add_resource(self, resource: Resource, key: str = None) -> ScheduledResource:
+        """
+        Schedules materializing a resource declared lazily.
+        Its dependencies on resources scheduled here are waited for; other
+        dependencies are used as they are.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :param key: The key identifying the resource within this scheduler, if not its name.
+        :type key: str
+        :return: The scheduled resource, to be used as dependency of others.
+        :rtype: pythoneda.shared.iac.ScheduledResource
+        """
+        dependencies = {
+            name: self._declared.get(id(value), value)
+            for name, value in resource.dependencies.items()
+        }
+        result = self._add(
+            key or resource.resource_name, resource.__class__, dependencies, resource
+        )
+        self._declared[id(resource)] = result
+        return result
+
+    def add_resources(self, resources: Iterable[Resource]) -> List[ScheduledResource]:
+        """
+        Schedules materializing resources declared lazily, in dependency order.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: The scheduled resources.
+        :rtype: List[pythoneda.shared.iac.ScheduledResource]
+        """
+        return [
+            self.add_resource(resource)
+            for resource in Resource.dependency_order(resources)
+        ]
+
+    async def run(self, timeout: float = None) -> Dict[str, Resource]:
+        """
+        Creates all scheduled resources, as soon as their dependencies are available.
+        :param timeout: The maximum time to create all resources, in seconds.
+        :type timeout: float
+        :return: The created resources, by key, in dependency order.
+        :rtype: Dict[str, pythoneda.shared.iac.Resource]
+        """
+        order = self._topological_order()
+        async for _ in self.run_stream(timeout):
+            pass
+        return {node.key: node.resource for node in order}
+
+    async def run_stream(
+        self, timeout: float = None
+    ) -> AsyncIterator[ScheduledResource]:
+        """
+        Creates all scheduled resources, yielding each one as soon as it's created.
+        Each run starts afresh: the resources created by a previous run are forgotten,
+        and created again.
+        When a deadline passes, the remaining creations are cancelled and
+        DeadlineExceeded reports which resources were completed. Creations already
+        running in worker threads can't be interrupted: they complete in the background,
+        and the resources they create show up in the scheduled resources, but not in
+        the error.
+        :param timeout: The maximum time to create all resources, in seconds.
+        :type timeout: float
+        :return: An async iterator of the created scheduled resources, in completion order.
+        :rtype: AsyncIterator[pythoneda.shared.iac.ScheduledResource]
+        """
+        order = self._topological_order()
+        loop = asyncio.get_running_loop()
+        deadline = None if timeout is None else loop.time() + timeout
+        self._in_flight = set()
+        for node in order:
+            node._reset()
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency, thread_name_prefix="iac-resource"
+        )
+        tasks = {}
+
+        async def create(node: ScheduledResource) -> ScheduledResource:
+            await asyncio.gather(*[tasks[upstream.key] for upstream in node.upstream])
+            self._in_flight.add(node.key)
+            try:
+                await asyncio.wait_for(
+                    loop.run_in_executor(executor, self._create, node),
+                    self._resource_timeout,
+                )
+            except asyncio.TimeoutError:
+                raise self._deadline_exceeded(
+                    f"Creating {node.key} took more than {self._resource_timeout}s"
+                ) from None
+            self._in_flight.discard(node.key)
+            return node
+
+        try:
+            for node in order:
+                tasks[node.key] = asyncio.ensure_future(create(node))
+            for next_created in asyncio.as_completed(list(tasks.values())):
+                if deadline is None:
+                    yield await next_created
+                    continue
+                try:
+                    yield await asyncio.wait_for(
+                        next_created, max(0.0, deadline - loop.time())
+                    )
+                except DeadlineExceeded:
+                    raise
+                except asyncio.TimeoutError:
+                    raise self._deadline_exceeded(
+                        f"Creating the resources took more than {timeout}s"
+                    ) from None
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        finally:
+            executor.shutdown(wait=False)
+
+    def _deadline_exceeded(self, message: str) -> DeadlineExceeded:
+        """
+        Builds the error reporting the progress of the current run.
+        :param message: The error message.
+        :type message: str
+        :return: The error.
+        :rtype: pythoneda.shared.iac.DeadlineExceeded
+        """
+        completed = []
+        in_flight = []
+        pending = []
+        for node in self._topological_order():
+            if node.resource is not None:
+                completed.append(node.key)
+            elif node.key in self._in_flight:
+                in_flight.append(node.key)
+            else:
+                pending.append(node.key)
+        return DeadlineExceeded(message, completed, in_flight, pending)
+
+    def _create(self, node: ScheduledResource):
+        """
+        Instantiates, unless it's been declared, and materializes given scheduled
+        resource. Runs in a worker thread.
+        :param node: The scheduled resource.
+        :type node: pythoneda.shared.iac.ScheduledResource
+        """
+        started_at = time.perf_counter()
+        resource = node.declared
+        if resource is None:
+            resource = node.resource_class(
+                self._stack_name,
+                self._project_name,
+                self._location,
+                node.resolved_dependencies(),
+                lazy=True,
+            )
+        resource.materialize()
+        node._created(resource, started_at, time.perf_counter())
+
+    @property
+    def critical_path(self) -> List[str]:
+        """
+        Retrieves the chain of dependent resources that took the longest to create in the last run.
+        :return: The keys of the resources in the critical path, from the first created to the last.
+        :rtype: List[str]
+        """
+        return self._critical_path()[0]
+
+    @property
+    def critical_path_duration(self) -> float:
+        """
+        Retrieves the accumulated creation time of the critical path, in seconds.
+        :return: Such duration.
+        :rtype: float
+        """
+        return self._critical_path()[1]
+
+    def _critical_path(self) -> Tuple[List[str], float]:
+        """
+        Computes the critical path, based on the durations of the last run.
+        :return: A tuple with the keys of the critical path and its duration.
+        :rtype: Tuple[List[str], float]
+        """
+        longest = {}
+        previous = {}
+        for node in self._topological_order():
+            best = None
+            for upstream in node.upstream:
+                if best is None or longest[upstream.key] > longest[best]:
+                    best = upstream.key
+            previous[node.key] = best
+            longest[node.key] = node.duration + (
+                longest[best] if best is not None else 0.0
+            )
+
+        if not longest:
+            return [], 0.0
+
+        last = max(longest, key=longest.get)
+        path = []
+        current = last
+        while current is not None:
+            path.append(current)
+            current = previous[current]
+        path.reverse()
+        return path, longest[last]
+
+    def _topological_order(self) -> List[ScheduledResource]:
+        """
+        Sorts the scheduled resources so that dependencies come first.
+        :return: The scheduled resources.
+        :rtype: List[pythoneda.shared.iac.ScheduledResource]
+        """
+        pending = {key: len(node.upstream) for key, node in self._scheduled.items()}
+        downstream = {key: [] for key in self._scheduled}
+        for node in self._scheduled.values():
+            for upstream in node.upstream:
+                downstream[upstream.key].append(node)
+
+        ready = deque(
+            node for node in self._scheduled.values() if pending[node.key] == 0
+        )
+        result = []
+        while ready:
+            node = ready.popleft()
+            result.append(node)
+            for dependent in downstream[node.key]:
+                pending[dependent.key] -= 1
+                if pending[dependent.key] == 0:
+                    ready.append(dependent)
+
+        if len(result) != len(self._scheduled):
+            cyclic = sorted(key for key, count in pending.items() if count > 0)
+            raise ValueError(f"Dependency cycle among resources: {', '.join(cyclic)}")
+
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,276 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/resource_teardown.py
+
+This script defines the ResourceTeardown class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from .teardown_result import TeardownResult
+from typing import AsyncIterator, Iterable, List, Optional, Tuple, Type
+
+
+class ResourceTeardown(BaseObject):
+    """
+    Deletes the resources of a stack in reverse dependency order.
+
+    Class name: ResourceTeardown
+
+    Responsibilities:
+        - Delete resources only after everything depending on them is gone.
+        - Delete independent resources concurrently, up to a given limit.
+        - Retry transient failures with exponential backoff, and nothing else.
+        - Report partial failures, and the shared resources kept for other stacks.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+        - pythoneda.shared.iac.TeardownResult
+    """
+
+    def __init__(
+        self,
+        maxConcurrency: int = 4,
+        retries: int = 3,
+        backoff: float = 1.0,
+        maxBackoff: float = 30.0,
+        transientErrors: Tuple[Type[BaseException], ...] = (
+            ConnectionError,
+            TimeoutError,
+            asyncio.TimeoutError,
+        ),
+    ):
+        """
+        Creates a new ResourceTeardown instance.
+        :param maxConcurrency: The maximum number of resources deleted at the same time.
+        :type maxConcurrency: int
+        :param retries: How many times a failed deletion is retried.
+        :type retries: int
+        :param backoff: The delay before the first retry, in seconds. It doubles on each retry.
+        :type backoff: float
+        :param maxBackoff: The maximum delay between retries, in seconds.
+        :type maxBackoff: float
+        :param transientErrors: The errors worth retrying. Provider SDKs usually need
+        their own throttling or service-unavailable errors added.
+        :type transientErrors: Tuple[Type[BaseException], ...]
+        """
+        super().__init__()
+        if maxConcurrency < 1:
+            raise ValueError("maxConcurrency must be at least 1")
+        self._max_concurrency = maxConcurrency
+        self._retries = retries
+        self._backoff = backoff
+        self._max_backoff = maxBackoff
+        self._transient_errors = tuple(transientErrors)
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        Retrieves the maximum number of resources deleted at the same time.
+        :return: Such limit.
+        :rtype: int
+        """
+        return self._max_concurrency
+
+    @property
+    def retries(self) -> int:
+        """
+        Retrieves how many times a failed deletion is retried.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._retries
+
+    @property
+    def transient_errors(self) -> Tuple[Type[BaseException], ...]:
+        """
+        Retrieves the errors worth retrying.
+        :return: Such errors.
+        :rtype: Tuple[Type[BaseException], ...]
+        """
+        return self._transient_errors
+
+    async def run(self, resources: Iterable[Resource]) -> TeardownResult:
+        """
+        Deletes given resources, leaves first.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: The outcome.
+        :rtype: pythoneda.shared.iac.TeardownResult
+        """
+        resources = list(resources)
+        outcomes = [outcome async for outcome in self._stream(resources)]
+        return self.__class__._result(resources, outcomes)
+
+    @classmethod
+    def _result(
+        cls,
+        resources: List[Resource],
+        outcomes: List[Tuple[Resource, bool, Optional[BaseException]]],
+    ) -> TeardownResult:
+        """
+        Summarizes the outcomes of _stream().
+        :param resources: The resources to delete.
+        :type resources: List[pythoneda.shared.iac.Resource]
+        :param outcomes: The outcomes, as yielded by _stream().
+        :type outcomes: List[Tuple[pythoneda.shared.iac.Resource, bool, Optional[BaseException]]]
+        :return: The outcome.
+        :rtype: pythoneda.shared.iac.TeardownResult
+        """
+        removed = []
+        failed = {}
+        retained = []
+        for resource, deleted, error in outcomes:
+            if error is not None:
+                failed[resource.resource_name] = error
+            elif deleted:
+                removed.append(resource)
+            else:
+                retained.append(resource)
+
+        handled = {id(resource) for resource in removed + retained}
+        skipped = [
+            resource
+            for resource in reversed(Resource.dependency_order(resources))
+            if id(resource) not in handled and resource.resource_name not in failed
+        ]
+        return TeardownResult(removed, failed, skipped, retained)
+
+    async def stream(
+        self, resources: Iterable[Resource]
+    ) -> AsyncIterator[Tuple[Resource, Optional[BaseException]]]:
+        """
+        Deletes given resources, leaves first, yielding each one as soon as it's done.
+        Resources whose dependents could not be deleted are never attempted, nor yielded.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: An async iterator of each resource, along with the error if its deletion failed.
+        :rtype: AsyncIterator[Tuple[pythoneda.shared.iac.Resource, Optional[BaseException]]]
+        """
+        async for resource, _, error in self._stream(resources):
+            yield resource, error
+
+    async def _stream(
+        self, resources: Iterable[Resource]
+    ) -> AsyncIterator[Tuple[Resource, bool, Optional[BaseException]]]:
+        """
+        Deletes given resources, leaves first, yielding each one as soon as it's done.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: An async iterator of each resource, whether it was actually deleted
+        or kept for other stacks, and the error if its deletion failed.
+        :rtype: AsyncIterator[Tuple[pythoneda.shared.iac.Resource, bool, Optional[BaseException]]]
+        """
+        order = Resource.dependency_order(resources)
+        included = {id(resource) for resource in order}
+        dependents = {id(resource): 0 for resource in order}
+        for resource in order:
+            for upstream in resource.upstream:
+                if id(upstream) in included:
+                    dependents[id(upstream)] += 1
+
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(
+            max_workers=self._max_concurrency, thread_name_prefix="iac-teardown"
+        )
+        running = {}
+
+        def launch(resource: Resource):
+            task = asyncio.ensure_future(self._delete(resource, loop, executor))
+            running[task] = resource
+
+        try:
+            for resource in reversed(order):
+                if dependents[id(resource)] == 0:
+                    launch(resource)
+            while running:
+                done, _ = await asyncio.wait(
+                    running.keys(), return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    resource = running.pop(task)
+                    error = task.exception()
+                    deleted = error is None and task.result() is not False
+                    if error is None:
+                        for upstream in resource.upstream:
+                            if id(upstream) in included:
+                                dependents[id(upstream)] -= 1
+                                if dependents[id(upstream)] == 0:
+                                    launch(upstream)
+                    yield resource, deleted, error
+        except BaseException:
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            raise
+        finally:
+            executor.shutdown(wait=False)
+
+    async def _delete(
+        self,
+        resource: Resource,
+        loop: asyncio.AbstractEventLoop,
+        executor: ThreadPoolExecutor,
+    ) -> bool:
+        """
+        Deletes a resource, retrying transient failures.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :param loop: The running loop.
+        :type loop: asyncio.AbstractEventLoop
+        :param executor: The executor running the deletions.
+        :type executor: concurrent.futures.ThreadPoolExecutor
+        :return: False if it was kept for other stacks, True otherwise.
+        :rtype: bool
+        """
+        delay = self._backoff
+        attempt = 0
+        while True:
+            try:
+                return await loop.run_in_executor(executor, resource.delete)
+            except Exception as error:
+                if attempt >= self._retries or not self._is_transient(error):
+                    raise
+                self.__class__.logger().warning(
+                    f"Deleting {resource.resource_name} failed ({error}), retrying in {delay}s"
+                )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self._max_backoff)
+            attempt += 1
+
+    def _is_transient(self, error: Exception) -> bool:
+        """
+        Checks whether a deletion error is worth retrying. Only the transient_errors
+        are, so that bugs fail fast; subclasses can inspect errors further, e.g. status codes.
+        :param error: The error.
+        :type error: Exception
+        :return: True in such case.
+        :rtype: bool
+        """
+        return isinstance(error, self._transient_errors)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,179 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/scheduled_resource.py
+
+This script defines the ScheduledResource class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+from typing import Any, Dict, List, Type
+
+
+class ScheduledResource(BaseObject):
+    """
+    A resource waiting to be created by a ResourceScheduler.
+
+    Class name: ScheduledResource
+
+    Responsibilities:
+        - Describe a resource to create, and the scheduled resources it depends on.
+        - Hold the resource to materialize instead, if it's been declared already.
+        - Keep track of the created resource and how long it took.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+        - pythoneda.shared.iac.ResourceScheduler
+    """
+
+    def __init__(
+        self,
+        key: str,
+        resourceClass: Type,
+        dependencies: Dict[str, Any],
+        declared: Any = None,
+    ):
+        """
+        Creates a new ScheduledResource instance.
+        :param key: The key identifying the resource within the scheduler.
+        :type key: str
+        :param resourceClass: The Resource subclass to instantiate.
+        :type resourceClass: Type[pythoneda.shared.iac.Resource]
+        :param dependencies: The dependencies. Values can be other ScheduledResource instances.
+        :type dependencies: Dict[str, Any]
+        :param declared: The lazy resource to materialize, instead of instantiating one.
+        :type declared: pythoneda.shared.iac.Resource
+        """
+        super().__init__()
+        self._key = key
+        self._resource_class = resourceClass
+        self._dependencies = dependencies
+        self._declared = declared
+        self._resource = None
+        self._started_at = None
+        self._finished_at = None
+
+    @property
+    def key(self) -> str:
+        """
+        Retrieves the key.
+        :return: The key.
+        :rtype: str
+        """
+        return self._key
+
+    @property
+    def resource_class(self) -> Type:
+        """
+        Retrieves the resource class.
+        :return: The Resource subclass.
+        :rtype: Type[pythoneda.shared.iac.Resource]
+        """
+        return self._resource_class
+
+    @property
+    def dependencies(self) -> Dict[str, Any]:
+        """
+        Retrieves the dependencies.
+        :return: The dependencies.
+        :rtype: Dict[str, Any]
+        """
+        return self._dependencies
+
+    @property
+    def declared(self) -> Any:
+        """
+        Retrieves the lazy resource to materialize, if it's been declared already.
+        :return: Such resource, or None.
+        :rtype: pythoneda.shared.iac.Resource
+        """
+        return self._declared
+
+    @property
+    def upstream(self) -> List["ScheduledResource"]:
+        """
+        Retrieves the scheduled resources this one depends on.
+        :return: Such scheduled resources.
+        :rtype: List[pythoneda.shared.iac.ScheduledResource]
+        """
+        return [
+            value
+            for value in self._dependencies.values()
+            if isinstance(value, ScheduledResource)
+        ]
+
+    @property
+    def resource(self) -> Any:
+        """
+        Retrieves the created resource, if any.
+        :return: The resource.
+        :rtype: pythoneda.shared.iac.Resource
+        """
+        return self._resource
+
+    @property
+    def duration(self) -> float:
+        """
+        Retrieves how long the creation took, in seconds.
+        :return: The duration, or 0.0 if it has not been created yet.
+        :rtype: float
+        """
+        if self._started_at is None or self._finished_at is None:
+            return 0.0
+        return self._finished_at - self._started_at
+
+    def resolved_dependencies(self) -> Dict[str, Any]:
+        """
+        Retrieves the dependencies, replacing scheduled resources with the created ones.
+        :return: The dependencies.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            name: value.resource if isinstance(value, ScheduledResource) else value
+            for name, value in self._dependencies.items()
+        }
+
+    def _created(self, resource: Any, startedAt: float, finishedAt: float):
+        """
+        Records the outcome of the creation.
+        :param resource: The created resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :param startedAt: When the creation started (time.perf_counter()).
+        :type startedAt: float
+        :param finishedAt: When the creation finished (time.perf_counter()).
+        :type finishedAt: float
+        """
+        self._resource = resource
+        self._started_at = startedAt
+        self._finished_at = finishedAt
+
+    def _reset(self):
+        """
+        Forgets the outcome of a previous creation, before the scheduler runs again.
+        """
+        self._resource = None
+        self._started_at = None
+        self._finished_at = None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,192 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/sharded_stack_operation_executor.py
+
+This script defines the ShardedStackOperationExecutor class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+import os
+from pythoneda.shared import BaseObject, Event
+from .stack_operation import StackOperation
+from .stack_operation_factory import StackOperationFactory
+from typing import Callable, List
+import zlib
+
+_worker_factory = None
+
+_worker_loop = None
+
+
+def _initialize_worker(factory: Callable[[], StackOperationFactory]):
+    """
+    Builds the operation factory and the event loop of a worker process.
+    :param factory: The function building the operation factory.
+    :type factory: Callable[[], pythoneda.shared.iac.StackOperationFactory]
+    """
+    global _worker_factory, _worker_loop
+    _worker_factory = factory()
+    _worker_loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(_worker_loop)
+
+
+def _perform(event: Event) -> List[Event]:
+    """
+    Performs the operation of an event, within a worker process.
+    :param event: The event.
+    :type event: pythoneda.shared.Event
+    :return: The events representing the outcome.
+    :rtype: List[pythoneda.shared.Event]
+    """
+    return _worker_loop.run_until_complete(_worker_factory.new(event).perform())
+
+
+class ShardedStackOperationExecutor(BaseObject):
+    """
+    Performs stack operations in worker processes, sharded by stack.
+
+    Class name: ShardedStackOperationExecutor
+
+    Responsibilities:
+        - Assign each stack to a worker process, by a stable hash of its name.
+        - Perform the operations of each stack one at a time, in submission order.
+        - Let CPU-heavy operations of different stacks run in parallel.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperationFactory
+        - pythoneda.shared.iac.StackOperation
+    """
+
+    def __init__(
+        self,
+        factory: Callable[[], StackOperationFactory],
+        shards: int = None,
+        mpContext: str = None,
+    ):
+        """
+        Creates a new ShardedStackOperationExecutor instance.
+        :param factory: The function building the operation factory in each worker.
+        It's sent to the workers, so it must be picklable: a class, or a module-level function.
+        :type factory: Callable[[], pythoneda.shared.iac.StackOperationFactory]
+        :param shards: The number of worker processes. Defaults to the number of CPUs.
+        :type shards: int
+        :param mpContext: The multiprocessing start method ("fork", "forkserver" or "spawn").
+        :type mpContext: str
+        """
+        super().__init__()
+        if shards is None:
+            shards = os.cpu_count() or 1
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self._factory = factory
+        self._shards = shards
+        self._mp_context = multiprocessing.get_context(mpContext)
+        self._executors = [None] * shards
+
+    @property
+    def shards(self) -> int:
+        """
+        Retrieves the number of worker processes.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._shards
+
+    def shard_for(self, event: Event) -> int:
+        """
+        Retrieves the shard in charge of the stack an event refers to.
+        The hash is stable across processes and runs, unlike hash().
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The shard index.
+        :rtype: int
+        """
+        stack_name, _, _ = StackOperation.stack_key_for(event)
+        return zlib.crc32((stack_name or "").encode("utf-8")) % self._shards
+
+    def _executor(self, shard: int) -> ProcessPoolExecutor:
+        """
+        Retrieves the executor of a shard, starting it the first time.
+        :param shard: The shard index.
+        :type shard: int
+        :return: The executor.
+        :rtype: concurrent.futures.ProcessPoolExecutor
+        """
+        result = self._executors[shard]
+        if result is None:
+            result = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=self._mp_context,
+                initializer=_initialize_worker,
+                initargs=(self._factory,),
+            )
+            self._executors[shard] = result
+        return result
+
+    def submit(self, event: Event) -> asyncio.Future:
+        """
+        Sends an event to the worker of its stack.
+        Operations on the same stack are performed in the order they're submitted.
+        Must be called from a running event loop.
+        :param event: The event. It must be picklable, and so must the outcome.
+        :type event: pythoneda.shared.Event
+        :return: A future with the events representing the outcome.
+        :rtype: asyncio.Future
+        """
+        shard = self.shard_for(event)
+        try:
+            future = self._executor(shard).submit(_perform, event)
+        except BrokenProcessPool:
+            self.__class__.logger().warning(f"Restarting the worker of shard {shard}")
+            self._executors[shard].shutdown(wait=False)
+            self._executors[shard] = None
+            future = self._executor(shard).submit(_perform, event)
+        return asyncio.wrap_future(future)
+
+    async def run(self, event: Event) -> List[Event]:
+        """
+        Performs the operation of an event in the worker of its stack.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The events representing the outcome.
+        :rtype: List[pythoneda.shared.Event]
+        """
+        return await self.submit(event)
+
+    def shutdown(self, wait: bool = True):
+        """
+        Stops the worker processes.
+        :param wait: Whether to wait for the submitted operations to finish.
+        :type wait: bool
+        """
+        for executor in self._executors:
+            if executor is not None:
+                executor.shutdown(wait=wait)
+        self._executors = [None] * self._shards
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
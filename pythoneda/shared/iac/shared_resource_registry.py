@@ -0,0 +1,202 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/shared_resource_registry.py
+
+This script defines the SharedResourceRegistry class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from .instrumentation import Instrumentation
+from pythoneda.shared import BaseObject
+from .resource import Resource
+import threading
+from typing import Any, Tuple, Type
+
+
+class _SharedEntry:
+    """
+    The actual resource shared by the Resource instances with the same class and name,
+    along with the stacks holding it.
+    """
+
+    __slots__ = ("lock", "actual_resource", "created", "holders", "pending")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.actual_resource = None
+        self.created = False
+        self.holders = set()
+        self.pending = 0
+
+
+class SharedResourceRegistry(BaseObject):
+    """
+    Process-wide registry of the actual resources shared across stacks.
+
+    Class name: SharedResourceRegistry
+
+    Responsibilities:
+        - Create the actual resource of a given class and name only once, for all stacks.
+        - Count the stacks using it.
+        - Tell when the last one releases it, so it can be deleted.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+    """
+
+    _default = None
+
+    def __init__(self):
+        """
+        Creates a new SharedResourceRegistry instance.
+        """
+        super().__init__()
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "SharedResourceRegistry":
+        """
+        Retrieves the registry shared by the whole process.
+        :return: Such registry.
+        :rtype: pythoneda.shared.iac.SharedResourceRegistry
+        """
+        if SharedResourceRegistry._default is None:
+            SharedResourceRegistry._default = cls()
+        return SharedResourceRegistry._default
+
+    @classmethod
+    def key_for(cls, resource: Resource) -> Tuple[Type[Resource], str]:
+        """
+        Builds the key identifying the actual resource of a Resource instance.
+        :param resource: The Resource instance.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: Its class and name.
+        :rtype: Tuple[Type[pythoneda.shared.iac.Resource], str]
+        """
+        return (resource.__class__, resource.resource_name)
+
+    @classmethod
+    def holder_for(cls, resource: Resource) -> Tuple[str, str, str]:
+        """
+        Builds the key identifying the stack a Resource instance belongs to.
+        Instances of the same stack, e.g. built by successive operations on it,
+        hold the actual resource once.
+        :param resource: The Resource instance.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: Its stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return (resource.stack_name, resource.project_name, resource.location)
+
+    def acquire(self, resource: Resource) -> Any:
+        """
+        Provides the actual resource to a Resource instance, on behalf of its stack.
+        The first instance with a given class and name creates it; later ones reuse
+        it without calling the provider. Concurrent first acquisitions wait for a
+        single creation.
+        :param resource: The Resource instance.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: The actual resource.
+        :rtype: Any
+        """
+        key = self.__class__.key_for(resource)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                entry = _SharedEntry()
+                self._entries[key] = entry
+            entry.pending += 1
+        try:
+            with entry.lock:
+                if entry.created:
+                    resource._replace_actual_resource(entry.actual_resource)
+                    Instrumentation.increment(
+                        "iac_shared_resource_reused", resource=key[0].__name__
+                    )
+                else:
+                    entry.actual_resource = resource._create_actual_resource()
+                    entry.created = True
+            with self._lock:
+                entry.holders.add(self.__class__.holder_for(resource))
+        finally:
+            with self._lock:
+                entry.pending -= 1
+                if not entry.holders and entry.pending == 0:
+                    self._entries.pop(key, None)
+        return entry.actual_resource
+
+    def release(self, resource: Resource) -> bool:
+        """
+        Stops sharing the actual resource with the stack of a Resource instance.
+        Any instance of the stack releases it, not only the one that acquired it.
+        Releasing a stack again, e.g. when retrying a deletion, leaves the others
+        unaffected. Instances that weren't materialized get the shared actual resource,
+        so that they can delete it.
+        :param resource: The Resource instance.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: True if no other stack uses the actual resource, so it can be deleted.
+        :rtype: bool
+        """
+        key = self.__class__.key_for(resource)
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry is None:
+                return True
+            entry.holders.discard(self.__class__.holder_for(resource))
+            if entry.holders or entry.pending > 0:
+                return False
+            del self._entries[key]
+        if entry.created and not resource.is_materialized:
+            resource._replace_actual_resource(entry.actual_resource)
+        return True
+
+    def references(self, resource: Resource) -> int:
+        """
+        Retrieves how many stacks use the actual resource of given Resource instance.
+        :param resource: The Resource instance.
+        :type resource: pythoneda.shared.iac.Resource
+        :return: Such number.
+        :rtype: int
+        """
+        with self._lock:
+            entry = self._entries.get(self.__class__.key_for(resource), None)
+            return 0 if entry is None else len(entry.holders)
+
+    def __len__(self) -> int:
+        """
+        Retrieves the number of shared actual resources.
+        :return: Such number.
+        :rtype: int
+        """
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Forgets all shared actual resources, without deleting them.
+        """
+        with self._lock:
+            self._entries.clear()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,203 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/sqlite_resource_lookup_cache.py
+
+This script defines the SqliteResourceLookupCache class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import pickle
+from .resource_lookup_cache import ResourceLookupCache
+import sqlite3
+import threading
+import time
+from typing import Any, Tuple
+
+_UNPICKLING_ERRORS = (
+    pickle.UnpicklingError,
+    AttributeError,
+    EOFError,
+    ImportError,
+    IndexError,
+    TypeError,
+    ValueError,
+)
+
+
+class SqliteResourceLookupCache(ResourceLookupCache):
+    """
+    Cache of Resource.from_id lookups stored in a local SQLite file.
+
+    Class name: SqliteResourceLookupCache
+
+    Responsibilities:
+        - Share resources retrieved from the provider across runs and processes.
+        - Evict expired and least recently used entries.
+
+    Collaborators:
+        - pythoneda.shared.iac.ResourceLookupCache
+    """
+
+    def __init__(self, path: str, ttl: float = 300.0, maxSize: int = 1024):
+        """
+        Creates a new SqliteResourceLookupCache instance.
+        :param path: The path of the SQLite file. It must not be writable by untrusted users, since entries are pickled.
+        :type path: str
+        :param ttl: How long entries are valid, in seconds.
+        :type ttl: float
+        :param maxSize: The maximum number of entries.
+        :type maxSize: int
+        """
+        super().__init__(ttl, maxSize)
+        self._path = path
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(
+            path, check_same_thread=False, isolation_level=None
+        )
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS resources ("
+            "resource_class TEXT NOT NULL, "
+            "resource_id TEXT NOT NULL, "
+            "expires_at REAL NOT NULL, "
+            "accessed_at REAL NOT NULL, "
+            "resource BLOB NOT NULL, "
+            "PRIMARY KEY (resource_class, resource_id))"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS resources_expires_at ON resources (expires_at)"
+        )
+        self._connection.execute(
+            "CREATE INDEX IF NOT EXISTS resources_accessed_at ON resources (accessed_at)"
+        )
+
+    @property
+    def path(self) -> str:
+        """
+        Retrieves the path of the SQLite file.
+        :return: Such path.
+        :rtype: str
+        """
+        return self._path
+
+    def get(self, key: Tuple[str, str]) -> Any:
+        """
+        Retrieves a cached resource.
+        Entries that cannot be unpickled, e.g. because the resource class changed
+        since they were stored, count as misses and are removed.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :return: The resource, or ResourceLookupCache.MISSING.
+        :rtype: Any
+        """
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires_at, resource FROM resources "
+                "WHERE resource_class = ? AND resource_id = ?",
+                key,
+            ).fetchone()
+            if row is None:
+                return self.MISSING
+            expires_at, blob = row
+            if expires_at < now:
+                self._connection.execute(
+                    "DELETE FROM resources WHERE resource_class = ? AND resource_id = ?",
+                    key,
+                )
+                return self.MISSING
+            self._connection.execute(
+                "UPDATE resources SET accessed_at = ? "
+                "WHERE resource_class = ? AND resource_id = ?",
+                (now, *key),
+            )
+        try:
+            return pickle.loads(blob)
+        except _UNPICKLING_ERRORS as error:
+            self.__class__.logger().debug(f"Discarding cached {key}: {error}")
+            self.invalidate(key)
+            return self.MISSING
+
+    def put(self, key: Tuple[str, str], resource: Any):
+        """
+        Caches a resource. Resources that cannot be pickled are not cached.
+        Least recently used entries are evicted only when the cache holds more than max_size.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        :param resource: The resource.
+        :type resource: Any
+        """
+        try:
+            blob = pickle.dumps(resource, protocol=pickle.HIGHEST_PROTOCOL)
+        except (pickle.PicklingError, TypeError, AttributeError) as error:
+            self.__class__.logger().debug(f"Not caching {key}: {error}")
+            return
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO resources "
+                "(resource_class, resource_id, expires_at, accessed_at, resource) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (*key, now + self.ttl, now, blob),
+            )
+            self._connection.execute(
+                "DELETE FROM resources WHERE expires_at < ?", (now,)
+            )
+            (size,) = self._connection.execute(
+                "SELECT COUNT(*) FROM resources"
+            ).fetchone()
+            if size > self.max_size:
+                self._connection.execute(
+                    "DELETE FROM resources WHERE rowid IN ("
+                    "SELECT rowid FROM resources ORDER BY accessed_at LIMIT ?)",
+                    (size - self.max_size,),
+                )
+
+    def invalidate(self, key: Tuple[str, str]):
+        """
+        Forgets a cached resource.
+        :param key: The key.
+        :type key: Tuple[str, str]
+        """
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM resources WHERE resource_class = ? AND resource_id = ?",
+                key,
+            )
+
+    def clear(self):
+        """
+        Forgets all cached resources.
+        """
+        with self._lock:
+            self._connection.execute("DELETE FROM resources")
+
+    def close(self):
+        """
+        Closes the underlying connection.
+        """
+        with self._lock:
+            self._connection.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,13 +20,20 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
+from .deadline_exceeded import DeadlineExceeded
+import functools
+from .instrumentation import Instrumentation
 from pythoneda.shared import BaseObject, Event, primary_key_attribute
 from pythoneda.shared.iac.events import (
     InfrastructureUpdateRequested,
     InfrastructureRemovalRequested,
 )
+from .provider_client_pool import ProviderClientPool
 from .resource import Resource
-from typing import Any, Dict, List, Union
+from .resource_graph import ResourceGraph
+from .resource_progress import ResourceProgress
+from .resource_scheduler import ResourceScheduler
+from typing import Any, AsyncIterator, Callable, List, Optional, Tuple, Union
 
 
 class StackOperation(BaseObject, abc.ABC):
@@ -42,19 +49,134 @@ class StackOperation(BaseObject, abc.ABC):
         - None
     """
 
+    __slots__ = (
+        "_event",
+        "_resources",
+        "_outcome",
+        "_client_pool",
+        "_schedulers",
+        "_performing",
+    )
+
+    provider = None
+
+    timeout = None
+
+    def __init_subclass__(cls, **kwargs):
+        """
+        Wraps the perform() and perform_stream() methods of subclasses implementing
+        them, so they run the _before_perform() hook and they're instrumented.
+        :param kwargs: The class keyword arguments.
+        :type kwargs: Dict
+        """
+        super().__init_subclass__(**kwargs)
+        for name, wrap in (
+            ("perform", StackOperation._instrumented),
+            ("perform_stream", StackOperation._instrumented_stream),
+        ):
+            method = cls.__dict__.get(name, None)
+            if (
+                method is not None
+                and not getattr(method, "__isabstractmethod__", False)
+                and not getattr(method, "_instrumented", False)
+            ):
+                setattr(cls, name, wrap(method))
+
+    @classmethod
+    def _instrumented(cls, perform: Callable) -> Callable:
+        """
+        Wraps a perform() implementation so it runs the _before_perform() hook first,
+        and it's timed when instrumentation is enabled.
+        Calls made while the operation is already performing, e.g. perform() collecting
+        perform_stream(), are left alone.
+        :param perform: The perform() implementation.
+        :type perform: Callable
+        :return: The wrapped implementation.
+        :rtype: Callable
+        """
+
+        @functools.wraps(perform)
+        async def wrapper(self, *args, **kwargs):
+            if self._performing:
+                return await perform(self, *args, **kwargs)
+            self._performing = True
+            try:
+                self._before_perform()
+                if not Instrumentation.active:
+                    return await perform(self, *args, **kwargs)
+                with Instrumentation.timer(
+                    "iac_stack_operation_perform", operation=self.__class__.__name__
+                ):
+                    return await perform(self, *args, **kwargs)
+            finally:
+                self._performing = False
+
+        wrapper._instrumented = True
+        return wrapper
+
+    @classmethod
+    def _instrumented_stream(cls, performStream: Callable) -> Callable:
+        """
+        Wraps a perform_stream() implementation like _instrumented() does perform().
+        When instrumentation is enabled, the timing includes the time the consumer
+        spends between events.
+        :param performStream: The perform_stream() implementation.
+        :type performStream: Callable
+        :return: The wrapped implementation.
+        :rtype: Callable
+        """
+
+        @functools.wraps(performStream)
+        async def wrapper(self, *args, **kwargs):
+            if self._performing:
+                async for event in performStream(self, *args, **kwargs):
+                    yield event
+                return
+            self._performing = True
+            try:
+                self._before_perform()
+                if not Instrumentation.active:
+                    async for event in performStream(self, *args, **kwargs):
+                        yield event
+                    return
+                with Instrumentation.timer(
+                    "iac_stack_operation_perform", operation=self.__class__.__name__
+                ):
+                    async for event in performStream(self, *args, **kwargs):
+                        yield event
+            finally:
+                self._performing = False
+
+        wrapper._instrumented = True
+        return wrapper
+
+    def _before_perform(self):
+        """
+        Runs right before the operation is performed, once per call to perform() or
+        perform_stream().
+        Subclasses override it to discard state the operation is about to invalidate.
+        """
+        pass
+
     def __init__(
         self,
         event: Union[InfrastructureUpdateRequested, InfrastructureRemovalRequested],
+        clientPool: ProviderClientPool = None,
     ):
         """
         Creates a new stack instance.
         :param event: The event.
         :type event: Union[org.acmsl.iac.licdata.domain.InfrastructureUpdateRequested, org.acmsl.iac.licdata.domain.InfrastructureRemovalRequested]
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
         """
         super().__init__()
         self._event = event
-        self._resources = []
+        self._resources = ResourceGraph()
         self._outcome = None
+        self._client_pool = clientPool
+        self._schedulers = []
+        self._performing = False
 
     @property
     @primary_key_attribute
@@ -69,31 +191,224 @@ class StackOperation(BaseObject, abc.ABC):
         return self._event
 
     @property
-    def resources(self) -> List[Resource]:
+    def resources(self) -> ResourceGraph:
         """
-        Retrieves the resources.
+        Retrieves the resources, indexed by name, type and reverse dependency.
+        It used to be a list: it's now a ResourceGraph, so `resources + [...]` and
+        resources.copy() no longer work; use list(resources) instead.
         :return: The resources.
-        :rtype: List[Resource]
+        :rtype: pythoneda.shared.iac.ResourceGraph
         """
         return self._resources
 
+    def _declare_resources(self) -> List[Resource]:
+        """
+        Declares the resources of the stack, without creating them, so that both
+        perform() and plan() work on the same resources.
+        Subclasses override it, building each Resource with lazy=True.
+        By default, they are the resources already added to the operation.
+        :return: The resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return list(self._resources)
+
+    @property
+    def completed_resources(self) -> List[Resource]:
+        """
+        Retrieves the resources already created.
+        :return: Such resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return [resource for resource in self._resources if resource.is_materialized]
+
+    @property
+    def pending_resources(self) -> List[Resource]:
+        """
+        Retrieves the resources not created yet.
+        :return: Such resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return [
+            resource for resource in self._resources if not resource.is_materialized
+        ]
+
+    async def _create_resources(
+        self, scheduler: ResourceScheduler, timeout: float = None
+    ) -> AsyncIterator[ResourceProgress]:
+        """
+        Creates the resources scheduled in given scheduler, adding each one to
+        the resources of the operation, and yielding its progress, as soon as
+        it's created.
+        The operation keeps track of the scheduler, so that _deadline_exceeded()
+        can tell which resources were being created when a deadline passed.
+        :param scheduler: The scheduler.
+        :type scheduler: pythoneda.shared.iac.ResourceScheduler
+        :param timeout: The maximum time to create all resources, in seconds.
+        :type timeout: float
+        :return: An async iterator of the progress of each resource, in completion order.
+        :rtype: AsyncIterator[pythoneda.shared.iac.ResourceProgress]
+        """
+        self._schedulers.append(scheduler)
+        async for node in scheduler.run_stream(timeout):
+            if node.resource not in self._resources:
+                self._resources.append(node.resource)
+            yield self._progress(node.resource, ResourceProgress.CREATED)
+
+    def _progress(
+        self, resource: Resource, action: str, error: BaseException = None
+    ) -> ResourceProgress:
+        """
+        Builds the event reporting the progress of the operation on a resource.
+        :param resource: The resource.
+        :type resource: pythoneda.shared.iac.Resource
+        :param action: What happened to it (see ResourceProgress).
+        :type action: str
+        :param error: The error, for failures.
+        :type error: BaseException
+        :return: The event.
+        :rtype: pythoneda.shared.iac.ResourceProgress
+        """
+        return ResourceProgress(
+            self.stack_key,
+            resource.resource_name,
+            action,
+            resource.resource_id,
+            None if error is None else str(error),
+        )
+
+    def _deadline_exceeded(self, message: str) -> DeadlineExceeded:
+        """
+        Builds the error reporting which resources were created before a deadline passed.
+        Resources being created through _create_resources() are reported as in flight,
+        and the ones created by worker threads after the deadline as completed, even if
+        they didn't make it to the resources of the operation.
+        :param message: The error message.
+        :type message: str
+        :return: The error.
+        :rtype: pythoneda.shared.iac.DeadlineExceeded
+        """
+        completed = [resource.resource_name for resource in self.completed_resources]
+        in_flight = []
+        pending = [resource.resource_name for resource in self.pending_resources]
+        for scheduler in self._schedulers:
+            for node in scheduler.scheduled.values():
+                if node.resource is not None:
+                    name = node.resource.resource_name
+                    if name not in completed:
+                        completed.append(name)
+                    continue
+                name = node.resource_class.name_for(
+                    scheduler.stack_name, scheduler.project_name, scheduler.location
+                )
+                if node.key in scheduler._in_flight:
+                    in_flight.append(name)
+                elif name not in pending:
+                    pending.append(name)
+        pending = [name for name in pending if name not in in_flight + completed]
+        return DeadlineExceeded(message, completed, in_flight, pending)
+
+    def _deadline_failure_events(
+        self, error: DeadlineExceeded
+    ) -> Optional[List[Event]]:
+        """
+        Builds the events reporting that the operation ran past its deadline,
+        for StackOperationRunner to emit instead of raising the error.
+        Subclasses override it to build their failure event, e.g.
+        InfrastructureUpdateFailed, out of error.to_dict().
+        :param error: The error.
+        :type error: pythoneda.shared.iac.DeadlineExceeded
+        :return: The events, or None to get the error raised.
+        :rtype: Optional[List[pythoneda.shared.Event]]
+        """
+        return None
+
+    @property
+    def client_pool(self) -> ProviderClientPool:
+        """
+        Retrieves the pool of provider clients, shared with other operations.
+        :return: Such pool, or None.
+        :rtype: pythoneda.shared.iac.ProviderClientPool
+        """
+        return self._client_pool
+
     @property
     def outcome(self) -> Any:
         """
-        Retrieves the outcome of the "up" operation.
+        Retrieves the outcome of the "up" operation, or the TeardownResult of a removal.
         :return: Such outcome.
         :rtype: Any
         """
         return self._outcome
 
-    @abc.abstractmethod
+    @classmethod
+    def stack_key_for(cls, event: Event) -> Tuple[str, str, str]:
+        """
+        Builds the key identifying the stack an event refers to.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return (
+            getattr(event, "stack_name", None),
+            getattr(event, "project_name", None),
+            getattr(event, "location", None),
+        )
+
+    @property
+    def stack_key(self) -> Tuple[str, str, str]:
+        """
+        Retrieves the key identifying the stack.
+        :return: The stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return self.__class__.stack_key_for(self._event)
+
     async def perform(self) -> List[Event]:
         """
         Performs the operation on the stack.
+        Subclasses implement either perform_stream() or perform(). By default, it
+        collects the events of perform_stream().
         :return: A list of events representing the outcome.
         :rtype: List[pythoneda.shared.Event]
         """
-        pass
+        return await self._collect_stream()
+
+    async def perform_stream(self) -> AsyncIterator[Event]:
+        """
+        Performs the operation on the stack, yielding events as soon as they're available,
+        e.g. the progress of each resource (see _create_resources()).
+        By default, it yields the outcome of perform(), for subclasses implementing it.
+        :return: An async iterator of the events representing the progress and outcome.
+        :rtype: AsyncIterator[pythoneda.shared.Event]
+        """
+        if not self.__class__._implements_perform():
+            raise NotImplementedError(
+                f"{self.__class__.__name__} implements neither perform() nor perform_stream()"
+            )
+        outcome = await self.perform()
+        if not isinstance(outcome, list):
+            outcome = [outcome]
+        for event in outcome:
+            yield event
+
+    @classmethod
+    def _implements_perform(cls) -> bool:
+        """
+        Checks whether the class implements perform() itself, instead of collecting
+        perform_stream().
+        :return: True in such case.
+        :rtype: bool
+        """
+        return cls.perform is not StackOperation.perform
+
+    async def _collect_stream(self) -> List[Event]:
+        """
+        Collects all events of perform_stream().
+        :return: The events, in the order they were yielded.
+        :rtype: List[pythoneda.shared.Event]
+        """
+        return [event async for event in self.perform_stream()]
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
@@ -0,0 +1,266 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/stack_operation_batcher.py
+
+This script defines the StackOperationBatcher class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from contextlib import asynccontextmanager
+from functools import partial
+from pythoneda.shared import BaseObject, Event
+from pythoneda.shared.iac.events import (
+    DockerResourcesRemovalRequested,
+    DockerResourcesUpdateRequested,
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+from .stack_operation import StackOperation
+from .stack_operation_factory import StackOperationFactory
+from typing import Any, Dict, List, Tuple
+
+
+class StackOperationBatcher(BaseObject):
+    """
+    Runs bursts of events for the same stack as a single operation.
+
+    Class name: StackOperationBatcher
+
+    Responsibilities:
+        - Collect the events received for each stack within a time window.
+        - Coalesce events superseded by later ones.
+        - Perform one operation per coalesced group, in order, and share its outcome.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperationFactory
+        - pythoneda.shared.iac.StackOperation
+    """
+
+    _families = (
+        (InfrastructureUpdateRequested, InfrastructureRemovalRequested, False),
+        (DockerResourcesUpdateRequested, DockerResourcesRemovalRequested, True),
+    )
+
+    _bookkeeping = frozenset(
+        (
+            "_id",
+            "_previous_event_ids",
+            "_timestamp",
+            "_reconstructed_id",
+            "_reconstructed_previous_event_ids",
+            "_stack_name",
+            "_project_name",
+            "_location",
+        )
+    )
+
+    def __init__(self, factory: StackOperationFactory, window: float = 0.5):
+        """
+        Creates a new StackOperationBatcher instance.
+        :param factory: The factory of stack operations.
+        :type factory: pythoneda.shared.iac.StackOperationFactory
+        :param window: How long to wait for further events of the same stack, in seconds.
+        :type window: float
+        """
+        super().__init__()
+        self._factory = factory
+        self._window = window
+        self._pending = {}
+        self._flushes = set()
+        self._locks = {}
+
+    @property
+    def factory(self) -> StackOperationFactory:
+        """
+        Retrieves the factory of stack operations.
+        :return: Such factory.
+        :rtype: pythoneda.shared.iac.StackOperationFactory
+        """
+        return self._factory
+
+    @property
+    def window(self) -> float:
+        """
+        Retrieves the time window.
+        :return: Such window, in seconds.
+        :rtype: float
+        """
+        return self._window
+
+    async def submit(self, event: Event) -> List[Event]:
+        """
+        Submits an event, and waits for the outcome of the operation that handles it.
+        When the event is coalesced with later ones, that's the outcome of the last
+        event of its group: e.g. an update followed by a removal of the same stack
+        gets the events of the removal.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The events representing the outcome.
+        :rtype: List[pythoneda.shared.Event]
+        """
+        key = StackOperation.stack_key_for(event)
+        future = asyncio.get_running_loop().create_future()
+        batch = self._pending.get(key, None)
+        if batch is None:
+            batch = []
+            self._pending[key] = batch
+            flush = asyncio.ensure_future(self._flush_later(key))
+            self._flushes.add(flush)
+            flush.add_done_callback(partial(self._flushed, key, batch))
+        batch.append((event, future))
+        return await future
+
+    async def _flush_later(self, key: Tuple[str, str, str]):
+        """
+        Performs the operations of a stack once its time window is over.
+        :param key: The stack key.
+        :type key: Tuple[str, str, str]
+        """
+        await asyncio.sleep(self._window)
+        batch = self._pending.pop(key)
+        async with self._stack_lock(key):
+            for event, futures in self.__class__.coalesce(batch):
+                try:
+                    outcome = await self._factory.new(event).perform()
+                except Exception as error:
+                    for future in futures:
+                        if not future.done():
+                            future.set_exception(error)
+                    continue
+                if not isinstance(outcome, list):
+                    outcome = [outcome]
+                for future in futures:
+                    if not future.done():
+                        future.set_result(outcome)
+
+    def _flushed(
+        self,
+        key: Tuple[str, str, str],
+        batch: List[Tuple[Event, asyncio.Future]],
+        flush: asyncio.Future,
+    ):
+        """
+        Cleans up after the flush of a stack, however it ended.
+        When it got cancelled, even before starting, its batch is dropped and the
+        submitters still waiting are cancelled as well.
+        :param key: The stack key.
+        :type key: Tuple[str, str, str]
+        :param batch: The events of the stack, with their futures.
+        :type batch: List[Tuple[pythoneda.shared.Event, asyncio.Future]]
+        :param flush: The flush.
+        :type flush: asyncio.Future
+        """
+        self._flushes.discard(flush)
+        if self._pending.get(key, None) is batch:
+            del self._pending[key]
+        for _, future in batch:
+            if not future.done():
+                future.cancel()
+
+    @asynccontextmanager
+    async def _stack_lock(self, key: Tuple[str, str, str]):
+        """
+        Holds the lock of a stack, discarding it when nobody else needs it.
+        :param key: The stack key.
+        :type key: Tuple[str, str, str]
+        """
+        entry = self._locks.get(key, None)
+        if entry is None:
+            entry = [asyncio.Lock(), 0]
+            self._locks[key] = entry
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._locks[key]
+
+    @classmethod
+    def coalesce(
+        cls, batch: List[Tuple[Event, asyncio.Future]]
+    ) -> List[Tuple[Event, List[asyncio.Future]]]:
+        """
+        Groups consecutive events so that each group is handled by its last event.
+        Every submitter in a group gets the outcome of that last event, e.g. the
+        events of the removal for an update coalesced with a later removal.
+        :param batch: The events of a stack, in arrival order, with their futures.
+        :type batch: List[Tuple[pythoneda.shared.Event, asyncio.Future]]
+        :return: The event to perform for each group, with the futures of the whole group.
+        :rtype: List[Tuple[pythoneda.shared.Event, List[asyncio.Future]]]
+        """
+        result = []
+        for event, future in batch:
+            if result and cls._supersedes(event, result[-1][0]):
+                result[-1] = (event, result[-1][1] + [future])
+            else:
+                result.append((event, [future]))
+        return result
+
+    @classmethod
+    def _supersedes(cls, event: Event, previous: Event) -> bool:
+        """
+        Checks whether an event makes the previous one irrelevant.
+        Updates are superseded by later updates or removals of the same kind,
+        and removals by identical removals. A removal followed by an update is kept.
+        Docker events also need the same payload, e.g. the same image and digest:
+        updates of different images of the same stack are all performed.
+        :param event: The new event.
+        :type event: pythoneda.shared.Event
+        :param previous: The previous event.
+        :type previous: pythoneda.shared.Event
+        :return: True in such case.
+        :rtype: bool
+        """
+        for update, removal, targeted in cls._families:
+            if isinstance(previous, update):
+                result = isinstance(event, (update, removal))
+            elif isinstance(previous, removal):
+                result = isinstance(event, removal)
+            else:
+                continue
+            if result and targeted:
+                result = cls._payload(event) == cls._payload(previous)
+            return result
+        return False
+
+    @classmethod
+    def _payload(cls, event: Event) -> Dict[str, Any]:
+        """
+        Retrieves what an event asks for, beyond its stack: its attributes but the
+        ones identifying the event itself or its stack.
+        :param event: The event.
+        :type event: pythoneda.shared.Event
+        :return: The attributes, by name.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            name: value
+            for name, value in vars(event).items()
+            if name not in cls._bookkeeping
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,249 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/stack_operation_runner.py
+
+This script defines the StackOperationRunner class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from collections import deque
+from .deadline_exceeded import DeadlineExceeded
+from pythoneda.shared import BaseObject, Event
+from .rate_limiter import RateLimiter
+from .stack_operation import StackOperation
+from typing import Dict, List
+
+
+class StackOperationRunner(BaseObject):
+    """
+    Performs stack operations concurrently, on a bounded pool of workers.
+
+    Class name: StackOperationRunner
+
+    Responsibilities:
+        - Queue stack operations per stack, making submitters wait when the queue is full.
+        - Perform queued operations concurrently, up to a global limit.
+        - Never perform two operations on the same stack at the same time, handing
+          workers only stacks with no operation in progress.
+        - Respect the rate limit of each provider.
+        - Cancel operations running past their deadline, freeing their slot, and
+          report them through their failure events.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperation
+        - pythoneda.shared.iac.RateLimiter
+    """
+
+    def __init__(
+        self,
+        maxConcurrency: int = 8,
+        queueSize: int = 100,
+        rateLimits: Dict[str, RateLimiter] = None,
+        timeout: float = None,
+    ):
+        """
+        Creates a new StackOperationRunner instance.
+        :param maxConcurrency: The number of operations performed at the same time.
+        :type maxConcurrency: int
+        :param queueSize: The number of operations that can wait in the queue, across all stacks.
+        :type queueSize: int
+        :param rateLimits: The rate limiter of each provider (see StackOperation.provider).
+        :type rateLimits: Dict[str, pythoneda.shared.iac.RateLimiter]
+        :param timeout: The maximum time to perform an operation, in seconds, unless
+        its class sets its own (see StackOperation.timeout).
+        :type timeout: float
+        """
+        super().__init__()
+        if maxConcurrency < 1:
+            raise ValueError("maxConcurrency must be at least 1")
+        if queueSize < 1:
+            raise ValueError("queueSize must be at least 1")
+        self._max_concurrency = maxConcurrency
+        self._capacity = asyncio.Semaphore(queueSize)
+        self._stacks = {}
+        self._ready = asyncio.Queue()
+        self._queued = 0
+        self._unfinished = 0
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._rate_limits = dict(rateLimits or {})
+        self._timeout = timeout
+        self._workers = []
+
+    @property
+    def max_concurrency(self) -> int:
+        """
+        Retrieves the number of operations performed at the same time.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._max_concurrency
+
+    @property
+    def rate_limits(self) -> Dict[str, RateLimiter]:
+        """
+        Retrieves the rate limiter of each provider.
+        :return: Such limiters.
+        :rtype: Dict[str, pythoneda.shared.iac.RateLimiter]
+        """
+        return self._rate_limits
+
+    @property
+    def timeout(self) -> float:
+        """
+        Retrieves the maximum time to perform an operation.
+        :return: Such time, in seconds, or None.
+        :rtype: float
+        """
+        return self._timeout
+
+    @property
+    def pending(self) -> int:
+        """
+        Retrieves the number of operations waiting in the queue.
+        :return: Such number.
+        :rtype: int
+        """
+        return self._queued
+
+    def start(self):
+        """
+        Starts the workers. Must be called from a running event loop.
+        """
+        if not self._workers:
+            self._workers = [
+                asyncio.ensure_future(self._work())
+                for _ in range(self._max_concurrency)
+            ]
+
+    async def stop(self):
+        """
+        Waits for the queued operations to finish, and stops the workers.
+        """
+        await self._finished.wait()
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+    async def submit(self, operation: StackOperation) -> asyncio.Future:
+        """
+        Queues an operation, waiting while the queue is full.
+        Operations on the same stack are performed in the order they're submitted.
+        :param operation: The operation.
+        :type operation: pythoneda.shared.iac.StackOperation
+        :return: A future with the events representing the outcome.
+        :rtype: asyncio.Future
+        """
+        self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._capacity.acquire()
+        self._queued += 1
+        self._unfinished += 1
+        self._finished.clear()
+        key = operation.stack_key
+        operations = self._stacks.get(key, None)
+        if operations is None:
+            # the stack is idle: hand it to the next free worker
+            operations = deque()
+            self._stacks[key] = operations
+            self._ready.put_nowait(key)
+        operations.append((operation, future))
+        return future
+
+    async def run(self, operation: StackOperation) -> List[Event]:
+        """
+        Queues an operation, and waits for its outcome.
+        :param operation: The operation.
+        :type operation: pythoneda.shared.iac.StackOperation
+        :return: The events representing the outcome.
+        :rtype: List[pythoneda.shared.Event]
+        """
+        return await (await self.submit(operation))
+
+    async def _work(self):
+        """
+        Performs the next operation of each stack handed over, until cancelled.
+        A stack is handed to one worker at a time, and goes back to the end of the
+        ready queue afterwards if it has more operations, so busy stacks don't keep
+        other stacks waiting.
+        """
+        while True:
+            key = await self._ready.get()
+            operations = self._stacks[key]
+            operation, future = operations.popleft()
+            self._queued -= 1
+            self._capacity.release()
+            try:
+                limiter = self._rate_limits.get(operation.provider, None)
+                if limiter is not None:
+                    await limiter.acquire()
+                outcome = await self._perform(operation)
+                if not future.done():
+                    future.set_result(outcome)
+            except asyncio.CancelledError:
+                if not future.done():
+                    future.cancel()
+                raise
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            finally:
+                if operations:
+                    self._ready.put_nowait(key)
+                else:
+                    del self._stacks[key]
+                self._unfinished -= 1
+                if self._unfinished == 0:
+                    self._finished.set()
+
+    async def _perform(self, operation: StackOperation) -> List[Event]:
+        """
+        Performs an operation, cancelling it if it runs past its deadline.
+        Deadlines passed are reported with the failure events of the operation
+        (see StackOperation._deadline_failure_events()), or raised if it has none.
+        :param operation: The operation.
+        :type operation: pythoneda.shared.iac.StackOperation
+        :return: The events representing the outcome.
+        :rtype: List[pythoneda.shared.Event]
+        """
+        timeout = operation.timeout if operation.timeout is not None else self._timeout
+        try:
+            if timeout is None:
+                return await operation.perform()
+            return await asyncio.wait_for(operation.perform(), timeout)
+        except DeadlineExceeded as deadline:
+            error = deadline
+        except asyncio.TimeoutError:
+            error = operation._deadline_exceeded(
+                f"{operation.__class__.__name__} on {operation.stack_key} "
+                f"took more than {timeout}s"
+            )
+        result = operation._deadline_failure_events(error)
+        if result is None:
+            raise error from None
+        return result
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,345 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/stack_plan.py
+
+This script defines the StackPlan class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from collections import deque
+import json
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from typing import Any, Dict, Iterable, List, Tuple
+
+
+class StackPlan(BaseObject):
+    """
+    The changes an operation would apply to a stack, computed without provider calls.
+
+    Class name: StackPlan
+
+    Responsibilities:
+        - Diff the declared resources against a snapshot of the last known state.
+        - List the changes in the order they would be applied.
+        - Serialize itself, so plans can be stored or attached to events.
+
+    Collaborators:
+        - pythoneda.shared.iac.Resource
+        - pythoneda.shared.iac.UpdateInfrastructure
+        - pythoneda.shared.iac.RemoveInfrastructure
+    """
+
+    CREATE = "create"
+
+    UPDATE = "update"
+
+    REPLACE = "replace"
+
+    DELETE = "delete"
+
+    def __init__(
+        self,
+        stackKey: Tuple[str, str, str],
+        changes: List[Dict[str, str]],
+        unchanged: List[str],
+        state: Dict[str, Dict[str, Any]],
+    ):
+        """
+        Creates a new StackPlan instance.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :param changes: The changes, in order, each one with its "action", "name" and "type".
+        :type changes: List[Dict[str, str]]
+        :param unchanged: The names of the resources left as they are.
+        :type unchanged: List[str]
+        :param state: The state of the stack once the plan is applied.
+        :type state: Dict[str, Dict[str, Any]]
+        """
+        super().__init__()
+        self._stack_key = tuple(stackKey)
+        self._changes = changes
+        self._unchanged = unchanged
+        self._state = state
+
+    @property
+    def stack_key(self) -> Tuple[str, str, str]:
+        """
+        Retrieves the key identifying the stack.
+        :return: The stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return self._stack_key
+
+    @property
+    def changes(self) -> List[Dict[str, str]]:
+        """
+        Retrieves the changes, in the order they would be applied.
+        :return: Such changes, each one with its "action", "name" and "type".
+        :rtype: List[Dict[str, str]]
+        """
+        return self._changes
+
+    @property
+    def unchanged(self) -> List[str]:
+        """
+        Retrieves the resources left as they are.
+        :return: Their names.
+        :rtype: List[str]
+        """
+        return self._unchanged
+
+    @property
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves the state of the stack once the plan is applied, to be used as
+        the snapshot for the next plan.
+        :return: The "type", "hash" and "dependencies" of each resource, by name.
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        return self._state
+
+    @property
+    def has_changes(self) -> bool:
+        """
+        Checks whether applying the plan would change anything.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return len(self._changes) > 0
+
+    def names(self, action: str) -> List[str]:
+        """
+        Retrieves the resources affected by given action.
+        :param action: The action (StackPlan.CREATE, UPDATE, REPLACE or DELETE).
+        :type action: str
+        :return: Their names, in order.
+        :rtype: List[str]
+        """
+        return [
+            change["name"] for change in self._changes if change["action"] == action
+        ]
+
+    def summary(self) -> Dict[str, int]:
+        """
+        Counts the changes per action.
+        :return: The number of changes, by action, plus the unchanged resources.
+        :rtype: Dict[str, int]
+        """
+        result = {
+            action: 0
+            for action in (
+                StackPlan.CREATE,
+                StackPlan.UPDATE,
+                StackPlan.REPLACE,
+                StackPlan.DELETE,
+            )
+        }
+        for change in self._changes:
+            result[change["action"]] += 1
+        result["unchanged"] = len(self._unchanged)
+        return result
+
+    @classmethod
+    def state_of(cls, resources: Iterable[Resource]) -> Dict[str, Dict[str, Any]]:
+        """
+        Describes given resources, without creating them.
+        :param resources: The resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :return: The "type", "hash" and "dependencies" of each resource, by name.
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        memo = {}
+        result = {}
+        for resource in resources:
+            resource_class = resource.__class__
+            result[resource.resource_name] = {
+                "type": f"{resource_class.__module__}.{resource_class.__qualname__}",
+                "hash": resource._content_hash(memo),
+                "dependencies": [dep.resource_name for dep in resource.upstream],
+            }
+        return result
+
+    @classmethod
+    def for_update(
+        cls,
+        stackKey: Tuple[str, str, str],
+        resources: Iterable[Resource],
+        previous: Dict[str, Dict[str, Any]] = None,
+    ) -> "StackPlan":
+        """
+        Plans bringing a stack to the given resources.
+        Resources in the snapshot but no longer declared are deleted, after
+        the creations and updates. Resources whose content hash can't be reproduced,
+        because they depend on opaque values Resource._describe_opaque() can't
+        describe, are always planned as updates.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :param resources: The declared resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :param previous: The snapshot of the last known state, if any.
+        :type previous: Dict[str, Dict[str, Any]]
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        previous = previous or {}
+        state = cls.state_of(resources)
+        changes = []
+        unchanged = []
+        for name in cls._order(state):
+            current = state[name]
+            known = previous.get(name, None)
+            if known is None:
+                action = StackPlan.CREATE
+            elif known.get("type", None) != current["type"]:
+                action = StackPlan.REPLACE
+            elif known.get("hash", None) != current["hash"]:
+                action = StackPlan.UPDATE
+            else:
+                unchanged.append(name)
+                continue
+            changes.append({"action": action, "name": name, "type": current["type"]})
+        gone = {name: entry for name, entry in previous.items() if name not in state}
+        for name in reversed(cls._order(gone)):
+            changes.append(
+                {
+                    "action": StackPlan.DELETE,
+                    "name": name,
+                    "type": gone[name].get("type", None),
+                }
+            )
+        return cls(stackKey, changes, unchanged, state)
+
+    @classmethod
+    def for_removal(
+        cls,
+        stackKey: Tuple[str, str, str],
+        resources: Iterable[Resource],
+        previous: Dict[str, Dict[str, Any]] = None,
+    ) -> "StackPlan":
+        """
+        Plans removing a stack: both the declared resources and the ones in the
+        snapshot are deleted, dependent resources first.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :param resources: The declared resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :param previous: The snapshot of the last known state, if any.
+        :type previous: Dict[str, Dict[str, Any]]
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        known = dict(previous or {})
+        known.update(cls.state_of(resources))
+        changes = [
+            {
+                "action": StackPlan.DELETE,
+                "name": name,
+                "type": known[name].get("type", None),
+            }
+            for name in reversed(cls._order(known))
+        ]
+        return cls(stackKey, changes, [], {})
+
+    @classmethod
+    def _order(cls, state: Dict[str, Dict[str, Any]]) -> List[str]:
+        """
+        Sorts the resources of a state so that dependencies come first.
+        Dependencies not included in the state are ignored.
+        :param state: The state.
+        :type state: Dict[str, Dict[str, Any]]
+        :return: The names of the resources, sorted.
+        :rtype: List[str]
+        """
+        pending = {}
+        downstream = {name: [] for name in state}
+        for name, entry in state.items():
+            upstream = {dep for dep in entry.get("dependencies", ()) if dep in state}
+            pending[name] = len(upstream)
+            for dep in upstream:
+                downstream[dep].append(name)
+
+        ready = deque(name for name in state if pending[name] == 0)
+        result = []
+        while ready:
+            name = ready.popleft()
+            result.append(name)
+            for dependent in downstream[name]:
+                pending[dependent] -= 1
+                if pending[dependent] == 0:
+                    ready.append(dependent)
+
+        if len(result) != len(state):
+            raise ValueError("Dependency cycle among resources")
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Converts the plan to a JSON-serializable dictionary.
+        :return: Such dictionary.
+        :rtype: Dict[str, Any]
+        """
+        return {
+            "stack_key": list(self._stack_key),
+            "changes": self._changes,
+            "unchanged": self._unchanged,
+            "state": self._state,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "StackPlan":
+        """
+        Builds a plan from its dictionary form.
+        :param data: The dictionary, as returned by to_dict().
+        :type data: Dict[str, Any]
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        return cls(
+            tuple(data["stack_key"]),
+            list(data.get("changes", [])),
+            list(data.get("unchanged", [])),
+            dict(data.get("state", {})),
+        )
+
+    def to_json(self) -> str:
+        """
+        Serializes the plan as JSON.
+        :return: The JSON text.
+        :rtype: str
+        """
+        return json.dumps(self.to_dict(), sort_keys=True)
+
+    @classmethod
+    def from_json(cls, text: str) -> "StackPlan":
+        """
+        Builds a plan from its JSON form.
+        :param text: The JSON text, as returned by to_json().
+        :type text: str
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        return cls.from_dict(json.loads(text))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,347 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/stack_snapshot.py
+
+This script defines the StackSnapshot class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import mmap
+import os
+import pickle
+from pythoneda.shared import BaseObject
+from .stack_operation import StackOperation
+import struct
+from typing import Any, Dict, List, Optional, Tuple
+
+_MAGIC = b"IACS"
+
+_VERSION = 1
+
+_NONE = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHIIIII")
+
+_LENGTH = struct.Struct("<I")
+
+_RECORD = struct.Struct("<III32sI")
+
+
+class StackSnapshot(BaseObject):
+    """
+    The resources and outcome of a stack operation, in a compact binary format.
+
+    Class name: StackSnapshot
+
+    Responsibilities:
+        - Capture the identity of each resource (class, name, id, content hash, dependencies),
+          and the outcome of the operation.
+        - Write it to, and read it from, a file meant to be memory-mapped.
+        - Provide the state StackPlan diffs against, without provider lookups.
+
+    Collaborators:
+        - pythoneda.shared.iac.StackOperation
+        - pythoneda.shared.iac.StackPlan
+    """
+
+    def __init__(
+        self,
+        stackKey: Tuple[str, str, str],
+        entries: List[Dict[str, Any]],
+        outcome: Any = None,
+    ):
+        """
+        Creates a new StackSnapshot instance.
+        :param stackKey: The stack name, project name and location.
+        :type stackKey: Tuple[str, str, str]
+        :param entries: The "type", "name", "id", "hash" and "dependencies" of each resource.
+        :type entries: List[Dict[str, Any]]
+        :param outcome: The outcome of the operation.
+        :type outcome: Any
+        """
+        super().__init__()
+        self._stack_key = tuple(stackKey)
+        self._entries = entries
+        self._outcome = outcome
+
+    @classmethod
+    def of(cls, operation: StackOperation) -> "StackSnapshot":
+        """
+        Captures the resources and outcome of an operation.
+        Ids are only available for the resources already created.
+        :param operation: The operation.
+        :type operation: pythoneda.shared.iac.StackOperation
+        :return: The snapshot.
+        :rtype: pythoneda.shared.iac.StackSnapshot
+        """
+        memo = {}
+        entries = []
+        for resource in operation.resources:
+            resource_class = resource.__class__
+            type_name = f"{resource_class.__module__}.{resource_class.__qualname__}"
+            entries.append(
+                {
+                    "type": type_name,
+                    "name": resource.resource_name,
+                    "id": resource.resource_id,
+                    "hash": resource._content_hash(memo),
+                    "dependencies": [dep.resource_name for dep in resource.upstream],
+                }
+            )
+        return cls(operation.stack_key, entries, operation.outcome)
+
+    @property
+    def stack_key(self) -> Tuple[str, str, str]:
+        """
+        Retrieves the key identifying the stack.
+        :return: The stack name, project name and location.
+        :rtype: Tuple[str, str, str]
+        """
+        return self._stack_key
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        """
+        Retrieves the resources.
+        :return: The "type", "name", "id", "hash" and "dependencies" of each one.
+        :rtype: List[Dict[str, Any]]
+        """
+        return self._entries
+
+    @property
+    def outcome(self) -> Any:
+        """
+        Retrieves the outcome of the operation.
+        :return: Such outcome, or None if it wasn't available or couldn't be pickled.
+        :rtype: Any
+        """
+        return self._outcome
+
+    def id_for(self, name: str) -> Optional[str]:
+        """
+        Retrieves the provider id of a resource.
+        :param name: The name of the resource.
+        :type name: str
+        :return: The id, or None.
+        :rtype: Optional[str]
+        """
+        for entry in self._entries:
+            if entry["name"] == name:
+                return entry["id"]
+        return None
+
+    def ids(self) -> Dict[str, str]:
+        """
+        Retrieves the provider ids of the resources that have one.
+        :return: The ids, by resource name.
+        :rtype: Dict[str, str]
+        """
+        return {
+            entry["name"]: entry["id"]
+            for entry in self._entries
+            if entry["id"] is not None
+        }
+
+    def state(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Retrieves the state of the stack, as expected by StackPlan.
+        :return: The "type", "hash" and "dependencies" of each resource, by name.
+        :rtype: Dict[str, Dict[str, Any]]
+        """
+        return {
+            entry["name"]: {
+                "type": entry["type"],
+                "hash": entry["hash"],
+                "dependencies": list(entry["dependencies"]),
+            }
+            for entry in self._entries
+        }
+
+    def to_bytes(self) -> bytes:
+        """
+        Encodes the snapshot.
+        The layout is a header, a table of unique strings, one fixed-size record
+        per resource followed by the string indexes of its dependencies, and the
+        pickled outcome.
+        :return: The encoded snapshot.
+        :rtype: bytes
+        """
+        strings = {}
+
+        def index_of(value: Optional[str]) -> int:
+            if value is None:
+                return _NONE
+            result = strings.get(value, None)
+            if result is None:
+                result = len(strings)
+                strings[value] = result
+            return result
+
+        stack_name, project_name, location = (
+            index_of(value) for value in self._stack_key
+        )
+        records = []
+        for entry in self._entries:
+            records.append(
+                _RECORD.pack(
+                    index_of(entry["type"]),
+                    index_of(entry["name"]),
+                    index_of(entry["id"]),
+                    bytes.fromhex(entry["hash"]),
+                    len(entry["dependencies"]),
+                )
+            )
+            dependencies = [index_of(name) for name in entry["dependencies"]]
+            records.append(struct.pack(f"<{len(dependencies)}I", *dependencies))
+
+        chunks = [
+            _HEADER.pack(
+                _MAGIC,
+                _VERSION,
+                len(strings),
+                len(self._entries),
+                stack_name,
+                project_name,
+                location,
+            )
+        ]
+        for value in strings:
+            encoded = value.encode("utf-8")
+            chunks.append(_LENGTH.pack(len(encoded)))
+            chunks.append(encoded)
+        chunks.extend(records)
+        outcome = self._pickled_outcome()
+        if outcome is None:
+            chunks.append(_LENGTH.pack(_NONE))
+        else:
+            chunks.append(_LENGTH.pack(len(outcome)))
+            chunks.append(outcome)
+        return b"".join(chunks)
+
+    def _pickled_outcome(self) -> Optional[bytes]:
+        """
+        Pickles the outcome, if possible.
+        :return: The pickled outcome, or None.
+        :rtype: Optional[bytes]
+        """
+        if self._outcome is None:
+            return None
+        try:
+            return pickle.dumps(self._outcome, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as error:
+            self.__class__.logger().warning(
+                f"Outcome of {self._stack_key} not included in the snapshot: {error}"
+            )
+            return None
+
+    @classmethod
+    def from_bytes(cls, data) -> "StackSnapshot":
+        """
+        Decodes a snapshot.
+        :param data: The encoded snapshot, as returned by to_bytes().
+        :type data: bytes
+        :return: The snapshot.
+        :rtype: pythoneda.shared.iac.StackSnapshot
+        """
+        (
+            magic,
+            version,
+            string_count,
+            entry_count,
+            stack_name,
+            project_name,
+            location,
+        ) = _HEADER.unpack_from(data, 0)
+        if magic != _MAGIC:
+            raise ValueError("Not a stack snapshot")
+        if version != _VERSION:
+            raise ValueError(f"Unsupported stack snapshot version: {version}")
+        offset = _HEADER.size
+
+        strings = []
+        for _ in range(string_count):
+            (length,) = _LENGTH.unpack_from(data, offset)
+            offset += _LENGTH.size
+            strings.append(bytes(data[offset : offset + length]).decode("utf-8"))
+            offset += length
+
+        def string_at(index: int) -> Optional[str]:
+            return None if index == _NONE else strings[index]
+
+        entries = []
+        for _ in range(entry_count):
+            type_index, name_index, id_index, digest, dependency_count = (
+                _RECORD.unpack_from(data, offset)
+            )
+            offset += _RECORD.size
+            dependencies = struct.unpack_from(f"<{dependency_count}I", data, offset)
+            offset += 4 * dependency_count
+            entries.append(
+                {
+                    "type": strings[type_index],
+                    "name": strings[name_index],
+                    "id": string_at(id_index),
+                    "hash": digest.hex(),
+                    "dependencies": [strings[index] for index in dependencies],
+                }
+            )
+
+        outcome = None
+        (length,) = _LENGTH.unpack_from(data, offset)
+        offset += _LENGTH.size
+        if length != _NONE:
+            outcome = pickle.loads(data[offset : offset + length])
+
+        return cls(
+            (string_at(stack_name), string_at(project_name), string_at(location)),
+            entries,
+            outcome,
+        )
+
+    def write(self, path: str):
+        """
+        Writes the snapshot to a file, atomically.
+        :param path: The path of the file.
+        :type path: str
+        """
+        temporary = f"{path}.tmp"
+        with open(temporary, "wb") as file:
+            file.write(self.to_bytes())
+        os.replace(temporary, path)
+
+    @classmethod
+    def read(cls, path: str) -> "StackSnapshot":
+        """
+        Reads a snapshot from a file, memory-mapping it.
+        The outcome is unpickled, so only files written by trusted processes must be read.
+        :param path: The path of the file.
+        :type path: str
+        :return: The snapshot.
+        :rtype: pythoneda.shared.iac.StackSnapshot
+        """
+        with open(path, "rb") as file:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                return cls.from_bytes(data)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
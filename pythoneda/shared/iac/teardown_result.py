@@ -0,0 +1,133 @@
+# vim: set fileencoding=utf-8
+"""
+pythoneda/shared/iac/teardown_result.py
+
+This script defines the TeardownResult class.
+
+Copyright (C) 2024-today pythoneda IaC
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import BaseObject
+from .resource import Resource
+from typing import Dict, List
+
+
+class TeardownResult(BaseObject):
+    """
+    The outcome of removing the resources of a stack.
+
+    Class name: TeardownResult
+
+    Responsibilities:
+        - Tell which resources were removed, which failed, which were left untouched,
+          and which were kept because other stacks still use them.
+
+    Collaborators:
+        - pythoneda.shared.iac.ResourceTeardown
+    """
+
+    def __init__(
+        self,
+        removed: List[Resource],
+        failed: Dict[str, BaseException],
+        skipped: List[Resource],
+        retained: List[Resource] = None,
+    ):
+        """
+        Creates a new TeardownResult instance.
+        :param removed: The removed resources, in removal order.
+        :type removed: List[pythoneda.shared.iac.Resource]
+        :param failed: The errors of the resources that could not be removed, by name.
+        :type failed: Dict[str, BaseException]
+        :param skipped: The resources not attempted because a dependent one failed.
+        :type skipped: List[pythoneda.shared.iac.Resource]
+        :param retained: The shared resources released, but kept for other stacks.
+        :type retained: List[pythoneda.shared.iac.Resource]
+        """
+        super().__init__()
+        self._removed = removed
+        self._failed = failed
+        self._skipped = skipped
+        self._retained = retained if retained is not None else []
+
+    @property
+    def removed(self) -> List[Resource]:
+        """
+        Retrieves the removed resources.
+        :return: Such resources, in removal order.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return self._removed
+
+    @property
+    def failed(self) -> Dict[str, BaseException]:
+        """
+        Retrieves the errors of the resources that could not be removed.
+        :return: Such errors, by resource name.
+        :rtype: Dict[str, BaseException]
+        """
+        return self._failed
+
+    @property
+    def skipped(self) -> List[Resource]:
+        """
+        Retrieves the resources not attempted because a dependent one failed.
+        :return: Such resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return self._skipped
+
+    @property
+    def retained(self) -> List[Resource]:
+        """
+        Retrieves the shared resources this stack released, but other stacks still use.
+        :return: Such resources.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return self._retained
+
+    @property
+    def succeeded(self) -> bool:
+        """
+        Checks whether all resources were removed.
+        :return: True in such case.
+        :rtype: bool
+        """
+        return not self._failed and not self._skipped
+
+    def to_dict(self) -> Dict[str, List[str]]:
+        """
+        Summarizes the outcome, to be included in removal events.
+        :return: The names of the removed, failed, skipped and retained resources,
+        and the errors.
+        :rtype: Dict[str, List[str]]
+        """
+        return {
+            "removed": [resource.resource_name for resource in self._removed],
+            "failed": sorted(self._failed),
+            "skipped": [resource.resource_name for resource in self._skipped],
+            "retained": [resource.resource_name for resource in self._retained],
+            "errors": [f"{name}: {error}" for name, error in sorted(self._failed.items())],
+        }
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -20,12 +20,15 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
+from .docker_digest_index import DockerDigestIndex
+from .resource import Resource
+from .provider_client_pool import ProviderClientPool
 from .stack_operation import StackOperation
 from pythoneda.shared import Event
 from pythoneda.shared.iac.events import (
     DockerResourcesUpdateRequested,
 )
-from typing import Dict, List
+from typing import Dict, Iterable, List
 
 
 class UpdateDockerResources(StackOperation, abc.ABC):
@@ -38,16 +41,76 @@ class UpdateDockerResources(StackOperation, abc.ABC):
         - Represent the action of updating Docker resources in IaC stacks.
 
     Collaborators:
-        - None
+        - pythoneda.shared.iac.DockerDigestIndex
     """
 
-    def __init__(self, event: DockerResourcesUpdateRequested):
+    def __init__(
+        self, event: DockerResourcesUpdateRequested, clientPool: ProviderClientPool = None
+    ):
         """
         Creates a new UpdateDockerResources instance.
         :param event: The event.
         :type event: pythoneda.shared.iac.events.DockerResourcesUpdateRequested
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
         """
-        super().__init__(event)
+        super().__init__(event, clientPool)
+
+    @property
+    def digest_index(self) -> DockerDigestIndex:
+        """
+        Retrieves the index of deployed image digests of the stack.
+        :return: Such index.
+        :rtype: pythoneda.shared.iac.DockerDigestIndex
+        """
+        return DockerDigestIndex.for_stack(self.stack_key)
+
+    def _is_up_to_date(self, resources: Iterable[Resource], digest: str) -> bool:
+        """
+        Checks whether all Docker-dependent resources of the stack already run given digest,
+        in which case the operation can succeed right away.
+        Resources never deployed by an earlier operation are not up to date.
+        :param resources: The current Docker-dependent resources of the stack.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :param digest: The requested image digest.
+        :type digest: str
+        :return: True in such case.
+        :rtype: bool
+        """
+        return self.digest_index.is_current(
+            digest, (resource.resource_name for resource in resources)
+        )
+
+    def _outdated_resources(
+        self, resources: Iterable[Resource], digest: str
+    ) -> List[Resource]:
+        """
+        Retrieves the resources not running given digest.
+        :param resources: The Docker-dependent resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :param digest: The requested image digest.
+        :type digest: str
+        :return: The resources to update.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        index = self.digest_index
+        return [
+            resource
+            for resource in resources
+            if index.digest_of(resource.resource_name) != digest
+        ]
+
+    def _deployed(self, resources: Iterable[Resource], digest: str):
+        """
+        Records given resources now run given digest.
+        :param resources: The updated resources.
+        :type resources: Iterable[pythoneda.shared.iac.Resource]
+        :param digest: The image digest.
+        :type digest: str
+        """
+        index = self.digest_index
+        for resource in resources:
+            index.record(resource.resource_name, digest)
 
     @abc.abstractmethod
     async def perform(self) -> List[Event]:
@@ -20,12 +20,18 @@ You should have received a copy of the GNU General Public License
 along with this program.  If not, see <https://www.gnu.org/licenses/>.
 """
 import abc
+from .resource import Resource
+from .resource_hash_index import ResourceHashIndex
+from .provider_client_pool import ProviderClientPool
+from .resource_progress import ResourceProgress
+from .resource_scheduler import ResourceScheduler
 from .stack_operation import StackOperation
+from .stack_plan import StackPlan
 from pythoneda.shared import Event
 from pythoneda.shared.iac.events import (
     InfrastructureUpdateRequested,
 )
-from typing import Dict, List
+from typing import Any, AsyncIterator, Dict, List, Optional
 
 
 class UpdateInfrastructure(StackOperation, abc.ABC):
@@ -36,27 +42,118 @@ class UpdateInfrastructure(StackOperation, abc.ABC):
 
     Responsibilities:
         - Represent the action of updating the infrastructure of IaC stacks.
+        - Create the declared resources, reporting the progress of each one.
+        - Skip the resources unchanged since the last update.
 
     Collaborators:
-        - None
+        - pythoneda.shared.iac.ResourceScheduler
     """
 
-    def __init__(self, event: InfrastructureUpdateRequested):
+    def __init__(
+        self, event: InfrastructureUpdateRequested, clientPool: ProviderClientPool = None
+    ):
         """
         Creates a new UpdateInfrastructure instance.
         :param event: The event.
         :type event: pythoneda.shared.iac.events.InfrastructureUpdateRequested
+        :param clientPool: The pool of provider clients, if any.
+        :type clientPool: pythoneda.shared.iac.ProviderClientPool
         """
-        super().__init__(event)
+        super().__init__(event, clientPool)
 
-    @abc.abstractmethod
-    async def perform(self) -> List[Event]:
+    def _hash_index(self) -> Optional[ResourceHashIndex]:
         """
-        Brings up the stack.
-        :return: Either an InfrastructureUpdated event or an InfrastructureUpdateFailed.
+        Retrieves the index of content hashes of the last successful update of the
+        stack, so that perform_stream() only creates the resources that changed.
+        Subclasses override it, e.g. with ResourceHashIndex.load() of a file per stack.
+        :return: The index, or None to create all resources.
+        :rtype: Optional[pythoneda.shared.iac.ResourceHashIndex]
+        """
+        return None
+
+    def _changed_resources(
+        self, index: ResourceHashIndex, resources: List[Resource]
+    ) -> List[Resource]:
+        """
+        Retrieves the resources that changed since they were last recorded in given index,
+        either themselves or any of their upstream dependencies.
+        :param index: The index of content hashes of the last successful run.
+        :type index: pythoneda.shared.iac.ResourceHashIndex
+        :param resources: The declared resources.
+        :type resources: List[pythoneda.shared.iac.Resource]
+        :return: The resources to apply.
+        :rtype: List[pythoneda.shared.iac.Resource]
+        """
+        return index.changed(resources)
+
+    def plan(self, previous: Dict[str, Dict[str, Any]] = None) -> StackPlan:
+        """
+        Computes the changes perform() would apply, without calling any provider.
+        The resources are the ones _declare_resources() declares, lazily, so they
+        aren't created.
+        :param previous: The snapshot of the last known state, if any.
+        :type previous: Dict[str, Dict[str, Any]]
+        :return: The plan.
+        :rtype: pythoneda.shared.iac.StackPlan
+        """
+        return StackPlan.for_update(
+            self.stack_key, self._declare_resources(), previous
+        )
+
+    async def perform_stream(self) -> AsyncIterator[Event]:
+        """
+        Brings up the stack, yielding the progress of each resource _declare_resources()
+        declares as soon as it's created, independent ones concurrently, and then the
+        events of _updated_events().
+        With a _hash_index(), unchanged resources are reported as such and added to the
+        operation lazily, without creating them; the index records the new hashes
+        once all changed resources are created.
+        Subclasses implementing perform() instead get its events.
+        :return: An async iterator of the events representing the progress and outcome.
+        :rtype: AsyncIterator[pythoneda.shared.Event]
+        """
+        if self.__class__._implements_perform():
+            async for event in super().perform_stream():
+                yield event
+            return
+        resources = self._declare_resources()
+        index = self._hash_index()
+        changed = resources
+        if index is not None:
+            changed = self._changed_resources(index, resources)
+            pending = {id(resource) for resource in changed}
+            for resource in resources:
+                if id(resource) not in pending:
+                    if resource not in self._resources:
+                        self._resources.append(resource)
+                    yield self._progress(resource, ResourceProgress.UNCHANGED)
+        scheduler = self._scheduler()
+        scheduler.add_resources(changed)
+        async for event in self._create_resources(scheduler):
+            yield event
+        if index is not None:
+            index.record(resources)
+            index.save()
+        for event in self._updated_events():
+            yield event
+
+    def _scheduler(self) -> ResourceScheduler:
+        """
+        Builds the scheduler creating the resources of the stack.
+        Subclasses override it to set its concurrency or per-resource deadline.
+        :return: The scheduler.
+        :rtype: pythoneda.shared.iac.ResourceScheduler
+        """
+        return ResourceScheduler(*self.stack_key)
+
+    def _updated_events(self) -> List[Event]:
+        """
+        Builds the events closing perform_stream() once all resources are created,
+        e.g. InfrastructureUpdated. None by default.
+        :return: The events.
         :rtype: List[pythoneda.shared.Event]
         """
-        pass
+        return []
 
 
 # vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
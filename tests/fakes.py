@@ -0,0 +1,169 @@
+# vim: set fileencoding=utf-8
+"""
+tests/fakes.py
+
+This file defines the stand-in resources used by the tests.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared import Event
+from pythoneda.shared.iac import Resource, StackOperation, StackOperationFactory
+import threading
+import time
+from typing import Any, List
+
+
+class FakeProviderObject:
+    """
+    Stands for the object a provider returns for a resource.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.id = f"/resources/{name}"
+
+
+class FakeResource(Resource):
+    """
+    Resource whose creation and deletion sleep for a while instead of calling
+    a provider, and records which resources were created and deleted.
+    """
+
+    __slots__ = ()
+
+    delay = 0.0
+
+    created = []
+
+    deleted = []
+
+    _lock = threading.Lock()
+
+    @classmethod
+    @property
+    def max_length(cls) -> int:
+        return 63
+
+    @classmethod
+    def _resource_name(cls, stackName: str, projectName: str, location: str) -> str:
+        return cls.__name__.lower()
+
+    def _create(self, name: str) -> Any:
+        if self.__class__.delay:
+            time.sleep(self.__class__.delay)
+        with FakeResource._lock:
+            self.__class__.created.append(name)
+        return FakeProviderObject(name)
+
+    def _post_create(self, resource: Any):
+        pass
+
+    def _delete(self, resource: Any):
+        if self.__class__.delay:
+            time.sleep(self.__class__.delay)
+        with FakeResource._lock:
+            self.__class__.deleted.append(self.resource_name)
+
+    @classmethod
+    def from_id(cls, id: str, name: str = None) -> Any:
+        return FakeProviderObject(name or id)
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets the resources created and deleted so far.
+        """
+        cls.created = []
+        cls.deleted = []
+
+
+class FakeEvent:
+    """
+    Gives events a stack, without running the constructor of the event class.
+    """
+
+    def __init__(self, stackName: str):
+        self._fake_stack_name = stackName
+
+    @property
+    def stack_name(self) -> str:
+        return self._fake_stack_name
+
+    @property
+    def project_name(self) -> str:
+        return "tests"
+
+    @property
+    def location(self) -> str:
+        return "westeurope"
+
+
+_fake_event_classes = {}
+
+
+def fake_event(eventClass: type, stackName: str = "dev") -> Event:
+    """
+    Builds an event of given class, for given stack.
+    """
+    result = _fake_event_classes.get(eventClass, None)
+    if result is None:
+        result = type(f"Fake{eventClass.__name__}", (FakeEvent, eventClass), {})
+        _fake_event_classes[eventClass] = result
+    return result(stackName)
+
+
+class FakeOperation(StackOperation):
+    """
+    Operation that sleeps for a while instead of calling a provider,
+    and records which events it performed.
+    """
+
+    delay = 0.0
+
+    performed = []
+
+    async def perform(self) -> List[Event]:
+        if self.__class__.delay:
+            await asyncio.sleep(self.__class__.delay)
+        self.__class__.performed.append(self.event)
+        return [self.event]
+
+    @classmethod
+    def reset(cls):
+        """
+        Forgets the events performed so far.
+        """
+        cls.performed = []
+
+
+class FakeStackOperationFactory(StackOperationFactory):
+    """
+    Creates a FakeOperation for any event.
+    """
+
+    def new(self, event: Event) -> StackOperation:
+        return FakeOperation(event)
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,77 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_docker_digest_index.py
+
+This file tests DockerDigestIndex.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import DockerDigestIndex
+
+
+def test_stacks_running_a_single_digest_are_current():
+    index = DockerDigestIndex()
+    index.record("app", "sha256:1")
+    index.record("worker", "sha256:1")
+
+    assert index.runs_only("sha256:1")
+    assert index.is_current("sha256:1", ["app", "worker"])
+    assert not index.is_current("sha256:1", ["app", "other"])
+    assert not index.is_current("sha256:2", ["app"])
+
+
+def test_the_single_digest_marker_follows_records_and_removals():
+    index = DockerDigestIndex()
+    index.record("app", "sha256:1")
+    index.record("worker", "sha256:2")
+
+    assert not index.runs_only("sha256:1")
+    assert index.is_current("sha256:1", ["app"])
+    assert not index.is_current("sha256:1", ["app", "worker"])
+
+    index.forget("worker")
+    assert index.runs_only("sha256:1")
+    index.record("app", "sha256:2")
+    assert index.runs_only("sha256:2")
+
+
+def test_only_the_most_recently_used_stacks_are_kept():
+    DockerDigestIndex._stacks.clear()
+    default = DockerDigestIndex.max_stacks
+    DockerDigestIndex.max_stacks = 2
+    try:
+        first = DockerDigestIndex.for_stack(("first", "tests", "westeurope"))
+        DockerDigestIndex.for_stack(("second", "tests", "westeurope"))
+        assert DockerDigestIndex.for_stack(("first", "tests", "westeurope")) is first
+        DockerDigestIndex.for_stack(("third", "tests", "westeurope"))
+
+        assert list(DockerDigestIndex._stacks) == [
+            ("first", "tests", "westeurope"),
+            ("third", "tests", "westeurope"),
+        ]
+    finally:
+        DockerDigestIndex.max_stacks = default
+        DockerDigestIndex._stacks.clear()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,98 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_docker_image_details_cache.py
+
+This file tests the DockerImageDetailsCache class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import DockerImageDetailsCache
+import pytest
+
+
+class CountingFetch:
+    """
+    Looks image details up slowly, counting the lookups.
+    """
+
+    def __init__(self, delay: float = 0.05):
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return {"digest": "sha256:1"}
+
+
+def test_concurrent_requests_share_one_lookup():
+    cache = DockerImageDetailsCache()
+    fetch = CountingFetch()
+
+    async def request_all():
+        return await asyncio.gather(
+            *(cache.get("app:latest", None, fetch) for _ in range(5))
+        )
+
+    results = asyncio.run(request_all())
+
+    assert fetch.calls == 1
+    assert all(result == {"digest": "sha256:1"} for result in results)
+    assert cache.stats() == {"hits": 0, "misses": 1, "coalesced": 4, "size": 1}
+
+
+def test_cancelling_the_first_request_leaves_the_others_unaffected():
+    cache = DockerImageDetailsCache()
+    fetch = CountingFetch()
+
+    async def request_and_cancel_first():
+        first = asyncio.ensure_future(cache.get("app:latest", None, fetch))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(cache.get("app:latest", None, fetch))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(request_and_cancel_first()) == {"digest": "sha256:1"}
+    assert fetch.calls == 1
+
+
+def test_failed_lookups_are_not_cached():
+    cache = DockerImageDetailsCache()
+
+    async def failing():
+        raise ConnectionError("registry down")
+
+    async def request():
+        with pytest.raises(ConnectionError):
+            await cache.get("app:latest", None, failing)
+        return await cache.get("app:latest", None, CountingFetch(0))
+
+    assert asyncio.run(request()) == {"digest": "sha256:1"}
+    assert cache.misses == 2
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,126 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_import_time.py
+
+This file tests the time it takes to import the package.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+import subprocess
+import sys
+from typing import Any, Dict, List, Tuple
+
+PACKAGE = "pythoneda.shared.iac"
+
+RUNS = 3
+
+# budgets in microseconds, well above what a cold import takes
+PACKAGE_BUDGET = 25000
+
+RESOURCE_BUDGET = 100000
+
+RESOURCE_MODULES = {
+    f"{PACKAGE}.instrumentation",
+    f"{PACKAGE}.location_abbreviations",
+    f"{PACKAGE}.metrics_sink",
+}
+
+
+def import_times(statement: str) -> List[Tuple[str, int, int]]:
+    """
+    Runs given statement in a fresh interpreter with -X importtime.
+    :return: The (module, self, cumulative) entries, module names keeping
+    their indentation.
+    """
+    environment = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", statement],
+        env=environment,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    result = []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        own, cumulative, module = line[len("import time:") :].split("|")
+        if own.strip().isdigit():
+            result.append((module[1:], int(own), int(cumulative)))
+    return result
+
+
+def package_cost(entries: List[Tuple[str, int, int]]) -> Dict[str, Any]:
+    """
+    Measures what importing the package costs, on top of pythoneda.shared,
+    and what accessing its exports costs afterwards.
+    """
+    names = [module.strip() for module, _, _ in entries]
+    package = names.index(PACKAGE)
+    shared = sum(
+        cumulative
+        for module, _, cumulative in entries[:package]
+        if module.strip() == "pythoneda.shared"
+    )
+    # modules imported lazily by the package show up as top-level entries
+    # after it; import_module() doesn't report the exporting module itself
+    exports = sum(
+        cumulative
+        for module, _, cumulative in entries[package + 1 :]
+        if not module.startswith(" ")
+    )
+    return {
+        "package": entries[package][2] - shared,
+        "exports": exports,
+        "modules": {name for name in names if name.startswith(f"{PACKAGE}.")},
+    }
+
+
+def test_importing_the_package_loads_no_submodules():
+    cost = package_cost(import_times(f"import {PACKAGE}"))
+
+    assert cost["modules"] == set()
+    assert cost["exports"] == 0
+
+
+def test_importing_the_package_is_within_budget():
+    best = min(
+        package_cost(import_times(f"import {PACKAGE}"))["package"]
+        for _ in range(RUNS)
+    )
+
+    assert best < PACKAGE_BUDGET
+
+
+def test_importing_resource_is_within_budget():
+    costs = [
+        package_cost(import_times(f"from {PACKAGE} import Resource"))
+        for _ in range(RUNS)
+    ]
+
+    assert costs[0]["modules"] <= RESOURCE_MODULES
+    assert min(cost["exports"] for cost in costs) < RESOURCE_BUDGET
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
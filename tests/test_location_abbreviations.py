@@ -0,0 +1,95 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_location_abbreviations.py
+
+This file tests LocationAbbreviations.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import (
+    AZURE_LOCATION_ABBREVIATIONS,
+    LocationAbbreviations,
+    Resource,
+)
+from tests.fakes import FakeResource
+import pytest
+
+
+class AzureResource(FakeResource):
+    location_abbreviations = AZURE_LOCATION_ABBREVIATIONS
+
+
+def test_locations_sharing_an_abbreviation_are_rejected():
+    with pytest.raises(ValueError):
+        LocationAbbreviations({"westeurope": "we", "westus": "we"})
+
+
+def test_extending_adds_locations_to_a_new_index():
+    base = LocationAbbreviations({"westeurope": "weu"})
+
+    extended = base.extend({"mars": "mrs", "westeurope": "weu"})
+
+    assert dict(extended) == {"westeurope": "weu", "mars": "mrs"}
+    assert dict(base) == {"westeurope": "weu"}
+
+
+def test_extending_cannot_change_or_reuse_abbreviations():
+    base = LocationAbbreviations({"westeurope": "weu"})
+
+    with pytest.raises(ValueError):
+        base.extend({"westeurope": "we"})
+    with pytest.raises(ValueError):
+        base.extend({"mars": "weu"})
+
+
+def test_indexes_are_immutable():
+    source = {"westeurope": "weu"}
+    index = LocationAbbreviations(source)
+    source["westeurope"] = "changed"
+
+    with pytest.raises(TypeError):
+        index["mars"] = "mrs"
+    with pytest.raises(TypeError):
+        index._abbreviations["mars"] = "mrs"
+    assert index["westeurope"] == "weu"
+
+
+def test_azure_abbreviations_are_unique():
+    abbreviations = list(AZURE_LOCATION_ABBREVIATIONS.values())
+
+    assert len(set(abbreviations)) == len(abbreviations)
+    assert AZURE_LOCATION_ABBREVIATIONS["westeurope"] == "weu"
+    assert AZURE_LOCATION_ABBREVIATIONS.get("mars") is None
+
+
+def test_names_use_the_abbreviations_of_their_class():
+    assert len(Resource.location_abbreviations) == 0
+
+    abbreviated = AzureResource._truncate_name("dev", "p", "westeurope", "name", 63)
+    verbatim = FakeResource._truncate_name("dev", "p", "westeurope", "name", 63)
+
+    assert abbreviated == "dpweuname"
+    assert verbatim == "dpwesteuropename"
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
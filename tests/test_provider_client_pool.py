@@ -0,0 +1,203 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_provider_client_pool.py
+
+This file tests the ProviderClientPool class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import ProviderClientPool, RegistryStackOperationFactory
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeOperation, fake_event
+import pytest
+
+
+class CountingClient:
+    """
+    Stand-in provider client, counting how many are created and closed.
+    """
+
+    created = 0
+
+    closed = 0
+
+    def __init__(self):
+        CountingClient.created += 1
+        self.healthy = True
+
+    def close(self):
+        CountingClient.closed += 1
+
+    @classmethod
+    def reset(cls):
+        cls.created = 0
+        cls.closed = 0
+
+
+class PooledOperation(FakeOperation):
+    lent = 0
+
+    most_lent = 0
+
+    async def perform(self):
+        async with self.client_pool.client():
+            cls = PooledOperation
+            cls.lent += 1
+            cls.most_lent = max(cls.most_lent, cls.lent)
+            await asyncio.sleep(0.01)
+            cls.lent -= 1
+        return [self.event]
+
+
+class PooledFactory(RegistryStackOperationFactory):
+    pass
+
+
+PooledFactory.register(InfrastructureUpdateRequested, PooledOperation, "clientPool")
+
+
+def pool(**kwargs) -> ProviderClientPool:
+    return ProviderClientPool(CountingClient, close=CountingClient.close, **kwargs)
+
+
+def test_back_to_back_operations_reuse_a_warm_client():
+    CountingClient.reset()
+    factory = PooledFactory(clientPool=pool())
+
+    async def perform_all():
+        for index in range(5):
+            event = fake_event(InfrastructureUpdateRequested, f"stack{index}")
+            await factory.new(event).perform()
+
+    asyncio.run(perform_all())
+
+    assert CountingClient.created == 1
+    assert factory.client_pool.idle == 1
+
+
+def test_concurrent_operations_stay_within_the_size_limit():
+    CountingClient.reset()
+    PooledOperation.most_lent = 0
+    factory = PooledFactory(clientPool=pool(maxSize=2))
+
+    async def perform_all():
+        events = [
+            fake_event(InfrastructureUpdateRequested, f"stack{index}")
+            for index in range(6)
+        ]
+        await asyncio.gather(*(factory.new(event).perform() for event in events))
+
+    asyncio.run(perform_all())
+
+    assert CountingClient.created == 2
+    assert PooledOperation.most_lent == 2
+
+
+def test_unhealthy_and_idle_clients_are_replaced():
+    CountingClient.reset()
+    clients = pool(healthCheck=lambda client: client.healthy, idleTimeout=0.05)
+
+    async def borrow_three_times():
+        async with clients.client() as client:
+            client.healthy = False
+        async with clients.client():
+            pass
+        await asyncio.sleep(0.1)
+        async with clients.client():
+            pass
+
+    asyncio.run(borrow_three_times())
+
+    assert CountingClient.created == 3
+    assert CountingClient.closed == 2
+
+
+def test_only_connection_errors_discard_the_client():
+    CountingClient.reset()
+    clients = pool()
+
+    async def fail(error: BaseException):
+        with pytest.raises(type(error)):
+            async with clients.client():
+                raise error
+
+    asyncio.run(fail(ValueError("application error")))
+    asyncio.run(fail(asyncio.CancelledError()))
+    assert CountingClient.created == 1
+    assert clients.idle == 1
+
+    asyncio.run(fail(ConnectionResetError("reset by peer")))
+    assert CountingClient.closed == 1
+    assert clients.size == 0
+
+
+def test_discarded_errors_are_configurable():
+    CountingClient.reset()
+    clients = pool(discardOn=(KeyError,))
+
+    async def fail():
+        async with clients.client():
+            raise KeyError("stale token")
+
+    with pytest.raises(KeyError):
+        asyncio.run(fail())
+
+    assert CountingClient.closed == 1
+
+
+def test_pools_can_be_used_from_successive_loops():
+    CountingClient.reset()
+    clients = pool(maxSize=1)
+
+    async def borrow_twice():
+        await asyncio.gather(*(borrow() for _ in range(2)))
+
+    async def borrow():
+        async with clients.client():
+            await asyncio.sleep(0.01)
+
+    asyncio.run(borrow_twice())
+    asyncio.run(borrow_twice())
+
+    assert CountingClient.created == 1
+
+
+def test_releasing_a_client_evicts_the_idle_ones():
+    CountingClient.reset()
+    clients = pool(idleTimeout=0.05)
+
+    async def borrow_two_then_release_late():
+        first = await clients.acquire()
+        second = await clients.acquire()
+        await clients.release(first)
+        await asyncio.sleep(0.1)
+        await clients.release(second)
+
+    asyncio.run(borrow_two_then_release_late())
+
+    assert CountingClient.closed == 1
+    assert clients.idle == 1
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
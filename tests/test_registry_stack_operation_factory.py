@@ -0,0 +1,94 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_registry_stack_operation_factory.py
+
+This file tests the RegistryStackOperationFactory class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared import Event
+from pythoneda.shared.iac import RegistryStackOperationFactory
+from pythoneda.shared.iac.events import (
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+import pytest
+from tests.fakes import FakeOperation, fake_event
+
+
+class OperationA(FakeOperation):
+    pass
+
+
+class OperationB(FakeOperation):
+    pass
+
+
+class OperationC(FakeOperation):
+    pass
+
+
+def factories():
+    class Base(RegistryStackOperationFactory):
+        pass
+
+    class Child(Base):
+        pass
+
+    return Base, Child
+
+
+def test_subclasses_see_later_registrations_of_their_bases():
+    Base, Child = factories()
+    update = fake_event(InfrastructureUpdateRequested)
+    Base.register(Event, OperationA)
+    assert isinstance(Child().new(update), OperationA)
+
+    Base.register(InfrastructureUpdateRequested, OperationB)
+
+    assert isinstance(Base().new(update), OperationB)
+    assert isinstance(Child().new(update), OperationB)
+
+
+def test_subclass_registrations_take_precedence():
+    Base, Child = factories()
+    removal = fake_event(InfrastructureRemovalRequested)
+    Base.register(InfrastructureRemovalRequested, OperationA)
+    Child.register(InfrastructureRemovalRequested, OperationC)
+    assert isinstance(Child().new(removal), OperationC)
+
+    Base.register(InfrastructureRemovalRequested, OperationB)
+
+    assert isinstance(Base().new(removal), OperationB)
+    assert isinstance(Child().new(removal), OperationC)
+
+
+def test_unregistered_events_are_rejected():
+    Base, _ = factories()
+    Base.register(InfrastructureUpdateRequested, OperationA)
+
+    with pytest.raises(ValueError):
+        Base().new(fake_event(InfrastructureRemovalRequested))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,160 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_graph.py
+
+This file tests ResourceGraph.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import ResourceGraph
+from tests.fakes import FakeResource
+import pytest
+
+
+class RootResource(FakeResource):
+    pass
+
+
+class LeafResource(FakeResource):
+    pass
+
+
+class BrokenResource(FakeResource):
+    @property
+    def resource_name(self) -> str:
+        raise RuntimeError("no name")
+
+
+def root() -> RootResource:
+    return RootResource("dev", "tests", "westeurope", {}, lazy=True)
+
+
+def leaf(parent: FakeResource) -> LeafResource:
+    return LeafResource("dev", "tests", "westeurope", {"parent": parent}, lazy=True)
+
+
+def test_inserted_resources_are_indexed():
+    graph = ResourceGraph()
+    parent = root()
+    child = leaf(parent)
+    graph.append(child)
+
+    graph.insert(0, parent)
+
+    assert graph == [parent, child]
+    assert graph.by_name(parent.resource_name) is parent
+    assert graph.of_type(RootResource) == [parent]
+    assert graph.dependents_of(parent) == [child]
+
+
+def test_replaced_resources_leave_the_indexes():
+    parent = root()
+    child = leaf(parent)
+    graph = ResourceGraph([parent, child])
+    other = leaf(parent)
+
+    graph[1] = other
+
+    assert child not in graph
+    assert other in graph
+    assert graph.dependents_of(parent) == [other]
+    assert graph.of_type(LeafResource, exact=True) == [other]
+
+
+def test_deleted_resources_leave_the_indexes():
+    parent = root()
+    graph = ResourceGraph([parent, leaf(parent)])
+
+    del graph[1]
+    graph.remove(parent)
+
+    assert len(graph) == 0
+    assert graph.by_name(parent.resource_name) is None
+    assert graph.dependents_of(parent) == []
+    assert graph._by_name == {} and graph._dependents == {} and graph._members == {}
+
+
+def test_slices_are_indexed():
+    parents = [root(), root()]
+    graph = ResourceGraph(parents)
+    children = [leaf(parents[0]), leaf(parents[1])]
+
+    graph[1:] = children
+    assert graph[:] == [parents[0]] + children
+    assert graph.dependents_of(parents[0]) == [children[0]]
+    assert graph.dependents_of(parents[1]) == [children[1]]
+    assert parents[1] not in graph
+
+    del graph[:2]
+    assert graph == [children[1]]
+    assert graph.dependents_of(parents[0]) == []
+
+
+def test_duplicate_names_keep_the_first_resource_added():
+    first, second = root(), root()
+    graph = ResourceGraph([first, second])
+
+    assert graph.by_name(first.resource_name) is first
+    graph.remove(first)
+    assert graph.by_name(first.resource_name) is second
+
+
+def test_the_same_resource_can_be_added_twice():
+    parent = root()
+    graph = ResourceGraph([parent, parent])
+
+    graph.pop()
+
+    assert parent in graph
+    assert graph.by_name(parent.resource_name) is parent
+
+
+def test_resources_that_cannot_be_indexed_leave_the_graph_untouched():
+    parent = root()
+    graph = ResourceGraph([parent])
+    broken = BrokenResource("dev", "tests", "westeurope", {"parent": parent}, lazy=True)
+
+    for change in (
+        lambda: graph.append(broken),
+        lambda: graph.insert(0, broken),
+        lambda: graph.__setitem__(0, broken),
+        lambda: graph.__setitem__(slice(0, 1), [leaf(parent), broken]),
+    ):
+        with pytest.raises(RuntimeError):
+            change()
+
+    assert graph == [parent]
+    assert graph.dependents_of(parent) == []
+    assert list(graph._members) == [id(parent)]
+
+
+def test_graphs_are_not_lists():
+    graph = ResourceGraph([root()])
+
+    with pytest.raises(TypeError):
+        graph + [root()]
+    assert not hasattr(graph, "copy")
+    assert len(list(graph) + [root()]) == 2
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
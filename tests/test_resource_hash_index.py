@@ -0,0 +1,112 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_hash_index.py
+
+This file tests the ResourceHashIndex class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import ResourceHashIndex
+from tests.fakes import FakeProviderObject, FakeResource
+
+
+class ConfiguredResource(FakeResource):
+    sku = "basic"
+
+    def _configuration(self):
+        return {"sku": self.__class__.sku, "tags": {"team", "iac"}}
+
+
+def test_unchanged_resources_are_skipped():
+    ConfiguredResource.sku = "basic"
+    root = ConfiguredResource("dev", "tests", "westeurope", {}, lazy=True)
+    leaf = FakeResource("dev", "tests", "westeurope", {"root": root}, lazy=True)
+    index = ResourceHashIndex()
+    index.record([root, leaf])
+
+    assert index.changed([root, leaf]) == []
+
+
+def test_configuration_changes_propagate_downstream():
+    ConfiguredResource.sku = "basic"
+    root = ConfiguredResource("dev", "tests", "westeurope", {}, lazy=True)
+    leaf = FakeResource("dev", "tests", "westeurope", {"root": root}, lazy=True)
+    index = ResourceHashIndex()
+    index.record([root, leaf])
+
+    ConfiguredResource.sku = "premium"
+    try:
+        assert index.changed([root, leaf]) == [root, leaf]
+    finally:
+        ConfiguredResource.sku = "basic"
+
+
+class Client:
+    """
+    Stands for a provider object without an id.
+    """
+
+    def __init__(self, endpoint: str):
+        self.endpoint = endpoint
+
+
+class ClientResource(FakeResource):
+    @classmethod
+    def _describe_opaque(cls, value):
+        if isinstance(value, Client):
+            return value.endpoint
+        return super()._describe_opaque(value)
+
+
+def test_provider_objects_are_hashed_by_their_id():
+    vnet = FakeProviderObject("vnet")
+    resource = FakeResource("dev", "tests", "westeurope", {"vnet": vnet}, lazy=True)
+    index = ResourceHashIndex()
+    index.record([resource])
+
+    assert index.changed([resource]) == []
+    vnet.id = "/resources/other"
+    assert index.changed([resource]) == [resource]
+
+
+def test_subclasses_describe_other_opaque_values():
+    client = Client("https://management.azure.com")
+    resource = ClientResource(
+        "dev", "tests", "westeurope", {"client": client}, lazy=True
+    )
+    index = ResourceHashIndex()
+    index.record([resource])
+
+    assert index.changed([resource]) == []
+
+
+def test_undescribed_opaque_dependencies_always_count_as_changed():
+    client = object()
+    resource = FakeResource("dev", "tests", "westeurope", {"client": client}, lazy=True)
+    index = ResourceHashIndex()
+    index.record([resource])
+
+    assert index.changed([resource]) == [resource]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
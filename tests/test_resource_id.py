@@ -0,0 +1,93 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_id.py
+
+This file tests how Resource provides the ids of actual resources.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import StackSnapshot
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeOperation, FakeProviderObject, FakeResource, fake_event
+
+
+class Output:
+    """
+    Stands for a provider output, whose value isn't a plain string.
+    """
+
+    def __init__(self, value: str):
+        self._value = value
+
+    def apply(self, function):
+        return function(self._value)
+
+
+class OutputResource(FakeResource):
+    def _create(self, name):
+        result = FakeProviderObject(name)
+        result.id = Output(f"/outputs/{name}")
+        return result
+
+    def _resource_id(self, resource):
+        return resource.id.apply(str)
+
+
+class OpaqueResource(FakeResource):
+    def _create(self, name):
+        result = FakeProviderObject(name)
+        result.id = Output(f"/outputs/{name}")
+        return result
+
+
+def test_plain_string_ids_are_used_as_is():
+    resource = FakeResource("dev", "tests", "westeurope", {})
+
+    assert resource.resource_id == f"/resources/{resource.resource_name}"
+
+
+def test_subclasses_resolve_output_ids():
+    resource = OutputResource("dev", "tests", "westeurope", {})
+
+    assert resource.resource_id == f"/outputs/{resource.resource_name}"
+
+
+def test_unknown_ids_are_none():
+    lazy = FakeResource("dev", "tests", "westeurope", {}, lazy=True)
+    opaque = OpaqueResource("dev", "tests", "westeurope", {})
+
+    assert lazy.resource_id is None
+    assert opaque.resource_id is None
+
+
+def test_snapshots_keep_the_resolved_ids():
+    operation = FakeOperation(fake_event(InfrastructureUpdateRequested))
+    resource = OutputResource("dev", "tests", "westeurope", {})
+    operation.resources.append(resource)
+
+    snapshot = StackSnapshot.from_bytes(StackSnapshot.of(operation).to_bytes())
+
+    assert snapshot.id_for(resource.resource_name) == resource.resource_id
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,113 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_memory.py
+
+This file tests the memory used by Resource instances.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import gc
+import importlib.util
+import os
+from tests.fakes import FakeResource
+import pytest
+import subprocess
+import tracemalloc
+
+INSTANCES = 10000
+
+# the last revision of Resource before it declared __slots__
+BASELINE_REVISION = "7caf7ea^"
+
+
+def baseline_resource_class() -> type:
+    """
+    Builds FakeResource on top of the Resource of BASELINE_REVISION, read from git.
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    try:
+        source = subprocess.run(
+            [
+                "git",
+                "-C",
+                root,
+                "show",
+                f"{BASELINE_REVISION}:pythoneda/shared/iac/resource.py",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        pytest.skip("the git history of the baseline Resource is not available")
+    spec = importlib.util.spec_from_loader(
+        "pythoneda.shared.iac._baseline_resource", loader=None
+    )
+    module = importlib.util.module_from_spec(spec)
+    module.__package__ = "pythoneda.shared.iac"
+    exec(compile(source, "baseline/resource.py", "exec"), module.__dict__)
+    methods = {
+        name: value
+        for name, value in vars(FakeResource).items()
+        if name not in ("__slots__", "__dict__", "__weakref__", "_abc_impl")
+    }
+    return type("BaselineFakeResource", (module.Resource,), methods)
+
+
+def bytes_per_instance(build) -> float:
+    build()
+    gc.collect()
+    tracemalloc.start()
+    try:
+        instances = [build() for _ in range(INSTANCES)]
+        current, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert len(instances) == INSTANCES
+    return current / INSTANCES
+
+
+def test_state_lives_in_slots():
+    dependencies = {"network": object(), "registry": object()}
+    resource = FakeResource("dev", "tests", "westeurope", dependencies, lazy=True)
+
+    assert vars(resource) == {}
+    assert resource.network is dependencies["network"]
+
+
+def test_resources_use_less_memory_than_before_declaring_slots():
+    baseline = baseline_resource_class()
+    dependencies = {"network": object(), "registry": object(), "vault": object()}
+
+    slotted = bytes_per_instance(
+        lambda: FakeResource("dev", "tests", "westeurope", dependencies, lazy=True)
+    )
+    unslotted = bytes_per_instance(
+        lambda: baseline("dev", "tests", "westeurope", dependencies, lazy=True)
+    )
+
+    assert slotted < unslotted
+    assert slotted < 160
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
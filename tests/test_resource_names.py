@@ -0,0 +1,70 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_names.py
+
+This file tests the cached names of Resource classes.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import Resource
+from tests.fakes import FakeResource
+
+
+class OtherResource(FakeResource):
+    pass
+
+
+def test_names_are_cached_per_class():
+    FakeResource.clear_name_cache()
+    OtherResource.clear_name_cache()
+
+    name = FakeResource.name_for("dev", "tests", "westeurope")
+    other = OtherResource.name_for("dev", "tests", "westeurope")
+
+    assert name == FakeResource._compute_name("dev", "tests", "westeurope")
+    assert other == OtherResource._compute_name("dev", "tests", "westeurope")
+    assert name != other
+    assert FakeResource.name_for("dev", "tests", "westeurope") is name
+    assert Resource._name_caches[FakeResource].cache_info().hits == 1
+    assert Resource._name_caches[OtherResource].cache_info().hits == 0
+
+
+def test_clearing_a_class_cache_leaves_the_others():
+    FakeResource.name_for("dev", "tests", "westeurope")
+    OtherResource.name_for("dev", "tests", "westeurope")
+
+    FakeResource.clear_name_cache()
+
+    assert Resource._name_caches[FakeResource].cache_info().currsize == 0
+    assert Resource._name_caches[OtherResource].cache_info().currsize == 1
+
+
+def test_names_for_many_matches_name_for():
+    coordinates = [("dev", "tests", "westeurope"), ("prod", "tests", "northeurope")]
+
+    assert FakeResource.names_for_many(coordinates) == [
+        FakeResource.name_for(*coordinate) for coordinate in coordinates
+    ]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,117 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_scheduler.py
+
+This file tests ResourceScheduler.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import DeadlineExceeded, ResourceScheduler
+from tests.fakes import FakeResource
+import pytest
+import time
+
+
+class SlowResource(FakeResource):
+    delay = 0.1
+
+
+class QuickResource(FakeResource):
+    pass
+
+
+class StuckResource(FakeResource):
+    delay = 0.3
+
+
+def stuck_scheduler() -> ResourceScheduler:
+    QuickResource.reset()
+    StuckResource.reset()
+    scheduler = ResourceScheduler("dev", "tests", "westeurope")
+    scheduler.add("quick", QuickResource)
+    scheduler.add("stuck", StuckResource)
+    return scheduler
+
+
+def test_independent_resources_are_created_concurrently():
+    SlowResource.reset()
+    scheduler = ResourceScheduler("dev", "tests", "westeurope", maxConcurrency=8)
+    for index in range(8):
+        scheduler.add(f"r{index}", SlowResource)
+
+    started_at = time.perf_counter()
+    created = asyncio.run(scheduler.run())
+    elapsed = time.perf_counter() - started_at
+
+    assert len(created) == 8
+    assert all(resource.is_materialized for resource in created.values())
+    # sequential creation would take 0.8s
+    assert elapsed < 0.4
+
+
+def test_dependencies_are_created_first():
+    SlowResource.reset()
+    scheduler = ResourceScheduler("dev", "tests", "westeurope", maxConcurrency=4)
+    root = scheduler.add("root", SlowResource)
+    leaves = [
+        scheduler.add(f"leaf{index}", SlowResource, {"parent": root})
+        for index in range(3)
+    ]
+
+    created = asyncio.run(scheduler.run())
+
+    for leaf in leaves:
+        assert created[leaf.key].parent is created["root"]
+        assert leaf.duration > 0
+    assert scheduler.critical_path[0] == "root"
+    # root, then the three leaves in parallel
+    assert scheduler.critical_path_duration < 0.35
+
+
+def test_each_run_reports_its_own_progress():
+    scheduler = stuck_scheduler()
+    asyncio.run(scheduler.run())
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(scheduler.run(timeout=0.1))
+
+    assert error.value.completed == ["quick"]
+    assert error.value.in_flight == ["stuck"]
+    assert len(QuickResource.created) == 2
+
+
+def test_creations_in_flight_complete_after_the_deadline():
+    scheduler = stuck_scheduler()
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(scheduler.run(timeout=0.1))
+    assert error.value.in_flight == ["stuck"]
+    assert scheduler.scheduled["stuck"].resource is None
+
+    # nothing reconciles them: they just finish in their worker thread
+    time.sleep(0.4)
+    assert scheduler.scheduled["stuck"].resource is not None
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
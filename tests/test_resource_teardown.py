@@ -0,0 +1,93 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_resource_teardown.py
+
+This file tests the ResourceTeardown class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import ResourceTeardown
+from tests.fakes import FakeResource
+import time
+
+
+class SlowResource(FakeResource):
+    delay = 0.1
+
+
+class FlakyResource(FakeResource):
+    errors = []
+
+    def _delete(self, resource):
+        if self.__class__.errors:
+            raise self.__class__.errors.pop(0)
+        super()._delete(resource)
+
+
+def tree():
+    root = SlowResource("dev", "tests", "westeurope", {}, lazy=True)
+    leaves = [
+        SlowResource(f"dev{index}", "tests", "westeurope", {"root": root}, lazy=True)
+        for index in range(4)
+    ]
+    return root, leaves
+
+
+def test_leaves_are_deleted_concurrently_before_their_dependencies():
+    SlowResource.reset()
+    root, leaves = tree()
+
+    started_at = time.perf_counter()
+    result = asyncio.run(ResourceTeardown(maxConcurrency=4).run([root, *leaves]))
+    elapsed = time.perf_counter() - started_at
+
+    assert result.succeeded
+    assert result.removed[-1] is root
+    # the leaves in parallel, then the root; sequential deletion would take 0.5s
+    assert elapsed < 0.35
+
+
+def test_transient_errors_are_retried():
+    FlakyResource.reset()
+    FlakyResource.errors = [ConnectionError("reset"), TimeoutError("slow")]
+    resource = FlakyResource("dev", "tests", "westeurope", {}, lazy=True)
+
+    result = asyncio.run(ResourceTeardown(backoff=0.01).run([resource]))
+
+    assert result.removed == [resource]
+
+
+def test_other_errors_are_not_retried():
+    FlakyResource.reset()
+    FlakyResource.errors = [KeyError("bug"), ConnectionError("reset")]
+    resource = FlakyResource("dev", "tests", "westeurope", {}, lazy=True)
+
+    result = asyncio.run(ResourceTeardown(backoff=0.01).run([resource]))
+
+    assert isinstance(result.failed[resource.resource_name], KeyError)
+    # the KeyError was raised once, and never retried
+    assert len(FlakyResource.errors) == 1
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,149 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_sharded_stack_operation_executor.py
+
+This file tests ShardedStackOperationExecutor.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from concurrent.futures.process import BrokenProcessPool
+import os
+from pythoneda.shared.iac import (
+    ShardedStackOperationExecutor,
+    StackOperation,
+    StackOperationFactory,
+)
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeEvent
+import pytest
+import subprocess
+import sys
+import time
+
+
+class NumberedEvent(FakeEvent, InfrastructureUpdateRequested):
+    """
+    Picklable event, numbered in submission order.
+    """
+
+    def __init__(self, stackName: str, number: int, delay: float = 0.0):
+        super().__init__(stackName)
+        self.number = number
+        self.delay = delay
+
+
+class RecordingOperation(StackOperation):
+    """
+    Reports which process performed it, and when it finished.
+    """
+
+    async def perform(self) -> list:
+        if self.event.stack_name == "crash":
+            os._exit(1)
+        await asyncio.sleep(self.event.delay)
+        return [(self.event.number, os.getpid(), time.monotonic())]
+
+
+class RecordingFactory(StackOperationFactory):
+    def new(self, event) -> StackOperation:
+        return RecordingOperation(event)
+
+
+def run(executor: ShardedStackOperationExecutor, events: list) -> list:
+    async def submit_all():
+        return await asyncio.gather(*(executor.submit(event) for event in events))
+
+    try:
+        return [outcome[0] for outcome in asyncio.run(submit_all())]
+    finally:
+        executor.shutdown()
+
+
+def test_events_of_the_same_stack_run_in_order_on_the_same_shard():
+    executor = ShardedStackOperationExecutor(RecordingFactory, shards=2)
+    # earlier events take longer, so running them concurrently would reorder them
+    events = [NumberedEvent("dev", number, 0.05 * (4 - number)) for number in range(4)]
+
+    outcomes = run(executor, events)
+
+    assert len({pid for _, pid, _ in outcomes}) == 1
+    finished = sorted(outcomes, key=lambda outcome: outcome[2])
+    assert [number for number, _, _ in finished] == [0, 1, 2, 3]
+
+
+def test_stacks_are_spread_across_shards():
+    executor = ShardedStackOperationExecutor(RecordingFactory, shards=2)
+    events = [NumberedEvent(f"stack{number}", number) for number in range(8)]
+
+    outcomes = run(executor, events)
+
+    shards = {executor.shard_for(event) for event in events}
+    assert shards == {0, 1}
+    assert len({pid for _, pid, _ in outcomes}) == 2
+
+
+def test_shards_are_stable_across_processes():
+    executor = ShardedStackOperationExecutor(RecordingFactory, shards=7)
+    names = [f"stack{number}" for number in range(20)]
+    statement = (
+        "from pythoneda.shared.iac import ShardedStackOperationExecutor;"
+        "from tests.test_sharded_stack_operation_executor import NumberedEvent;"
+        "executor = ShardedStackOperationExecutor(None, shards=7);"
+        f"print([executor.shard_for(NumberedEvent(name, 0)) for name in {names!r}])"
+    )
+    shards = []
+    for seed in ("1", "2"):
+        environment = dict(
+            os.environ, PYTHONPATH=os.pathsep.join(sys.path), PYTHONHASHSEED=seed
+        )
+        process = subprocess.run(
+            [sys.executable, "-c", statement],
+            env=environment,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        shards.append(process.stdout.strip())
+
+    expected = [executor.shard_for(NumberedEvent(name, 0)) for name in names]
+    assert shards == [str(expected), str(expected)]
+
+
+def test_broken_workers_are_restarted():
+    executor = ShardedStackOperationExecutor(RecordingFactory, shards=1)
+
+    async def crash_then_recover():
+        with pytest.raises(BrokenProcessPool):
+            await executor.submit(NumberedEvent("crash", 0))
+        return await executor.submit(NumberedEvent("dev", 1))
+
+    try:
+        outcome = asyncio.run(crash_then_recover())
+    finally:
+        executor.shutdown()
+
+    assert outcome[0][0] == 1
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
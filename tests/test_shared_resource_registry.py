@@ -0,0 +1,116 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_shared_resource_registry.py
+
+This file tests how SharedResourceRegistry shares actual resources across stacks.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import ResourceTeardown, SharedResourceRegistry
+from tests.fakes import FakeResource
+
+
+class SharedResource(FakeResource):
+    """
+    Resource whose name doesn't depend on the stack, shared by all of them.
+    """
+
+    shared_registry = None
+
+    @classmethod
+    def _compute_name(cls, stackName: str, projectName: str, location: str) -> str:
+        return "sharedresource"
+
+
+def setup_function():
+    SharedResource.shared_registry = SharedResourceRegistry()
+    SharedResource.reset()
+
+
+def shared(stackName: str, lazy: bool = False) -> SharedResource:
+    return SharedResource(stackName, "tests", "westeurope", {}, lazy=lazy)
+
+
+def test_stacks_share_a_single_actual_resource():
+    first = shared("dev")
+    second = shared("prod")
+
+    assert SharedResource.created == ["sharedresource"]
+    assert second.actual_resource is first.actual_resource
+    assert SharedResource.shared_registry.references(first) == 2
+
+
+def test_instances_of_the_same_stack_hold_it_once():
+    shared("dev")
+    again = shared("dev")
+
+    assert SharedResource.shared_registry.references(again) == 1
+
+
+def test_update_then_remove_releases_the_stack_with_a_new_instance():
+    # each UpdateInfrastructure run builds its instances, and drops them
+    shared("dev")
+    shared("prod")
+    shared("dev")
+
+    # later, RemoveInfrastructure builds lazy ones for the same stacks
+    assert shared("dev", lazy=True).delete() is False
+    assert SharedResource.deleted == []
+    assert SharedResource.shared_registry.references(shared("prod", lazy=True)) == 1
+
+    last = shared("prod", lazy=True)
+    assert last.delete() is True
+    assert SharedResource.deleted == ["sharedresource"]
+    assert last.is_materialized
+    assert len(SharedResource.shared_registry) == 0
+
+
+def test_releasing_a_stack_again_leaves_the_others_unaffected():
+    shared("dev")
+    shared("prod")
+
+    shared("dev", lazy=True).delete()
+    shared("dev", lazy=True).delete()
+
+    assert SharedResource.deleted == []
+    assert SharedResource.shared_registry.references(shared("prod", lazy=True)) == 1
+
+
+def test_teardown_reports_resources_kept_for_other_stacks():
+    shared("dev")
+    shared("prod")
+
+    kept = asyncio.run(ResourceTeardown().run([shared("dev", lazy=True)]))
+    removed = asyncio.run(ResourceTeardown().run([shared("prod", lazy=True)]))
+
+    assert kept.removed == [] and kept.skipped == []
+    assert kept.to_dict()["retained"] == ["sharedresource"]
+    assert kept.succeeded
+    assert [resource.resource_name for resource in removed.removed] == [
+        "sharedresource"
+    ]
+    assert removed.retained == []
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
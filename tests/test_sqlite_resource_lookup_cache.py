@@ -0,0 +1,61 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_sqlite_resource_lookup_cache.py
+
+This file tests the SqliteResourceLookupCache class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import SqliteResourceLookupCache
+
+
+def test_entries_that_cannot_be_unpickled_are_misses(tmp_path):
+    cache = SqliteResourceLookupCache(str(tmp_path / "cache.db"))
+    cache.put(("FakeResource", "a"), {"name": "a"})
+    cache._connection.execute(
+        "UPDATE resources SET resource = ? WHERE resource_id = ?", (b"corrupt", "a")
+    )
+
+    assert cache.get(("FakeResource", "a")) is cache.MISSING
+    (rows,) = cache._connection.execute("SELECT COUNT(*) FROM resources").fetchone()
+    assert rows == 0
+    cache.close()
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = SqliteResourceLookupCache(str(tmp_path / "cache.db"), maxSize=2)
+    cache.put(("FakeResource", "a"), "a")
+    cache.put(("FakeResource", "b"), "b")
+    cache._connection.execute(
+        "UPDATE resources SET accessed_at = accessed_at + 10 WHERE resource_id = ?",
+        ("a",),
+    )
+    cache.put(("FakeResource", "c"), "c")
+
+    assert cache.get(("FakeResource", "a")) == "a"
+    assert cache.get(("FakeResource", "b")) is cache.MISSING
+    assert cache.get(("FakeResource", "c")) == "c"
+    cache.close()
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,121 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_stack_operation_batcher.py
+
+This file tests the StackOperationBatcher class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import StackOperationBatcher
+from pythoneda.shared.iac.events import (
+    DockerResourcesUpdateRequested,
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+from tests.fakes import FakeOperation, FakeStackOperationFactory, fake_event
+import pytest
+
+
+def docker_update(image: str, digest: str):
+    result = fake_event(DockerResourcesUpdateRequested)
+    result._image_name = image
+    result._image_digest = digest
+    return result
+
+
+def test_coalesced_submitters_get_the_outcome_of_the_last_event():
+    FakeOperation.reset()
+    batcher = StackOperationBatcher(FakeStackOperationFactory(), window=0.01)
+    update = fake_event(InfrastructureUpdateRequested)
+    removal = fake_event(InfrastructureRemovalRequested)
+
+    async def submit_both():
+        return await asyncio.gather(batcher.submit(update), batcher.submit(removal))
+
+    update_outcome, removal_outcome = asyncio.run(submit_both())
+
+    assert FakeOperation.performed == [removal]
+    assert update_outcome == [removal]
+    assert removal_outcome == [removal]
+
+
+def test_docker_updates_coalesce_only_for_the_same_image():
+    FakeOperation.reset()
+    batcher = StackOperationBatcher(FakeStackOperationFactory(), window=0.01)
+    events = [
+        docker_update("api", "sha256:1"),
+        docker_update("web", "sha256:2"),
+        docker_update("web", "sha256:2"),
+    ]
+
+    async def submit_all():
+        return await asyncio.gather(*(batcher.submit(event) for event in events))
+
+    outcomes = asyncio.run(submit_all())
+
+    assert FakeOperation.performed == [events[0], events[2]]
+    assert outcomes == [[events[0]], [events[2]], [events[2]]]
+
+
+def test_cancelled_flushes_cancel_their_submitters():
+    FakeOperation.reset()
+    batcher = StackOperationBatcher(FakeStackOperationFactory(), window=10)
+
+    async def submit_and_cancel():
+        submitted = asyncio.ensure_future(
+            batcher.submit(fake_event(InfrastructureUpdateRequested))
+        )
+        await asyncio.sleep(0)
+        for flush in list(batcher._flushes):
+            flush.cancel()
+        return await asyncio.wait_for(submitted, 1)
+
+    with pytest.raises(asyncio.CancelledError):
+        asyncio.run(submit_and_cancel())
+
+    assert FakeOperation.performed == []
+    assert batcher._pending == {}
+
+
+def test_idle_stacks_leave_nothing_behind():
+    FakeOperation.reset()
+    batcher = StackOperationBatcher(FakeStackOperationFactory(), window=0.01)
+
+    async def submit_all():
+        await asyncio.gather(
+            *(
+                batcher.submit(fake_event(InfrastructureUpdateRequested, f"stack{n}"))
+                for n in range(10)
+            )
+        )
+        await asyncio.sleep(0)
+
+    asyncio.run(submit_all())
+
+    assert len(FakeOperation.performed) == 10
+    assert batcher._locks == {}
+    assert not batcher._flushes
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
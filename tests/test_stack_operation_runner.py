@@ -0,0 +1,237 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_stack_operation_runner.py
+
+This file tests the StackOperationRunner class.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import (
+    DeadlineExceeded,
+    RateLimiter,
+    ResourceScheduler,
+    StackOperationRunner,
+)
+import pythoneda.shared.iac.rate_limiter as rate_limiter
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeOperation, FakeResource, fake_event
+import pytest
+import time
+
+
+class SlowOperation(FakeOperation):
+    delay = 0.05
+
+
+def test_operations_on_the_same_stack_run_in_submission_order():
+    SlowOperation.reset()
+    events = [fake_event(InfrastructureUpdateRequested, "dev") for _ in range(5)]
+
+    async def run_all():
+        runner = StackOperationRunner(maxConcurrency=4)
+        outcomes = await asyncio.gather(
+            *(runner.run(SlowOperation(event)) for event in events)
+        )
+        await runner.stop()
+        return outcomes
+
+    outcomes = asyncio.run(run_all())
+
+    assert SlowOperation.performed == events
+    assert outcomes == [[event] for event in events]
+
+
+def test_submitting_waits_while_the_queue_is_full():
+    SlowOperation.reset()
+    events = [
+        fake_event(InfrastructureUpdateRequested, f"stack{index}") for index in range(3)
+    ]
+
+    async def submit_all():
+        runner = StackOperationRunner(maxConcurrency=1, queueSize=1)
+        await runner.submit(SlowOperation(events[0]))
+        # the worker takes the first operation, freeing its place in the queue
+        await asyncio.sleep(0)
+        await runner.submit(SlowOperation(events[1]))
+        third = asyncio.ensure_future(runner.submit(SlowOperation(events[2])))
+        await asyncio.sleep(0.01)
+        blocked = not third.done()
+        await third
+        await runner.stop()
+        return blocked
+
+    assert asyncio.run(submit_all())
+    assert SlowOperation.performed == events
+
+
+class FakeClock:
+    """
+    Monotonic clock that only moves when the code under test sleeps.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class ProviderOperation(FakeOperation):
+    provider = "azure"
+
+    started = []
+
+    async def perform(self):
+        ProviderOperation.started.append(rate_limiter.time.monotonic())
+        return await super().perform()
+
+
+def test_provider_calls_are_spaced_by_their_rate(monkeypatch):
+    clock = FakeClock()
+    sleep = asyncio.sleep
+
+    async def fake_sleep(seconds, *args, **kwargs):
+        clock.now += seconds
+        await sleep(0)
+
+    monkeypatch.setattr(rate_limiter, "time", clock)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", fake_sleep)
+    ProviderOperation.started = []
+    events = [
+        fake_event(InfrastructureUpdateRequested, f"stack{index}") for index in range(5)
+    ]
+
+    async def run_all():
+        runner = StackOperationRunner(
+            maxConcurrency=5, rateLimits={"azure": RateLimiter(rate=10, burst=2)}
+        )
+        operations = [ProviderOperation(event) for event in events]
+        await asyncio.gather(*(runner.run(operation) for operation in operations))
+        await runner.stop()
+
+    asyncio.run(run_all())
+
+    # a burst of two, then one call every 0.1s
+    assert ProviderOperation.started == pytest.approx([0.0, 0.0, 0.1, 0.2, 0.3])
+
+
+def test_a_busy_stack_does_not_hold_other_stacks_back():
+    SlowOperation.reset()
+    busy = [fake_event(InfrastructureUpdateRequested, "busy") for _ in range(8)]
+    others = [
+        fake_event(InfrastructureUpdateRequested, f"stack{index}") for index in range(6)
+    ]
+
+    async def run_all():
+        runner = StackOperationRunner(maxConcurrency=4)
+        for event in busy:
+            await runner.submit(SlowOperation(event))
+        started_at = time.perf_counter()
+        await asyncio.gather(*(runner.run(SlowOperation(event)) for event in others))
+        elapsed = time.perf_counter() - started_at
+        await runner.stop()
+        return elapsed
+
+    elapsed = asyncio.run(run_all())
+
+    # three workers are free for the other stacks: two rounds of 0.05s,
+    # instead of waiting 0.4s for the busy stack
+    assert elapsed < 0.25
+    assert len(SlowOperation.performed) == 14
+
+
+class QuickResource(FakeResource):
+    pass
+
+
+class StuckResource(FakeResource):
+    delay = 0.5
+
+
+class DependentResource(FakeResource):
+    pass
+
+
+class DeadlineFailed:
+    """
+    Stands for the failure event of an operation.
+    """
+
+    def __init__(self, summary: dict):
+        self.summary = summary
+
+
+class CreatingOperation(FakeOperation):
+    timeout = 0.2
+
+    async def perform(self):
+        scheduler = ResourceScheduler("dev", "tests", "westeurope")
+        scheduler.add("quick", QuickResource)
+        stuck = scheduler.add("stuck", StuckResource)
+        scheduler.add("dependent", DependentResource, {"stuck": stuck})
+        return [event async for event in self._create_resources(scheduler)]
+
+
+class ReportingOperation(CreatingOperation):
+    def _deadline_failure_events(self, error):
+        return [DeadlineFailed(error.to_dict())]
+
+
+def name_of(resourceClass: type) -> str:
+    return resourceClass.name_for("dev", "tests", "westeurope")
+
+
+def test_deadlines_are_reported_with_the_failure_events():
+    event = fake_event(InfrastructureUpdateRequested)
+
+    async def run():
+        runner = StackOperationRunner()
+        outcome = await runner.run(ReportingOperation(event))
+        await runner.stop()
+        return outcome
+
+    [failure] = asyncio.run(run())
+
+    assert failure.summary["completed"] == [name_of(QuickResource)]
+    assert failure.summary["in_flight"] == [name_of(StuckResource)]
+    assert failure.summary["pending"] == [name_of(DependentResource)]
+
+
+def test_deadlines_are_raised_without_failure_events():
+    event = fake_event(InfrastructureUpdateRequested)
+
+    async def run():
+        runner = StackOperationRunner()
+        try:
+            return await runner.run(CreatingOperation(event))
+        finally:
+            await runner.stop()
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(run())
+
+    assert error.value.in_flight == [name_of(StuckResource)]
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,235 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_stack_operation_stream.py
+
+This file tests how stack operations stream their progress.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import (
+    Instrumentation,
+    MemoryMetricsSink,
+    RemoveInfrastructure,
+    ResourceHashIndex,
+    ResourceProgress,
+    StackOperation,
+    UpdateInfrastructure,
+)
+from pythoneda.shared.iac.events import (
+    InfrastructureRemovalRequested,
+    InfrastructureUpdateRequested,
+)
+from tests.fakes import FakeOperation, FakeResource, fake_event
+import pytest
+
+
+class RootResource(FakeResource):
+    pass
+
+
+class QuickResource(FakeResource):
+    pass
+
+
+class SlowResource(FakeResource):
+    delay = 0.2
+
+
+class Done:
+    """
+    Stands for the event closing a stream.
+    """
+
+    def __init__(self, outcome=None):
+        self.outcome = outcome
+
+
+def declare() -> list:
+    root = RootResource("dev", "tests", "westeurope", {}, lazy=True)
+    return [
+        SlowResource("dev", "tests", "westeurope", {"root": root}, lazy=True),
+        QuickResource("dev", "tests", "westeurope", {"root": root}, lazy=True),
+        root,
+    ]
+
+
+def reset():
+    for resourceClass in (RootResource, QuickResource, SlowResource):
+        resourceClass.reset()
+
+
+class StreamingUpdate(UpdateInfrastructure):
+    before = 0
+
+    def _before_perform(self):
+        self.__class__.before += 1
+
+    def _declare_resources(self):
+        return declare()
+
+    def _updated_events(self):
+        return [Done()]
+
+
+class IndexedUpdate(StreamingUpdate):
+    index = ResourceHashIndex()
+
+    def _hash_index(self):
+        return self.__class__.index
+
+
+class StreamingRemoval(RemoveInfrastructure):
+    def _declare_resources(self):
+        return declare()
+
+    def _removed_events(self, result):
+        return [Done(result)]
+
+
+def name_of(resourceClass: type) -> str:
+    return resourceClass.name_for("dev", "tests", "westeurope")
+
+
+def update() -> StreamingUpdate:
+    StreamingUpdate.before = 0
+    return StreamingUpdate(fake_event(InfrastructureUpdateRequested))
+
+
+def names(events: list) -> list:
+    return [
+        event.resource_name for event in events if isinstance(event, ResourceProgress)
+    ]
+
+
+def test_updates_stream_each_resource_as_soon_as_it_is_created():
+    reset()
+    operation = update()
+
+    async def consume():
+        result = []
+        async for event in operation.perform_stream():
+            # the slow resource is still being created when the others are reported
+            result.append((event, len(SlowResource.created)))
+        return result
+
+    received = asyncio.run(consume())
+
+    events = [event for event, _ in received]
+    assert names(events) == [
+        name_of(RootResource),
+        name_of(QuickResource),
+        name_of(SlowResource),
+    ]
+    assert [slow for _, slow in received[:2]] == [0, 0]
+    assert all(event.action == ResourceProgress.CREATED for event in events[:3])
+    assert isinstance(events[-1], Done)
+    assert [resource.__class__ for resource in operation.resources] == [
+        RootResource,
+        QuickResource,
+        SlowResource,
+    ]
+
+
+def test_perform_collects_the_stream():
+    reset()
+    operation = update()
+
+    events = asyncio.run(operation.perform())
+
+    assert len(names(events)) == 3
+    assert isinstance(events[-1], Done)
+    assert StreamingUpdate.before == 1
+
+
+def test_streams_run_the_before_perform_hook_once():
+    reset()
+    operation = update()
+
+    async def consume():
+        return [event async for event in operation.perform_stream()]
+
+    asyncio.run(consume())
+
+    assert StreamingUpdate.before == 1
+
+
+def test_streams_are_instrumented():
+    reset()
+    sink = MemoryMetricsSink()
+    Instrumentation.enable(sink)
+    try:
+        asyncio.run(update().perform())
+    finally:
+        Instrumentation.disable()
+
+    timings = sink.timings("iac_stack_operation_perform", operation="StreamingUpdate")
+    assert len(timings) == 1
+
+
+def test_updates_skip_the_resources_unchanged_since_the_last_one():
+    reset()
+    IndexedUpdate.index = ResourceHashIndex()
+    asyncio.run(IndexedUpdate(fake_event(InfrastructureUpdateRequested)).perform())
+    assert len(IndexedUpdate.index.hashes) == 3
+    reset()
+    operation = IndexedUpdate(fake_event(InfrastructureUpdateRequested))
+
+    events = asyncio.run(operation.perform())
+
+    assert len(names(events)) == 3
+    assert all(event.action == ResourceProgress.UNCHANGED for event in events[:3])
+    assert SlowResource.created == [] and RootResource.created == []
+    assert len(operation.resources) == 3
+
+
+def test_removals_stream_each_resource_dependents_first():
+    reset()
+    operation = StreamingRemoval(fake_event(InfrastructureRemovalRequested))
+
+    events = asyncio.run(operation.perform())
+
+    assert len(names(events)) == 3
+    assert names(events)[-1] == name_of(RootResource)
+    assert all(event.action == ResourceProgress.REMOVED for event in events[:3])
+    assert events[-1].outcome is operation.outcome
+    assert operation.outcome.succeeded
+
+
+def test_operations_implementing_perform_stream_its_outcome():
+    operation = FakeOperation(fake_event(InfrastructureUpdateRequested))
+
+    async def consume():
+        return [event async for event in operation.perform_stream()]
+
+    assert asyncio.run(consume()) == [operation.event]
+
+
+def test_operations_implementing_nothing_are_rejected():
+    operation = StackOperation(fake_event(InfrastructureUpdateRequested))
+
+    with pytest.raises(NotImplementedError):
+        asyncio.run(operation.perform())
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
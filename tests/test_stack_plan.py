@@ -0,0 +1,156 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_stack_plan.py
+
+This file tests StackPlan, and how operations plan their changes.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+from pythoneda.shared.iac import StackPlan, UpdateInfrastructure
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeResource, fake_event
+
+
+class RootResource(FakeResource):
+    sku = "basic"
+
+    def _configuration(self):
+        return {"sku": self.__class__.sku}
+
+
+class LeafResource(FakeResource):
+    pass
+
+
+class OtherLeafResource(FakeResource):
+    pass
+
+
+STACK = ("dev", "tests", "westeurope")
+
+
+def declare(leafClass: type = LeafResource) -> list:
+    root = RootResource(*STACK, {}, lazy=True)
+    leaf = leafClass(*STACK, {"root": root}, lazy=True)
+    return [leaf, root]
+
+
+class DeclaringOperation(UpdateInfrastructure):
+    def _declare_resources(self):
+        return declare()
+
+    async def perform(self):
+        return []
+
+
+def name_of(resourceClass: type) -> str:
+    return resourceClass.name_for(*STACK)
+
+
+ROOT = name_of(RootResource)
+
+LEAF = name_of(LeafResource)
+
+
+def test_new_resources_are_created_dependencies_first():
+    plan = StackPlan.for_update(STACK, declare())
+
+    assert plan.names(StackPlan.CREATE) == [ROOT, LEAF]
+    assert plan.summary()["create"] == 2
+
+
+def test_changed_resources_are_updated_along_with_their_dependents():
+    previous = StackPlan.for_update(STACK, declare()).state
+    RootResource.sku = "premium"
+    try:
+        plan = StackPlan.for_update(STACK, declare(), previous)
+    finally:
+        RootResource.sku = "basic"
+
+    assert plan.names(StackPlan.UPDATE) == [ROOT, LEAF]
+    assert plan.unchanged == []
+
+
+def test_unchanged_resources_are_left_alone():
+    previous = StackPlan.for_update(STACK, declare()).state
+
+    plan = StackPlan.for_update(STACK, declare(), previous)
+
+    assert not plan.has_changes
+    assert sorted(plan.unchanged) == sorted(previous)
+
+
+def test_resources_changing_type_are_replaced():
+    previous = StackPlan.for_update(STACK, declare()).state
+    name = LEAF
+    previous[name] = dict(previous[name], type="tests.OldLeafResource")
+
+    plan = StackPlan.for_update(STACK, declare(), previous)
+
+    assert plan.names(StackPlan.REPLACE) == [name]
+    assert plan.unchanged == [ROOT]
+
+
+def test_resources_no_longer_declared_are_deleted_dependents_first():
+    previous = StackPlan.for_update(STACK, declare(OtherLeafResource)).state
+    other = name_of(OtherLeafResource)
+    previous["orphan"] = {"type": "tests.Orphan", "dependencies": [other]}
+
+    plan = StackPlan.for_update(STACK, declare(), previous)
+
+    assert plan.names(StackPlan.CREATE) == [LEAF]
+    assert plan.names(StackPlan.DELETE) == ["orphan", other]
+    assert plan.changes[-1]["action"] == StackPlan.DELETE
+
+
+def test_removals_delete_everything_dependents_first():
+    plan = StackPlan.for_removal(STACK, declare())
+
+    assert plan.names(StackPlan.DELETE) == [LEAF, ROOT]
+    assert plan.state == {}
+
+
+def test_plans_survive_a_json_round_trip():
+    plan = StackPlan.for_update(STACK, declare())
+
+    restored = StackPlan.from_json(plan.to_json())
+
+    assert restored.stack_key == STACK
+    assert restored.changes == plan.changes
+    assert restored.unchanged == plan.unchanged
+    assert restored.state == plan.state
+
+
+def test_operations_plan_their_declared_resources_without_creating_them():
+    RootResource.reset()
+    LeafResource.reset()
+    operation = DeclaringOperation(fake_event(InfrastructureUpdateRequested))
+
+    plan = operation.plan()
+
+    assert plan.names(StackPlan.CREATE) == [ROOT, LEAF]
+    assert RootResource.created == [] and LeafResource.created == []
+    assert len(operation.resources) == 0
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,127 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_stack_snapshot.py
+
+This file tests StackSnapshot.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import os
+from pythoneda.shared.iac import StackSnapshot
+from pythoneda.shared.iac.events import InfrastructureUpdateRequested
+from tests.fakes import FakeOperation, FakeResource, fake_event
+import pytest
+import struct
+import threading
+
+STACK_KEY = ("dev", "tests", "westeurope")
+
+
+class RootResource(FakeResource):
+    pass
+
+
+class LeafResource(FakeResource):
+    pass
+
+
+def entry(name: str, id: str = None, dependencies: list = None) -> dict:
+    return {
+        "type": f"tests.{name.capitalize()}",
+        "name": name,
+        "id": id,
+        "hash": name.encode("utf-8").ljust(32, b"\0").hex(),
+        "dependencies": dependencies or [],
+    }
+
+
+def snapshot(outcome=None) -> StackSnapshot:
+    entries = [
+        entry("network", "/networks/network"),
+        entry("registry"),
+        entry("app", "/apps/app", ["network", "registry"]),
+    ]
+    return StackSnapshot(STACK_KEY, entries, outcome)
+
+
+def test_snapshots_are_read_back_through_mmap(tmp_path):
+    path = str(tmp_path / "dev.snapshot")
+    written = snapshot({"succeeded": True, "failed": []})
+
+    written.write(path)
+    read = StackSnapshot.read(path)
+
+    assert os.listdir(tmp_path) == ["dev.snapshot"]
+    assert read.stack_key == STACK_KEY
+    assert read.entries == written.entries
+    assert read.outcome == {"succeeded": True, "failed": []}
+
+
+def test_ids_and_dependencies_are_encoded():
+    read = StackSnapshot.from_bytes(snapshot().to_bytes())
+
+    assert read.ids() == {"network": "/networks/network", "app": "/apps/app"}
+    assert read.id_for("registry") is None
+    assert read.state()["app"]["dependencies"] == ["network", "registry"]
+    assert read.outcome is None
+
+
+def test_operations_are_captured_with_their_dependencies():
+    operation = FakeOperation(fake_event(InfrastructureUpdateRequested))
+    root = RootResource(*STACK_KEY, {}, lazy=True)
+    leaf = LeafResource(*STACK_KEY, {"root": root}, lazy=True)
+    operation.resources.extend([root, leaf])
+
+    read = StackSnapshot.from_bytes(StackSnapshot.of(operation).to_bytes())
+
+    assert read.state() == StackSnapshot.of(operation).state()
+    assert read.state()[leaf.resource_name]["dependencies"] == [root.resource_name]
+    assert read.state()[leaf.resource_name]["type"].endswith(".LeafResource")
+
+
+def test_outcomes_that_cannot_be_pickled_are_left_out():
+    read = StackSnapshot.from_bytes(snapshot(threading.Lock()).to_bytes())
+
+    assert read.outcome is None
+    assert len(read.entries) == 3
+
+
+def test_other_files_are_rejected():
+    data = bytearray(snapshot().to_bytes())
+    data[:4] = b"NOPE"
+
+    with pytest.raises(ValueError, match="Not a stack snapshot"):
+        StackSnapshot.from_bytes(bytes(data))
+
+
+def test_other_versions_are_rejected(tmp_path):
+    data = bytearray(snapshot().to_bytes())
+    struct.pack_into("<H", data, 4, 2)
+    path = tmp_path / "dev.snapshot"
+    path.write_bytes(bytes(data))
+
+    with pytest.raises(ValueError, match="version: 2"):
+        StackSnapshot.read(str(path))
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End:
@@ -0,0 +1,97 @@
+# vim: set fileencoding=utf-8
+"""
+tests/test_update_docker_resources.py
+
+This file tests the digest tracking of Docker resource operations.
+
+Copyright (C) 2024-today pythoneda-shared-iac/shared
+
+This program is free software: you can redistribute it and/or modify
+it under the terms of the GNU General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+This program is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License
+along with this program.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import asyncio
+from pythoneda.shared.iac import RemoveDockerResources, UpdateDockerResources
+from pythoneda.shared.iac.events import (
+    DockerResourcesRemovalRequested,
+    DockerResourcesUpdateRequested,
+)
+from tests.fakes import FakeResource, fake_event
+
+
+class AppService(FakeResource):
+    pass
+
+
+class Worker(FakeResource):
+    pass
+
+
+class DeployImage(UpdateDockerResources):
+    async def perform(self):
+        return [self.event]
+
+
+class RemoveImage(RemoveDockerResources):
+    async def perform(self):
+        return [self.event]
+
+
+def resources(*classes):
+    return [cls("digests", "tests", "westeurope", {}, lazy=True) for cls in classes]
+
+
+def remove():
+    event = fake_event(DockerResourcesRemovalRequested, "digests")
+    asyncio.run(RemoveImage(event).perform())
+
+
+def test_recorded_resources_are_up_to_date():
+    remove()
+    update = DeployImage(fake_event(DockerResourcesUpdateRequested, "digests"))
+    current = resources(AppService, Worker)
+
+    update._deployed(current, "sha256:1")
+
+    assert update._is_up_to_date(current, "sha256:1")
+    assert not update._is_up_to_date(current, "sha256:2")
+
+
+def test_unknown_resources_are_not_up_to_date():
+    remove()
+    update = DeployImage(fake_event(DockerResourcesUpdateRequested, "digests"))
+    update._deployed(resources(AppService), "sha256:1")
+
+    assert not update._is_up_to_date(resources(AppService, Worker), "sha256:1")
+    assert not update._is_up_to_date([], "sha256:1")
+
+
+def test_removal_forgets_deployed_digests():
+    update = DeployImage(fake_event(DockerResourcesUpdateRequested, "digests"))
+    current = resources(AppService, Worker)
+    update._deployed(current, "sha256:1")
+
+    remove()
+
+    later = DeployImage(fake_event(DockerResourcesUpdateRequested, "digests"))
+    assert not later._is_up_to_date(current, "sha256:1")
+    assert later._outdated_resources(current, "sha256:1") == current
+
+
+# vim: syntax=python ts=4 sw=4 sts=4 tw=79 sr et
+# Local Variables:
+# mode: python
+# python-indent-offset: 4
+# tab-width: 4
+# indent-tabs-mode: nil
+# fill-column: 79
+# End: